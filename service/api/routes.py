@@ -1,20 +1,88 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from celery.result import AsyncResult
+from celery.states import READY_STATES, SUCCESS
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import Any, Dict, Optional, Set
 
 from api.schemas import (
     WebhookPayload,
     ReviewRequest,
     ReviewResponse,
-    HealthResponse
+    HealthResponse,
+    BackfillRequest,
+    BackfillResponse,
 )
-from infrastructure.gitlab_client import GitLabClient
-from tasks import review_merge_request
+from infrastructure.gitlab_client import gitlab_client
+from infrastructure.review_cache import review_cache
+from infrastructure.review_jobs import review_jobs
+from infrastructure.listing_cache import listing_cache
+from infrastructure.metrics import QUEUE_DEPTH, WEBHOOK_LATENCY, render_metrics
+from infrastructure.redis_client import get_redis
+from infrastructure.embeddings import embedding_service
+from infrastructure.llm import LLMWorker
+from infrastructure.llm_scheduler import llm_scheduler
+from infrastructure.review_progress import DONE, review_progress
+from tasks import celery_app, review_merge_request, backfill_history
+from db.models import BackfillCheckpoint
+from db.review_queries import export_reviews, get_review, list_reviews, review_filter
 from config import settings
+from loguru import logger
+import asyncio
+import json
 import requests
+import time
 from redis import Redis
-from workflows import create_review_workflow, ReviewState
 
 router = APIRouter()
 
+PROJECT_FILTERS = {
+    "archived", "membership", "min_access_level", "order_by", "owned",
+    "search", "simple", "sort", "starred", "topic", "visibility",
+}
+PROJECT_EVENTS = {
+    "project_create", "project_destroy", "project_rename", "project_transfer", "project_update",
+    "user_add_to_team", "user_remove_from_team", "user_update_for_team",
+}
+MR_FILTERS = {
+    "assignee_username", "author_username", "created_after", "created_before",
+    "labels", "milestone", "order_by", "reviewer_username", "scope", "search",
+    "sort", "source_branch", "state", "target_branch", "updated_after", "updated_before",
+}
+
+
+_publisher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="celery-publish")
+
+
+async def _enqueue(task, *args, **options):
+    return await asyncio.get_running_loop().run_in_executor(
+        _publisher, partial(task.apply_async, args, **options)
+    )
+
+
+def _filters(request: Request, allowed: Set[str], **defaults) -> Dict[str, Any]:
+    return {
+        **defaults,
+        **{k: v for k, v in request.query_params.items() if k in allowed},
+    }
+
+
+async def _listing(scope, fetch, filters, page, per_page, stream):
+    if not stream:
+        items, next_page = await listing_cache.page(scope, fetch, filters, page, per_page)
+        return {"items": items, "next_page": next_page}
+
+    async def lines():
+        next_page = page
+        while next_page:
+            items, next_page = await listing_cache.page(scope, fetch, filters, next_page, per_page)
+            for item in items:
+                yield json.dumps(item) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
 
 @router.get("/health", response_model=HealthResponse)
 def health_check():
@@ -39,11 +107,63 @@ def health_check():
 
     return checks
 
+@router.get("/metrics")
+async def metrics():
+    for queue in settings.METRICS_CELERY_QUEUES:
+        try:
+            QUEUE_DEPTH.labels(queue).set(await get_redis().llen(queue))
+        except Exception:
+            logger.warning("Could not read Celery queue depth", queue=queue)
+
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@router.get("/api/cache/stats")
+async def cache_stats():
+    return {
+        "review_cache": await review_cache.stats(),
+        "gitlab": gitlab_client.cache_stats(),
+        "embeddings": embedding_service.stats(),
+        "listings": listing_cache.stats(),
+    }
+
+@router.get("/api/llm/stats")
+async def llm_stats():
+    return {
+        "calls": LLMWorker.call_stats(),
+        "scheduler": llm_scheduler.stats(),
+    }
+
 @router.post("/api/webhook")
 async def gitlab_webhook(payload: WebhookPayload):
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        response = await _ingest_webhook(payload)
+        outcome = response.status if isinstance(response, ReviewResponse) else response["status"]
+        return response
+    finally:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        WEBHOOK_LATENCY.labels(outcome).observe(elapsed_ms / 1000)
+        if elapsed_ms > settings.WEBHOOK_LATENCY_BUDGET_MS:
+            logger.warning(
+                "Webhook ingress took {elapsed_ms:.0f}ms, over the {budget_ms:.0f}ms budget",
+                elapsed_ms=elapsed_ms,
+                budget_ms=settings.WEBHOOK_LATENCY_BUDGET_MS,
+                object_kind=payload.object_kind,
+                outcome=outcome,
+            )
+
+async def _ingest_webhook(payload: WebhookPayload):
+    if payload.event_name in PROJECT_EVENTS:
+        await listing_cache.invalidate("projects")
+        return {"status": "ignored", "reason": f"system event '{payload.event_name}' not reviewed"}
+
     if payload.object_kind != "merge_request":
         return {"status": "ignored", "reason": "not a merge request event"}
 
+    await listing_cache.invalidate(f"mrs:{payload.project['id']}")
+
     mr_action = payload.object_attributes.get("action")
     if mr_action not in ["open", "update"]:
         return {"status": "ignored", "reason": f"action '{mr_action}' not reviewed"}
@@ -51,7 +171,14 @@ async def gitlab_webhook(payload: WebhookPayload):
     project_id = payload.project["id"]
     mr_iid = payload.object_attributes["iid"]
 
-    task = review_merge_request.delay(project_id, mr_iid)
+    generation = await review_jobs.next_generation(project_id, mr_iid)
+    task = await _enqueue(
+        review_merge_request,
+        project_id,
+        mr_iid,
+        kwargs={"generation": generation},
+        countdown=settings.REVIEW_SETTLE_SECONDS,
+    )
 
     return ReviewResponse(
         status="queued",
@@ -62,52 +189,177 @@ async def gitlab_webhook(payload: WebhookPayload):
 
 @router.post("/api/review", response_model=ReviewResponse)
 async def trigger_review(request: ReviewRequest):
-    workflow = create_review_workflow()
-
-    initial_state: ReviewState = {
-        "project_id": request.project_id,
-        "mr_iid": request.mr_iid,
-    }
-
-    result = await workflow.ainvoke(initial_state)
-
-    if result.get("error"):
-        return {"status": "error", "error": result["error"]}
+    generation = await review_jobs.next_generation(request.project_id, request.mr_iid)
+    task = await _enqueue(
+        review_merge_request,
+        request.project_id,
+        request.mr_iid,
+        kwargs={"generation": generation, "interactive": True},
+        queue=settings.REVIEW_INTERACTIVE_QUEUE,
+    )
 
     return ReviewResponse(
-        status="completed",
+        status="queued",
         project_id=request.project_id,
         mr_iid=request.mr_iid,
-        task_id="task_iod"
+        task_id=task.id,
     )
 
-@router.get("/api/projects")
-async def get_projects():
-    gitlab_client = GitLabClient()
-    project_list = gitlab_client.get_projects()
+def _task_status(task_id: str) -> Dict[str, Any]:
+    result = AsyncResult(task_id, app=celery_app)
+    status: Dict[str, Any] = {"task_id": task_id, "state": result.state}
+
+    if result.successful():
+        status["result"] = result.result
+    elif result.failed():
+        status["error"] = str(result.result)
+    return status
+
+def _sse(event: str, data: Dict[str, Any], event_id: Optional[str] = None) -> str:
+    head = f"id: {event_id}\n" if event_id else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+async def _review_events(task_id: str, after: str):
+    block_ms = int(settings.REVIEW_EVENTS_KEEPALIVE_SECONDS * 1000)
+    last_event_at = time.monotonic()
+
+    while True:
+        try:
+            events = await review_progress.read(task_id, after, block_ms)
+        except Exception:
+            logger.exception("Could not read review progress", task_id=task_id)
+            yield _sse("error", {"error": "review progress is unavailable"})
+            return
+
+        for event_id, event, data in events:
+            after = event_id
+            last_event_at = time.monotonic()
+            yield _sse(event, data, event_id)
+            if event == DONE:
+                return
+        if events:
+            continue
+
+        status = await asyncio.to_thread(_task_status, task_id)
+        if status["state"] in READY_STATES:
+            yield _sse(DONE, {
+                "status": "ok" if status["state"] == SUCCESS else "error",
+                "error": status.get("error"),
+            })
+            return
+
+        idle = time.monotonic() - last_event_at
+        if idle >= settings.REVIEW_EVENTS_IDLE_TIMEOUT_SECONDS:
+            yield _sse("error", {
+                "error": f"no progress for this task in {idle:.0f}s",
+                "state": status["state"],
+            })
+            return
+
+        yield ": keepalive\n\n"
+
+@router.get("/api/review/{task_id}")
+async def get_review_status(task_id: str):
+    status = await asyncio.to_thread(_task_status, task_id)
+    status["progress"] = await review_progress.latest(task_id)
+    return status
+
+@router.get("/api/review/{task_id}/events")
+async def stream_review_events(task_id: str, request: Request):
+    return StreamingResponse(
+        _review_events(task_id, request.headers.get("last-event-id") or "0-0"),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/api/backfill", response_model=BackfillResponse)
+async def trigger_backfill(request: BackfillRequest):
+    task = await _enqueue(backfill_history, request.project_ids, request.concurrency)
+
+    return BackfillResponse(
+        status="queued",
+        task_id=task.id,
+        project_ids=request.project_ids,
+    )
+
+@router.get("/api/backfill/{project_id}")
+async def get_backfill_status(project_id: int):
+    checkpoint = await BackfillCheckpoint.find_one(
+        BackfillCheckpoint.project_id == project_id
+    )
+    if checkpoint is None:
+        raise HTTPException(status_code=404, detail="No backfill for this project")
+
+    return checkpoint.model_dump(exclude={"id"})
+
+@router.get("/api/reviews")
+async def get_reviews(
+    project_id: Optional[int] = None,
+    mr_iid: Optional[int] = None,
+    author: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+):
+    try:
+        query = review_filter(project_id, mr_iid, author, created_from, created_to, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    for p in project_list:
-        print(p.id)
-        print(p.path_with_namespace)
-        print(p.name)
+    items, next_cursor = await list_reviews(query, limit)
+    return {"items": items, "next_cursor": next_cursor}
 
-    return { "projects": "ok" }
+@router.get("/api/reviews/export")
+async def export_review_history(
+    project_id: Optional[int] = None,
+    author: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    versions: bool = False,
+):
+    query = review_filter(project_id, None, author, created_from, created_to)
+    return StreamingResponse(export_reviews(query, versions), media_type="application/x-ndjson")
+
+@router.get("/api/reviews/{project_id}/{mr_iid}")
+async def get_review_detail(
+    project_id: int,
+    mr_iid: int,
+    versions: int = Query(1, ge=0, description="Number of latest versions to return, 0 for all"),
+):
+    review = await get_review(project_id, mr_iid, versions)
+    if review is None:
+        raise HTTPException(status_code=404, detail="Review not found")
+    return review
+
+@router.get("/api/projects")
+async def get_projects(
+    request: Request,
+    page: int = Query(1, ge=1),
+    per_page: int = Query(100, ge=1, le=100),
+    stream: bool = False,
+):
+    filters = _filters(request, PROJECT_FILTERS, membership="true", simple="true")
+    return await _listing("projects", gitlab_client.get_projects_page, filters, page, per_page, stream)
 
 @router.get("/api/merge-requests/{project_id}")
-async def get_merge_requests(project_id):
-    gitlab_client = GitLabClient()
-    mr_list = gitlab_client.get_mrs_by_project(project_id)
-    for mr in mr_list:
-        print(mr.iid)
-        print(mr.state)
+async def get_merge_requests(
+    request: Request,
+    project_id: int,
+    page: int = Query(1, ge=1),
+    per_page: int = Query(100, ge=1, le=100),
+    stream: bool = False,
+):
+    async def fetch(filters, page, per_page):
+        return await gitlab_client.get_mrs_page(project_id, filters, page, per_page)
 
-    return { "merge_requests": "ok" }
+    filters = _filters(request, MR_FILTERS, state="merged")
+    return await _listing(f"mrs:{project_id}", fetch, filters, page, per_page, stream)
 
 @router.get("/api/merge-requests/{project_id}/{mr_iid}/diff")
 async def get_diff(project_id, mr_iid):
-    gitlab_client = GitLabClient()
-    diffs = gitlab_client.get_mr_diff(project_id, mr_iid)
-    print(diffs)
+    diffs = await gitlab_client.get_mr_diff_full(project_id, mr_iid)
+    logger.debug("Fetched {count} diff files", count=len(diffs), project_id=project_id, mr_iid=mr_iid)
     return { "diffs": "ok" }
 @router.post("/api/knowledge", response_model=HealthResponse)
 async def knowledges(request: ReviewRequest):
@@ -1,9 +1,11 @@
 from pydantic import BaseModel
+from typing import List, Optional
 
 class WebhookPayload(BaseModel):
-    object_kind: str
-    project: dict
-    object_attributes: dict
+    object_kind: str = ""
+    event_name: str = ""
+    project: dict = {}
+    object_attributes: dict = {}
 
 class ReviewRequest(BaseModel):
     project_id: int
@@ -15,6 +17,15 @@ class ReviewResponse(BaseModel):
     project_id: int
     mr_iid: int
 
+class BackfillRequest(BaseModel):
+    project_ids: List[int]
+    concurrency: Optional[int] = None
+
+class BackfillResponse(BaseModel):
+    status: str
+    task_id: str
+    project_ids: List[int]
+
 class HealthResponse(BaseModel):
     api: str
     redis: str
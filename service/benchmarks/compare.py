@@ -0,0 +1,70 @@
+from typing import Any, Dict, Optional, Tuple
+import argparse
+import json
+import sys
+
+
+def _load(path: str) -> Dict[Tuple[str, int], Dict[str, Any]]:
+    with open(path) as f:
+        report = json.load(f)
+    return {(case["mode"], case["files"]): case for case in report["cases"]}
+
+
+def _change(before: Optional[float], after: Optional[float]) -> Optional[float]:
+    if not before or after is None:
+        return None
+    return (after - before) / before
+
+
+def _format(change: Optional[float]) -> str:
+    return "     n/a" if change is None else f"{change * 100:+7.1f}%"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two review benchmark reports")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--percentile", default="p95", choices=("p50", "p90", "p95", "p99"))
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=None,
+        help="exit non-zero when throughput drops or node latency grows by more than this fraction",
+    )
+    args = parser.parse_args()
+
+    baseline = _load(args.baseline)
+    candidate = _load(args.candidate)
+    regressions = []
+
+    for key in sorted(baseline.keys() & candidate.keys()):
+        before, after = baseline[key], candidate[key]
+        mode, files = key
+
+        throughput = _change(before["reviews_per_second"], after["reviews_per_second"])
+        print(
+            f"{mode} {files} files: {before['reviews_per_second']} -> {after['reviews_per_second']} "
+            f"reviews/s ({_format(throughput)})"
+        )
+        if throughput is not None and args.max_regression is not None and -throughput > args.max_regression:
+            regressions.append(f"{mode}/{files} throughput")
+
+        for node in sorted(before["nodes"].keys() & after["nodes"].keys()):
+            old = before["nodes"][node][args.percentile]
+            new = after["nodes"][node][args.percentile]
+            latency = _change(old, new)
+            print(f"  {node:<18} {args.percentile} {old:>9.4f}s -> {new:>9.4f}s {_format(latency)}")
+            if latency is not None and args.max_regression is not None and latency > args.max_regression:
+                regressions.append(f"{mode}/{files} {node}")
+
+    missing = sorted(baseline.keys() ^ candidate.keys())
+    if missing:
+        print(f"Cases present in only one report: {missing}")
+
+    if regressions:
+        print(f"Regressions beyond {args.max_regression:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+
+import httpx
+import numpy as np
+
+CHARS_PER_TOKEN = 4
+TOKENS_PER_EVENT = 4
+
+SOURCE_FILES = [
+    ("app/services/{name}.py", "    result_{n} = compute_{name}(payload, retries={n})"),
+    ("web/components/{name}.ts", "  const value{n} = await fetch{name}({{ retries: {n} }});"),
+    ("cmd/{name}/main.go", "\tvalue{n}, err := client.Fetch(ctx, \"{name}\", {n})"),
+    ("web/pages/{name}.vue", "    <span :key=\"{n}\">{{{{ {name}.value{n} }}}}</span>"),
+    ("db/queries/{name}.sql", "  AND {name}_id = {n}"),
+    ("docs/{name}.md", "Step {n}: configure `{name}` before deploying."),
+    ("config/{name}.conf", "{name}.limit.{n} = {n}"),
+]
+
+TRIAGED_FILES = [
+    "web/package-lock.json",
+    "api/proto/{name}_pb2.py",
+]
+
+WORDS = [
+    "cache", "invoice", "ledger", "router", "session", "billing", "audit", "report",
+    "search", "profile", "upload", "notify", "export", "schedule", "account", "metrics",
+]
+
+SUGGESTIONS = [
+    "Guard the new branch against an empty payload before dereferencing it.",
+    "Reuse the existing client instead of creating one per call.",
+    "Add an index for the new lookup column.",
+]
+
+FILE_HEADER = re.compile(r"^### FILE (\d+):", re.MULTILINE)
+PROJECT_PATH = re.compile(r"^/api/v4/projects/(?P<project>[^/]+)(?P<rest>/.*)?$")
+MR_PATH = re.compile(r"^/merge_requests/(?P<iid>\d+)(?P<rest>/.*)?$")
+
+
+def _digest(value: str) -> int:
+    return int(hashlib.sha256(value.encode("utf-8")).hexdigest()[:12], 16)
+
+
+def synthetic_file(project_id: int, mr_iid: int, index: int, diff_lines: int) -> Dict[str, Any]:
+    rng = random.Random(_digest(f"{project_id}:{mr_iid}:{index}"))
+    name = f"{rng.choice(WORDS)}_{index}"
+
+    if index % 20 in (18, 19):
+        path = TRIAGED_FILES[index % 20 - 18].format(name=name)
+        template = "+  \"{name}-{n}\": \"^1.{n}.0\","
+    else:
+        path_template, line_template = SOURCE_FILES[index % len(SOURCE_FILES)]
+        path = path_template.format(name=name)
+        template = "+" + line_template
+
+    lines = max(1, int(diff_lines * rng.uniform(0.2, 2.0)))
+    start = rng.randint(1, 400)
+    body = [f"@@ -{start},{lines // 4} +{start},{lines} @@ {mr_iid}"]
+    for n in range(lines):
+        if n % 4 == 3:
+            body.append("-" + template[1:].format(name=name, n=n + mr_iid))
+        body.append(template.format(name=name, n=n + mr_iid))
+
+    return {
+        "old_path": path,
+        "new_path": path,
+        "diff": "\n".join(body) + "\n",
+        "new_file": False,
+        "renamed_file": False,
+        "deleted_file": False,
+        "generated_file": False,
+    }
+
+
+class FakeGitLab:
+    def __init__(self, latency: float = 0.0, diff_lines: int = 40):
+        self.latency = latency
+        self.diff_lines = diff_lines
+        self.requests = 0
+        self.notes = 0
+        self._mrs: Dict[Tuple[str, int], int] = {}
+
+    def register_mr(self, project_id: int, mr_iid: int, files: int) -> None:
+        self._mrs[(str(project_id), mr_iid)] = files
+
+    def _version(self, project_id: str, mr_iid: int) -> Dict[str, Any]:
+        files = self._mrs[(project_id, mr_iid)]
+        sha = hashlib.sha1(f"{project_id}:{mr_iid}".encode("utf-8")).hexdigest()
+        return {
+            "id": mr_iid,
+            "head_commit_sha": sha,
+            "base_commit_sha": sha[::-1],
+            "start_commit_sha": sha[::-1],
+            "diffs": [
+                synthetic_file(int(project_id), mr_iid, i, self.diff_lines)
+                for i in range(files)
+            ],
+        }
+
+    def _route(self, method: str, path: str) -> Tuple[int, Any]:
+        match = PROJECT_PATH.match(path)
+        if not match:
+            return 404, {"message": "404 Not Found"}
+
+        project_id, rest = match["project"], match["rest"] or ""
+        if not rest:
+            return 200, {"id": int(project_id), "name": f"bench-project-{project_id}"}
+
+        match = MR_PATH.match(rest)
+        if not match or (project_id, int(match["iid"])) not in self._mrs:
+            return 404, {"message": "404 Not Found"}
+
+        mr_iid, rest = int(match["iid"]), match["rest"] or ""
+        if method == "POST" and rest in ("/notes", "/discussions"):
+            self.notes += 1
+            return 201, {"id": self.notes}
+        if rest == "":
+            return 200, {
+                "iid": mr_iid,
+                "title": f"Benchmark MR {mr_iid}",
+                "state": "opened",
+                "author": {"name": "Bench Author", "username": "bench"},
+                "source_branch": f"feature/bench-{mr_iid}",
+                "target_branch": "main",
+            }
+        if rest == "/versions":
+            return 200, [{"id": mr_iid}]
+        if rest == f"/versions/{mr_iid}":
+            return 200, self._version(project_id, mr_iid)
+        return 404, {"message": "404 Not Found"}
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        status, payload = self._route(request.method, request.url.path)
+        return httpx.Response(status, json=payload)
+
+
+class FakeLLM:
+    def __init__(self, ttft: float = 0.5, tokens_per_second: float = 50.0, output_tokens: int = 120):
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        self.output_tokens = output_tokens
+        self.stats = {
+            "requests": 0,
+            "streamed": 0,
+            "closed_early": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+        }
+
+    def _review(self, prompt: str) -> str:
+        suggestion = "LGTM"
+        choice = _digest(prompt) % 6
+        if choice < len(SUGGESTIONS):
+            suggestion = SUGGESTIONS[choice]
+
+        content = (
+            "SUMMARY: The change extends the existing flow and keeps error handling consistent. "
+            "Naming follows the surrounding module.\n"
+            f"SUGGESTION: {suggestion}\n"
+            "CONFIDENCE: high\n"
+            "REASON: Synthetic benchmark review.\n"
+        )
+        padding = self.output_tokens * CHARS_PER_TOKEN - len(content)
+        if padding > 0:
+            content += ("Additional notes follow. " * (padding // 25 + 1))[:padding]
+        return content
+
+    def content(self, messages: List[Dict[str, str]]) -> str:
+        prompt = "\n".join(m.get("content") or "" for m in messages)
+        files = FILE_HEADER.findall(prompt)
+        if files:
+            return "\n".join(f"{i}: python" for i in files)
+        return self._review(prompt)
+
+    def _pieces(self, content: str) -> List[str]:
+        size = CHARS_PER_TOKEN * TOKENS_PER_EVENT
+        return [content[i:i + size] for i in range(0, len(content), size)]
+
+    def _chunk(self, model: str, delta: Dict[str, Any], finish_reason: Optional[str] = None) -> bytes:
+        chunk = {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        return f"data: {json.dumps(chunk)}\n\n".encode("utf-8")
+
+    async def _stream(self, model: str, content: str, usage: Dict[str, int], include_usage: bool):
+        finished = False
+        try:
+            await asyncio.sleep(self.ttft)
+            yield self._chunk(model, {"role": "assistant", "content": ""})
+
+            for piece in self._pieces(content):
+                await asyncio.sleep(TOKENS_PER_EVENT / self.tokens_per_second)
+                self.stats["completion_tokens"] += TOKENS_PER_EVENT
+                yield self._chunk(model, {"content": piece})
+
+            yield self._chunk(model, {}, "stop")
+            if include_usage:
+                chunk = {
+                    "id": "chatcmpl-bench",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [],
+                    "usage": usage,
+                }
+                yield f"data: {json.dumps(chunk)}\n\n".encode("utf-8")
+            yield b"data: [DONE]\n\n"
+            finished = True
+        finally:
+            if not finished:
+                self.stats["closed_early"] += 1
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        if not request.url.path.endswith("/chat/completions"):
+            return httpx.Response(404, json={"error": {"message": "not found"}})
+
+        body = json.loads(request.content)
+        model = body.get("model", "bench-model")
+        content = self.content(body.get("messages", []))
+
+        prompt_tokens = sum(len(m.get("content") or "") for m in body.get("messages", [])) // CHARS_PER_TOKEN
+        completion_tokens = len(content) // CHARS_PER_TOKEN
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+        self.stats["requests"] += 1
+        self.stats["prompt_tokens"] += prompt_tokens
+
+        if body.get("stream"):
+            self.stats["streamed"] += 1
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            return httpx.Response(
+                200,
+                headers={"content-type": "text/event-stream"},
+                content=self._stream(model, content, usage, include_usage),
+            )
+
+        await asyncio.sleep(self.ttft + completion_tokens / self.tokens_per_second)
+        self.stats["completion_tokens"] += completion_tokens
+        return httpx.Response(200, json={
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        })
+
+
+class FakeEmbeddings:
+    def __init__(self, dimensions: int = 256, latency: float = 0.0):
+        self.dimensions = dimensions
+        self.latency = latency
+        self.requests = 0
+
+    def vector(self, text: str) -> List[float]:
+        rng = np.random.default_rng(_digest(text))
+        vector = rng.standard_normal(self.dimensions).astype(np.float32)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        body = json.loads(request.content)
+        texts = body.get("input", [])
+        if isinstance(texts, str):
+            texts = [texts]
+        return httpx.Response(200, json={"embeddings": [self.vector(t) for t in texts]})
@@ -0,0 +1,337 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from benchmarks.report import git_commit, percentiles
+
+MODES = ("workflow", "task")
+DEFAULT_PROFILES = "1,20,200"
+
+BENCH_PROJECT_ID = 4242
+
+REPORTED_SETTINGS = [
+    "LLM_STREAMING",
+    "LLM_ROUTING",
+    "LLM_REVIEW_CONCURRENCY",
+    "LLM_MAX_CONCURRENCY",
+    "LLM_LOCAL_CONCURRENCY",
+    "LLM_MAX_OUTPUT_TOKENS",
+    "REVIEW_CACHE_ENABLED",
+    "TRIAGE_ENABLED",
+    "EMBEDDING_BATCH_SIZE",
+    "RETRIEVAL_TOP_K",
+    "VECTOR_BACKEND",
+    "LOCAL_VECTOR_QUANTIZE",
+]
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    os.environ.update({
+        "GITLAB_URL": "http://gitlab.bench",
+        "GITLAB_TOKEN": "bench",
+        "OLLAMA_BASE_URL": "http://ollama.bench",
+        "LLM_BASE_URL": "http://llm.bench/v1",
+        "LLM_API_KEY": "bench",
+        "VECTOR_BACKEND": "local",
+        "LOCAL_VECTOR_PATH": tempfile.mkdtemp(prefix="botgo-bench-vectors-"),
+        "REDIS_URL": "redis://redis.bench:6379/0",
+        "MONGO_URI": "mongodb://mongo.bench:27017",
+    })
+    os.environ.setdefault("LLM_MODEL", "bench-model")
+    os.environ.setdefault("REVIEW_CACHE_ENABLED", "true" if args.review_cache else "false")
+
+
+class Harness:
+    def __init__(self, args: argparse.Namespace):
+        from benchmarks.fakes import FakeEmbeddings, FakeGitLab, FakeLLM
+
+        self.args = args
+        self.gitlab = FakeGitLab(latency=args.gitlab_latency, diff_lines=args.diff_lines)
+        self.llm = FakeLLM(
+            ttft=args.llm_ttft,
+            tokens_per_second=args.llm_tokens_per_second,
+            output_tokens=args.llm_output_tokens,
+        )
+        self.embeddings = FakeEmbeddings(dimensions=args.embedding_dim, latency=args.embedding_latency)
+        self.node_samples: Dict[str, List[float]] = {}
+        self._next_iid = 1
+
+    def _observe_node(self, name: str, elapsed: float) -> None:
+        self.node_samples.setdefault(name, []).append(elapsed)
+
+    async def _setup(self) -> None:
+        from beanie import init_beanie
+        from fakeredis import FakeAsyncRedis
+        from mongomock_motor import AsyncMongoMockClient
+        from openai import AsyncOpenAI
+        from config import settings
+        from db.models import BackfillCheckpoint, DiffBlob, Review
+        from infrastructure import gitlab_client, mongo, redis_client
+        from infrastructure.embeddings import embedding_service
+        from infrastructure.llm_router import BACKENDS
+        import httpx
+
+        loop = asyncio.get_running_loop()
+
+        gitlab_client._clients[loop] = httpx.AsyncClient(
+            base_url=gitlab_client.base_url,
+            transport=httpx.MockTransport(self.gitlab.handle),
+        )
+        embedding_service._clients[loop] = httpx.AsyncClient(
+            base_url=settings.OLLAMA_BASE_URL,
+            transport=httpx.MockTransport(self.embeddings.handle),
+        )
+        redis_client._clients[loop] = FakeAsyncRedis()
+
+        llm_client = AsyncOpenAI(
+            api_key="bench",
+            base_url=settings.LLM_BASE_URL,
+            max_retries=0,
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(self.llm.handle)),
+        )
+        for backend in BACKENDS.values():
+            backend._client = llm_client
+
+        mongo.client = AsyncMongoMockClient()
+        mongo.db = mongo.client[settings.MONGO_DB_NAME]
+        await init_beanie(database=mongo.db, document_models=[Review, BackfillCheckpoint, DiffBlob])
+
+    def start(self) -> None:
+        from infrastructure.metrics import add_node_observer
+        from tasks.runtime import runtime
+        from workflows import create_review_workflow
+
+        add_node_observer(self._observe_node)
+
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, name="bench-runtime-loop", daemon=True)
+        thread.start()
+        asyncio.run_coroutine_threadsafe(self._setup(), loop).result()
+
+        runtime.loop = loop
+        runtime.thread = thread
+        runtime.workflow = create_review_workflow()
+
+    def new_mr(self, files: int) -> int:
+        iid = self._next_iid
+        self._next_iid += 1
+        self.gitlab.register_mr(BENCH_PROJECT_ID, iid, files)
+        return iid
+
+    def _review_workflow(self, mr_iid: int) -> Optional[str]:
+        from infrastructure import gitlab_client
+        from tasks.runtime import runtime
+
+        async def run():
+            with gitlab_client.review_scope():
+                return await runtime.workflow.ainvoke({
+                    "project_id": BENCH_PROJECT_ID,
+                    "mr_iid": mr_iid,
+                    "generation": None,
+                    "diff": "",
+                    "similar_contexts": {},
+                    "review_summary": "",
+                    "suggestion": "",
+                    "error": None,
+                })
+
+        result = runtime.run(run())
+        return result.get("error")
+
+    def _review_task(self, mr_iid: int) -> Optional[str]:
+        from tasks import review_merge_request
+
+        result = review_merge_request.apply(args=(BENCH_PROJECT_ID, mr_iid))
+        if result.failed():
+            return repr(result.result)
+        return None
+
+    def review(self, mode: str, mr_iid: int) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            error = self._review_task(mr_iid) if mode == "task" else self._review_workflow(mr_iid)
+        except Exception as e:
+            error = repr(e)
+        return {"latency": time.perf_counter() - started, "error": error}
+
+    def drain_background(self) -> None:
+        from tasks.runtime import runtime
+        from workflows.review_workflow import _background_tasks
+
+        async def drain():
+            if _background_tasks:
+                await asyncio.gather(*list(_background_tasks), return_exceptions=True)
+
+        runtime.run(drain())
+
+    def run_case(self, mode: str, files: int) -> Dict[str, Any]:
+        args = self.args
+
+        for _ in range(args.warmup):
+            self.review(mode, self.new_mr(files))
+        self.drain_background()
+
+        self.node_samples.clear()
+        llm_before = dict(self.llm.stats)
+        mrs = [self.new_mr(files) for _ in range(args.reviews)]
+
+        if args.trace_memory:
+            tracemalloc.start()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(lambda iid: self.review(mode, iid), mrs))
+        elapsed = time.perf_counter() - started
+
+        python_peak = None
+        if args.trace_memory:
+            python_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        self.drain_background()
+
+        errors = [r["error"] for r in results if r["error"]]
+        completed = len(results) - len(errors)
+
+        return {
+            "mode": mode,
+            "files": files,
+            "reviews": len(results),
+            "concurrency": args.concurrency,
+            "errors": len(errors),
+            "error_samples": errors[:3],
+            "elapsed_seconds": round(elapsed, 4),
+            "reviews_per_second": round(completed / elapsed, 4) if elapsed else None,
+            "review_latency": percentiles([r["latency"] for r in results]),
+            "nodes": {name: percentiles(samples) for name, samples in sorted(self.node_samples.items())},
+            "llm": {key: self.llm.stats[key] - llm_before[key] for key in self.llm.stats},
+            "memory": {
+                "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+                "python_peak_mb": round(python_peak / (1024 * 1024), 1) if python_peak is not None else None,
+            },
+        }
+
+
+def run_single_case(args: argparse.Namespace) -> Dict[str, Any]:
+    configure_environment(args)
+
+    mode, files = args.case.split(":")
+    harness = Harness(args)
+    harness.start()
+
+    from loguru import logger
+
+    logger.remove()
+    logger.add(sys.stderr, level=args.log_level)
+
+    result = harness.run_case(mode, int(files))
+
+    from config import settings
+
+    result["settings"] = {name: getattr(settings, name) for name in REPORTED_SETTINGS}
+    return result
+
+
+def _summary_line(case: Dict[str, Any]) -> str:
+    latency = case["review_latency"]
+    return (
+        f"{case['mode']:>8} {case['files']:>4} files  "
+        f"{case['reviews_per_second'] or 0:>8.3f} reviews/s  "
+        f"p50 {latency['p50'] or 0:>7.3f}s  p99 {latency['p99'] or 0:>7.3f}s  "
+        f"rss {case['memory']['peak_rss_mb']:>7.1f}MB  errors {case['errors']}"
+    )
+
+
+def run_suite(args: argparse.Namespace) -> Dict[str, Any]:
+    profiles = [int(p) for p in args.profiles.split(",") if p.strip()]
+    modes = MODES if args.mode == "both" else (args.mode,)
+
+    cases = []
+    for mode in modes:
+        for files in profiles:
+            with tempfile.NamedTemporaryFile(suffix=".json") as output:
+                subprocess.run(
+                    [
+                        sys.executable, "-m", "benchmarks.review_bench",
+                        *sys.argv[1:],
+                        "--case", f"{mode}:{files}",
+                        "--case-output", output.name,
+                    ],
+                    check=True,
+                )
+                case = json.load(open(output.name))
+            cases.append(case)
+            print(_summary_line(case), file=sys.stderr)
+
+    return {
+        "benchmark": "review",
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "reviews": args.reviews,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "diff_lines": args.diff_lines,
+            "llm_ttft": args.llm_ttft,
+            "llm_tokens_per_second": args.llm_tokens_per_second,
+            "llm_output_tokens": args.llm_output_tokens,
+            "gitlab_latency": args.gitlab_latency,
+            "embedding_latency": args.embedding_latency,
+            "embedding_dim": args.embedding_dim,
+        },
+        "cases": cases,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline benchmark of the MR review pipeline against fake services")
+    parser.add_argument("--profiles", default=DEFAULT_PROFILES, help="comma separated files-per-MR profiles")
+    parser.add_argument("--mode", choices=(*MODES, "both"), default="both")
+    parser.add_argument("--reviews", type=int, default=5, help="measured reviews per profile")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=1, help="reviews in flight at once")
+    parser.add_argument("--diff-lines", type=int, default=40, help="average added lines per file")
+    parser.add_argument("--llm-ttft", type=float, default=0.5, help="seconds before the first token")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--llm-output-tokens", type=int, default=120)
+    parser.add_argument("--gitlab-latency", type=float, default=0.02)
+    parser.add_argument("--embedding-latency", type=float, default=0.01)
+    parser.add_argument("--embedding-dim", type=int, default=256)
+    parser.add_argument("--review-cache", action="store_true", help="keep the Redis review cache enabled")
+    parser.add_argument("--trace-memory", action="store_true", help="also report the tracemalloc peak (slower)")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    parser.add_argument("--case-output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        result = run_single_case(args)
+        with open(args.case_output, "w") as f:
+            json.dump(result, f)
+        os._exit(0)
+
+    report = json.dumps(run_suite(args), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import sys
+import time
+
+from benchmarks.report import git_commit, percentiles
+
+MR_ACTIONS = ("open", "update", "close", "merge", "reopen", "approved")
+OTHER_KINDS = ("push", "note", "pipeline")
+DEFAULT_MIX = "open=2,update=5,close=1,merge=1,approved=1,other=2"
+
+MR_STATES = {"close": "closed", "merge": "merged"}
+
+WEBHOOK_PATH = "/api/webhook"
+
+
+def parse_mix(raw: str) -> List[Tuple[str, float]]:
+    mix = []
+    for part in raw.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in MR_ACTIONS and name != "other":
+            raise ValueError(f"Unknown event '{name}', expected one of {(*MR_ACTIONS, 'other')}")
+        mix.append((name, float(weight or 1)))
+    return mix
+
+
+def _sha(*parts: Any) -> str:
+    return hashlib.sha1(":".join(map(str, parts)).encode("utf-8")).hexdigest()
+
+
+def _project(project_id: int) -> Dict[str, Any]:
+    path = f"bench/service-{project_id}"
+    return {
+        "id": project_id,
+        "name": f"service-{project_id}",
+        "description": "Load test project",
+        "web_url": f"https://gitlab.example.com/{path}",
+        "git_ssh_url": f"git@gitlab.example.com:{path}.git",
+        "git_http_url": f"https://gitlab.example.com/{path}.git",
+        "namespace": "bench",
+        "visibility_level": 0,
+        "path_with_namespace": path,
+        "default_branch": "main",
+    }
+
+
+def _user(user_id: int) -> Dict[str, Any]:
+    return {
+        "id": user_id,
+        "name": f"Load Tester {user_id}",
+        "username": f"load-{user_id}",
+        "avatar_url": None,
+        "email": "[REDACTED]",
+    }
+
+
+def merge_request_payload(
+    project_id: int,
+    mr_iid: int,
+    action: str,
+    description_bytes: int,
+) -> Dict[str, Any]:
+    now = datetime.now(timezone.utc)
+    head = _sha(project_id, mr_iid, now.timestamp())
+    attributes = {
+        "id": project_id * 100_000 + mr_iid,
+        "iid": mr_iid,
+        "title": f"Load test MR {mr_iid}",
+        "description": ("Refactors the request pipeline. " * (description_bytes // 33 + 1))[:description_bytes],
+        "source_branch": f"feature/load-{mr_iid}",
+        "target_branch": "main",
+        "source_project_id": project_id,
+        "target_project_id": project_id,
+        "author_id": mr_iid % 50,
+        "assignee_ids": [],
+        "reviewer_ids": [],
+        "state": MR_STATES.get(action, "opened"),
+        "merge_status": "can_be_merged",
+        "draft": False,
+        "work_in_progress": False,
+        "created_at": (now - timedelta(hours=2)).strftime("%Y-%m-%d %H:%M:%S UTC"),
+        "updated_at": now.strftime("%Y-%m-%d %H:%M:%S UTC"),
+        "url": f"https://gitlab.example.com/bench/service-{project_id}/-/merge_requests/{mr_iid}",
+        "action": action,
+        "last_commit": {
+            "id": head,
+            "message": "Apply review feedback",
+            "timestamp": now.isoformat(),
+            "author": {"name": "Load Tester", "email": "[REDACTED]"},
+        },
+        "labels": [],
+    }
+    if action == "update":
+        attributes["oldrev"] = _sha(project_id, mr_iid, "previous")
+
+    return {
+        "object_kind": "merge_request",
+        "event_type": "merge_request",
+        "user": _user(mr_iid % 50),
+        "project": _project(project_id),
+        "repository": {"name": f"service-{project_id}", "url": _project(project_id)["git_ssh_url"]},
+        "object_attributes": attributes,
+        "labels": [],
+        "changes": {"updated_at": {"previous": None, "current": attributes["updated_at"]}},
+    }
+
+
+def other_payload(kind: str, project_id: int, mr_iid: int) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {
+        "object_kind": kind,
+        "event_name": kind,
+        "user": _user(mr_iid % 50),
+        "project": _project(project_id),
+    }
+    if kind == "push":
+        payload.update({
+            "ref": f"refs/heads/feature/load-{mr_iid}",
+            "before": _sha(project_id, mr_iid, "before"),
+            "after": _sha(project_id, mr_iid, "after"),
+            "commits": [{"id": _sha(project_id, mr_iid, "after"), "message": "wip"}],
+            "total_commits_count": 1,
+        })
+    elif kind == "note":
+        payload["object_attributes"] = {"id": mr_iid, "note": "Looks good", "noteable_type": "MergeRequest"}
+        payload["merge_request"] = {"iid": mr_iid}
+    else:
+        payload["object_attributes"] = {"id": mr_iid, "status": "success", "ref": f"feature/load-{mr_iid}"}
+    return payload
+
+
+class PayloadFactory:
+    def __init__(self, mix: List[Tuple[str, float]], projects: int, mrs: int, description_bytes: int, seed: int):
+        self.names = [name for name, _ in mix]
+        self.weights = [weight for _, weight in mix]
+        self.projects = projects
+        self.mrs = mrs
+        self.description_bytes = description_bytes
+        self.rng = random.Random(seed)
+
+    def next(self) -> Tuple[str, Dict[str, Any]]:
+        name = self.rng.choices(self.names, self.weights)[0]
+        project_id = 1000 + self.rng.randrange(self.projects)
+        mr_iid = 1 + self.rng.randrange(self.mrs)
+
+        if name == "other":
+            kind = self.rng.choice(OTHER_KINDS)
+            return kind, other_payload(kind, project_id, mr_iid)
+        return name, merge_request_payload(project_id, mr_iid, name, self.description_bytes)
+
+
+def broker_messages(queues: List[str]) -> Optional[int]:
+    from tasks import celery_app
+
+    try:
+        with celery_app.connection_for_write() as connection:
+            channel = connection.default_channel
+            total = 0
+            for queue in queues:
+                try:
+                    total += channel.queue_declare(queue=queue, passive=True).message_count
+                except connection.channel_errors:
+                    channel = connection.channel()
+            return total
+    except Exception as e:
+        print(f"Could not read broker queue depth: {e!r}", file=sys.stderr)
+        return None
+
+
+def in_process_app():
+    from fastapi import FastAPI
+    from api import router
+    from tasks import celery_app
+
+    celery_app.conf.update(broker_url="memory://", result_backend="cache+memory://")
+
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+class LoadRun:
+    def __init__(self, factory: PayloadFactory):
+        self.factory = factory
+        self.latencies: Dict[str, List[float]] = {}
+        self.statuses: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.max_lag_ms = 0.0
+
+    async def send(self, client, label: str, payload: Dict[str, Any], scheduled_at: float) -> None:
+        try:
+            response = await client.post(WEBHOOK_PATH, json=payload)
+        except Exception as e:
+            self.errors[type(e).__name__] += 1
+            self.statuses["exception"] += 1
+            return
+        finally:
+            self.latencies.setdefault(label, []).append((time.perf_counter() - scheduled_at) * 1000)
+
+        if response.status_code >= 400:
+            self.errors[f"http_{response.status_code}"] += 1
+            self.statuses[f"http_{response.status_code}"] += 1
+            return
+
+        self.statuses[response.json().get("status", "unknown")] += 1
+
+    async def warm_up(self, client, requests: int) -> None:
+        for _ in range(requests):
+            _, payload = self.factory.next()
+            await client.post(WEBHOOK_PATH, json=payload)
+
+    async def run(self, client, rate: float, duration: float, poisson: bool) -> float:
+        pending = set()
+        started = time.perf_counter()
+        offset = 0.0
+
+        while offset < duration:
+            scheduled_at = started + offset
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                self.max_lag_ms = max(self.max_lag_ms, -delay * 1000)
+
+            label, payload = self.factory.next()
+            task = asyncio.create_task(self.send(client, label, payload, scheduled_at))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+            offset += random.expovariate(rate) if poisson else 1 / rate
+
+        if pending:
+            await asyncio.gather(*pending)
+        return time.perf_counter() - started
+
+
+async def run_load(args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+    from config import settings
+
+    factory = PayloadFactory(parse_mix(args.mix), args.projects, args.mrs, args.description_bytes, args.seed)
+    load = LoadRun(factory)
+    queues = settings.METRICS_CELERY_QUEUES
+
+    if args.url:
+        client = httpx.AsyncClient(
+            base_url=args.url,
+            timeout=args.timeout,
+            limits=httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections),
+        )
+    else:
+        from fakeredis import FakeAsyncRedis
+        from infrastructure import redis_client
+
+        redis_client._clients[asyncio.get_running_loop()] = FakeAsyncRedis()
+        client = httpx.AsyncClient(
+            base_url="http://botgo.bench",
+            timeout=args.timeout,
+            transport=httpx.ASGITransport(app=in_process_app()),
+        )
+
+    from loguru import logger
+
+    logger.remove()
+    logger.add(sys.stderr, level=args.log_level)
+
+    async with client:
+        await load.warm_up(client, args.warmup)
+        before = await asyncio.to_thread(broker_messages, queues) if args.count_broker else None
+        elapsed = await load.run(client, args.rate, args.duration, args.poisson)
+
+    after = await asyncio.to_thread(broker_messages, queues) if args.count_broker else None
+
+    samples = [value for values in load.latencies.values() for value in values]
+    total = len(samples)
+    errors = sum(load.errors.values())
+    latency = percentiles(samples)
+    budget_ms = args.budget_ms if args.budget_ms is not None else settings.WEBHOOK_LATENCY_BUDGET_MS
+
+    violations = []
+    if latency["p99"] is not None and latency["p99"] > budget_ms:
+        violations.append(f"p99 {latency['p99']:.1f}ms exceeds the {budget_ms:.0f}ms budget")
+    if total and errors / total > args.max_error_rate:
+        violations.append(f"error rate {errors / total:.2%} exceeds {args.max_error_rate:.2%}")
+
+    return {
+        "benchmark": "webhook",
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "target": args.url or "in-process",
+        "config": {
+            "rate": args.rate,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "poisson": args.poisson,
+            "mix": args.mix,
+            "projects": args.projects,
+            "mrs": args.mrs,
+            "description_bytes": args.description_bytes,
+        },
+        "requests": total,
+        "elapsed_seconds": round(elapsed, 3),
+        "achieved_rate": round(total / elapsed, 2) if elapsed else None,
+        "max_schedule_lag_ms": round(load.max_lag_ms, 2),
+        "latency_ms": latency,
+        "latency_ms_by_event": {label: percentiles(values) for label, values in sorted(load.latencies.items())},
+        "statuses": dict(load.statuses),
+        "errors": dict(load.errors),
+        "error_rate": round(errors / total, 6) if total else 0.0,
+        "enqueued": load.statuses["queued"],
+        "enqueue_per_second": round(load.statuses["queued"] / elapsed, 2) if elapsed else None,
+        "broker_messages": after - before if before is not None and after is not None else None,
+        "budget": {
+            "p99_ms": budget_ms,
+            "max_error_rate": args.max_error_rate,
+            "passed": not violations,
+            "violations": violations,
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay GitLab webhooks against /api/webhook and check the latency budget")
+    parser.add_argument("--url", help="base URL of a running API; defaults to an in-process app with fake Redis")
+    parser.add_argument("--rate", type=float, default=200.0, help="webhooks per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load")
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured requests sent before the load starts")
+    parser.add_argument("--poisson", action="store_true", help="exponential inter-arrival times instead of a fixed rate")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"event weights, e.g. {DEFAULT_MIX}")
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--mrs", type=int, default=200, help="distinct MR iids per project")
+    parser.add_argument("--description-bytes", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--connections", type=int, default=200)
+    parser.add_argument("--budget-ms", type=float, default=None, help="p99 budget, defaults to WEBHOOK_LATENCY_BUDGET_MS")
+    parser.add_argument("--max-error-rate", type=float, default=0.0)
+    parser.add_argument("--no-broker-count", dest="count_broker", action="store_false")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_load(args))
+
+    report = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+    latency = result["latency_ms"]
+    print(
+        f"{result['requests']} webhooks at {result['achieved_rate']}/s: "
+        f"p50 {latency['p50']}ms p99 {latency['p99']}ms, "
+        f"{result['enqueue_per_second']} enqueued/s, error rate {result['error_rate']:.2%}",
+        file=sys.stderr,
+    )
+    if not result["budget"]["passed"]:
+        for violation in result["budget"]["violations"]:
+            print(f"FAIL: {violation}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
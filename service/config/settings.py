@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
@@ -10,20 +10,114 @@ class Settings(BaseSettings):
 
     GITLAB_URL: str = "https://gitlab.com"
     GITLAB_TOKEN: str = ""
+    GITLAB_TIMEOUT: float = 30.0
+    GITLAB_CONNECT_TIMEOUT: float = 5.0
+    GITLAB_MAX_CONNECTIONS: int = 20
+    GITLAB_MAX_RETRIES: int = 3
+    GITLAB_RETRY_BACKOFF: float = 0.5
+    GITLAB_CACHE_TTL: float = 60.0
+    GITLAB_CACHE_MAX_ENTRIES: int = 512
+    GITLAB_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    LISTING_CACHE_TTL: float = 300.0
 
     REDIS_URL: str = "redis://localhost:6379/0"
 
     OLLAMA_BASE_URL: str = "http://localhost:11434"
     OLLAMA_EMBEDDING_MODEL: str = "embeddinggemma:latest"
     OLLAMA_LLM_MODEL: str = "gemma3:27b"
+    OLLAMA_CONTEXT_WINDOW: int = 4096
+
+    EMBEDDING_BATCH_SIZE: int = 64
+    EMBEDDING_CONCURRENCY: int = 4
+    EMBEDDING_TIMEOUT: float = 60.0
+    EMBEDDING_CACHE_SIZE: int = 10_000
+    EMBEDDING_REDIS_CACHE: bool = True
+    EMBEDDING_CACHE_TTL: int = 30 * 24 * 3600
 
     WEAVIATE_URL: str = "http://localhost:8888"
     WEAVIATE_API_KEY: Optional[str] = None
     WEAVIATE_COLLECTION: str = "CodeContexts"
+    WEAVIATE_GRPC_PORT: int = 50051
+
+    VECTOR_BACKEND: str = "weaviate"
+    LOCAL_VECTOR_PATH: str = "./data/vectors"
+    LOCAL_VECTOR_QUANTIZE: bool = False
+
+    RETRIEVAL_TOP_K: int = 3
+    RETRIEVAL_PER_HUNK_LIMIT: int = 3
+    RETRIEVAL_MAX_HUNKS: int = 64
+    RETRIEVAL_HUNK_TOKENS: int = 512
+
+    BACKFILL_CONCURRENCY: int = 4
+    BACKFILL_PAGE_SIZE: int = 50
+    BACKFILL_QUEUE_PAGES: int = 2
 
     LLM_BASE_URL: str = ""
     LLM_API_KEY: str = ""
     LLM_MODEL: str = ""
+    LLM_REVIEW_CONCURRENCY: int = 8
+    LLM_FILE_TIMEOUT: float = 120.0
+    LLM_CONTEXT_WINDOW: int = 32768
+    LLM_MAX_OUTPUT_TOKENS: int = 512
+    LLM_CONTEXT_TOKENS: int = 200
+    LLM_CHUNK_MAX_TOKENS: int = 6000
+    LLM_STREAMING: bool = True
+    LLM_RPS: float = 0.0
+    LLM_TPM: int = 0
+    LLM_INTERACTIVE_RESERVE: float = 0.2
+    LLM_MAX_CONCURRENCY: int = 16
+    LLM_MIN_CONCURRENCY: int = 1
+    LLM_LATENCY_TARGET: float = 60.0
+    LLM_BACKOFF_INTERVAL: float = 2.0
+    LLM_MAX_RETRIES: int = 4
+    LLM_RETRY_BACKOFF: float = 1.0
+    LLM_REMOTE_INPUT_COST_PER_1K: float = 0.0
+    LLM_REMOTE_OUTPUT_COST_PER_1K: float = 0.0
+
+    LLM_LOCAL_CONCURRENCY: int = 2
+    LLM_LOCAL_INPUT_COST_PER_1K: float = 0.0
+    LLM_LOCAL_OUTPUT_COST_PER_1K: float = 0.0
+
+    LLM_ROUTING: str = "remote"
+    LLM_CLASSIFY_BACKEND: str = "remote"
+    LLM_ROUTE_LOCAL_MAX_SCORE: float = 40.0
+    LLM_ROUTE_DELETION_WEIGHT: float = 0.25
+    LLM_ROUTE_STACK_WEIGHTS: Dict[str, float] = {
+        "docs": 0.2,
+        "frontend-ts": 1.0,
+        "vue": 1.0,
+        "nuxt": 1.2,
+        "python": 1.0,
+        "golang": 1.2,
+        "devops": 1.5,
+        "data-sql": 2.0,
+    }
+
+    REVIEW_SETTLE_SECONDS: int = 20
+    REVIEW_LOCK_TTL: int = 900
+    REVIEW_LOCK_RETRY_SECONDS: int = 15
+    REVIEW_LOCK_MAX_RETRIES: int = 120
+    REVIEW_GENERATION_TTL: int = 30 * 24 * 3600
+
+    REVIEW_QUEUE: str = "celery"
+    REVIEW_INTERACTIVE_QUEUE: str = "interactive"
+
+    REVIEW_PROGRESS_TTL: int = 24 * 3600
+    REVIEW_PROGRESS_MAX_EVENTS: int = 5000
+    REVIEW_EVENTS_KEEPALIVE_SECONDS: float = 15.0
+    REVIEW_EVENTS_IDLE_TIMEOUT_SECONDS: float = 600.0
+
+    TRIAGE_ENABLED: bool = True
+    TRIAGE_PROJECT_RULES: Dict[str, Dict[str, List[str]]] = {}
+
+    REVIEW_CACHE_ENABLED: bool = True
+    REVIEW_CACHE_TTL: int = 14 * 24 * 3600
+    REVIEW_CACHE_MAX_ENTRIES: int = 100_000
+
+    WEBHOOK_LATENCY_BUDGET_MS: float = 250.0
+
+    METRICS_WORKER_PORT: int = 9100
+    METRICS_CELERY_QUEUES: List[str] = ["celery", "interactive"]
 
     APP_NAME: str = "BotGo"
     APP_VERSION: str = "1.0.0"
@@ -37,5 +131,7 @@ class Settings(BaseSettings):
 
     MONGO_URI:str = "mongodb://localhost:27017"
     MONGO_DB_NAME:str = "botgo"
+    REVIEW_DEDUP_ON_STARTUP: bool = True
+    DIFF_ZSTD_LEVEL: int = 9
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,89 @@
+from typing import Any, Dict, List
+from config import settings
+from loguru import logger
+
+# Reviews written before the project_mr_unique index existed could hold
+# several documents per (project_id, mr_iid), and init_beanie cannot build a
+# unique index over them. connect_to_mongo runs this before init_beanie:
+#
+# - once the index exists it returns immediately, so it is a no-op after the
+#   first successful start;
+# - with REVIEW_DEDUP_ON_STARTUP (default) every duplicate is folded into the
+#   oldest document of its key: its versions are appended in created_at order
+#   and the duplicate is deleted. Each merge is guarded by `merged_from`, so
+#   processes starting at the same time, or a restart after a crash, never
+#   append the same versions twice;
+# - with REVIEW_DEDUP_ON_STARTUP=false the conflicting keys are logged and
+#   startup fails, for operators who want to inspect or merge them by hand.
+#
+# Rolling out: deploy a single API instance first and let it build the
+# index, then scale up the API and the workers.
+
+REVIEWS = "reviews"
+UNIQUE_INDEX = "project_mr_unique"
+
+DUPLICATES_PIPELINE = [
+    {
+        "$group": {
+            "_id": {"project_id": "$project_id", "mr_iid": "$mr_iid"},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1},
+        }
+    },
+    {"$match": {"count": {"$gt": 1}}},
+]
+
+
+async def duplicate_reviews(db) -> List[Dict[str, Any]]:
+    cursor = db[REVIEWS].aggregate(DUPLICATES_PIPELINE, allowDiskUse=True)
+    return [group async for group in cursor]
+
+
+async def merge_duplicate_reviews(db) -> int:
+    reviews = db[REVIEWS]
+    if UNIQUE_INDEX in await reviews.index_information():
+        return 0
+
+    groups = await duplicate_reviews(db)
+    if not groups:
+        return 0
+
+    if not settings.REVIEW_DEDUP_ON_STARTUP:
+        for group in groups:
+            logger.error(
+                "Duplicate reviews for project {project_id} MR {mr_iid}",
+                **group["_id"],
+                ids=[str(i) for i in group["ids"]],
+            )
+        raise RuntimeError(
+            f"{len(groups)} (project_id, mr_iid) keys have duplicate reviews, "
+            f"the {UNIQUE_INDEX} index cannot be built; merge them or set REVIEW_DEDUP_ON_STARTUP=true"
+        )
+
+    merged = 0
+    for group in groups:
+        keeper, *duplicates = sorted(group["ids"])
+        for duplicate_id in duplicates:
+            duplicate = await reviews.find_one({"_id": duplicate_id}, projection={"versions": 1, "updated_at": 1})
+            if duplicate is None:
+                continue
+
+            update: Dict[str, Any] = {
+                "$push": {"versions": {"$each": duplicate.get("versions", []), "$sort": {"created_at": 1}}},
+                "$addToSet": {"merged_from": duplicate_id},
+            }
+            if duplicate.get("updated_at"):
+                update["$max"] = {"updated_at": duplicate["updated_at"]}
+
+            await reviews.update_one({"_id": keeper, "merged_from": {"$ne": duplicate_id}}, update)
+            await reviews.delete_one({"_id": duplicate_id})
+            merged += 1
+
+        logger.warning(
+            "Merged {count} duplicate reviews of project {project_id} MR {mr_iid}",
+            count=len(duplicates),
+            keeper=str(keeper),
+            **group["_id"],
+        )
+
+    return merged
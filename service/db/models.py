@@ -1,12 +1,39 @@
 from beanie import Document, PydanticObjectId, before_event, Insert, Replace
 from pydantic import Field, BaseModel
-from typing import List
+from typing import Any, Dict, List, Optional
 from datetime import datetime
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+class FileReview(BaseModel):
+    path: str
+    diff_hash: str
+    stacks: List[str] = Field(default_factory=list)
+    summary: Optional[str] = None
+    suggestion: Optional[str] = None
+    ref: Optional[int] = None
+
+class TriagedFile(BaseModel):
+    path: str
+    action: str
+    reason: Optional[str] = None
+    summary: Optional[str] = None
 
 class ReviewVersion(BaseModel):
     summary: str
     suggestions: str
 
+    head_sha: Optional[str] = None
+    diff_version_id: Optional[int] = None
+    files: List[FileReview] = Field(default_factory=list)
+    reviewed_files: int = 0
+    reused_files: int = 0
+    failed_files: List[str] = Field(default_factory=list)
+    diff_hash: Optional[str] = None
+    skipped_files: List[TriagedFile] = Field(default_factory=list)
+    retrieval: Optional[Dict[str, Any]] = None
+
+    created_at: datetime = Field(default_factory=datetime.now)
+
 class Review(Document):
     id: PydanticObjectId = Field(default_factory=PydanticObjectId)
 
@@ -15,10 +42,13 @@ class Review(Document):
     project_name: str
     mr_iid: int
     author: str
-    diff: str
+    diff: Optional[str] = None
+    diff_hash: Optional[str] = None
+    pending_diff: Optional[Dict[str, Any]] = None
     source_branch: str
     target_branch: str
     versions: List[ReviewVersion]
+    version_count: Optional[int] = None
 
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
@@ -33,3 +63,40 @@ class Review(Document):
 
     class Settings:
         name = "reviews"
+        indexes = [
+            IndexModel(
+                [("project_id", ASCENDING), ("mr_iid", ASCENDING)],
+                name="project_mr_unique",
+                unique=True,
+            ),
+            IndexModel([("project_id", ASCENDING), ("_id", DESCENDING)], name="project_recent"),
+            IndexModel([("author", ASCENDING), ("_id", DESCENDING)], name="author_recent"),
+        ]
+
+
+class DiffBlob(Document):
+    id: str
+    codec: str
+    size: int
+    data: bytes
+
+    created_at: datetime = Field(default_factory=datetime.now)
+
+    class Settings:
+        name = "diff_blobs"
+
+
+class BackfillCheckpoint(Document):
+    project_id: int
+    cursor_created_at: Optional[str] = None
+    cursor_iids: List[int] = Field(default_factory=list)
+    failed_iids: List[int] = Field(default_factory=list)
+    processed: int = 0
+    failed: int = 0
+    indexed_hunks: int = 0
+    status: str = "pending"
+
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+    class Settings:
+        name = "backfill_checkpoints"
@@ -0,0 +1,173 @@
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from bson import ObjectId
+from bson.errors import InvalidId
+from db.models import Review
+import asyncio
+import json
+
+EXPORT_BATCH_SIZE = 500
+
+SUMMARY_FIELDS = [
+    "project_id",
+    "project_name",
+    "mr_iid",
+    "mr_title",
+    "author",
+    "source_branch",
+    "target_branch",
+    "diff_hash",
+    "created_at",
+    "updated_at",
+]
+
+LIST_PROJECTION = {
+    **{field: 1 for field in SUMMARY_FIELDS},
+    "version_count": {"$size": {"$ifNull": ["$versions", []]}},
+    "latest_version": {
+        "$let": {
+            "vars": {"v": {"$arrayElemAt": ["$versions", -1]}},
+            "in": {
+                "summary": "$$v.summary",
+                "suggestions": "$$v.suggestions",
+                "head_sha": "$$v.head_sha",
+                "reviewed_files": "$$v.reviewed_files",
+                "reused_files": "$$v.reused_files",
+                "created_at": "$$v.created_at",
+            },
+        },
+    },
+}
+
+
+def _object_id(value: str) -> ObjectId:
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        raise ValueError(f"Invalid cursor: {value}")
+
+
+def review_filter(
+    project_id: Optional[int] = None,
+    mr_iid: Optional[int] = None,
+    author: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    conditions: List[Dict[str, Any]] = []
+
+    if project_id is not None:
+        conditions.append({"project_id": project_id})
+    if mr_iid is not None:
+        conditions.append({"mr_iid": mr_iid})
+    if author:
+        conditions.append({"author": author})
+
+    if created_from:
+        conditions.append({"_id": {"$gte": ObjectId.from_datetime(created_from)}})
+    if created_to:
+        conditions.append({"_id": {"$lt": ObjectId.from_datetime(created_to)}})
+    if cursor:
+        conditions.append({"_id": {"$lt": _object_id(cursor)}})
+
+    if not conditions:
+        return {}
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
+
+def _resolve_refs(versions: List[Dict[str, Any]], origins: Dict[int, List[Dict[str, Any]]]) -> None:
+    for version in versions:
+        files = []
+        for file in version.get("files", []):
+            ref = file.get("ref")
+            if ref is not None:
+                origin = next((f for f in origins.get(ref, []) if f["path"] == file["path"]), None)
+                file = {**origin, "ref": ref} if origin else file
+            files.append(file)
+        version["files"] = files
+
+
+async def _version_files(review_id: Any, index: int) -> List[Dict[str, Any]]:
+    document = await Review.get_motor_collection().find_one(
+        {"_id": review_id},
+        projection={"project_id": 1, "versions": {"$slice": [index, 1]}},
+    )
+    versions = (document or {}).get("versions") or []
+    return versions[0].get("files", []) if versions else []
+
+
+async def resolve_file_refs(review_id: Any, versions: List[Dict[str, Any]]) -> None:
+    refs = sorted({
+        f["ref"] for v in versions for f in v.get("files", []) if f.get("ref") is not None
+    })
+    files = await asyncio.gather(*(_version_files(review_id, ref) for ref in refs))
+    _resolve_refs(versions, dict(zip(refs, files)))
+
+
+async def version_count(review_id: Any) -> int:
+    documents = await Review.get_motor_collection().aggregate([
+        {"$match": {"_id": review_id}},
+        {"$project": {"count": {"$size": {"$ifNull": ["$versions", []]}}}},
+    ]).to_list(length=1)
+    return documents[0]["count"] if documents else 0
+
+
+def _serialize(document: Dict[str, Any]) -> Dict[str, Any]:
+    document["id"] = str(document.pop("_id"))
+    return document
+
+
+async def list_reviews(query: Dict[str, Any], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    pipeline = [
+        {"$match": query},
+        {"$sort": {"_id": -1}},
+        {"$limit": limit + 1},
+        {"$project": LIST_PROJECTION},
+    ]
+
+    documents = await Review.get_motor_collection().aggregate(pipeline).to_list(length=limit + 1)
+
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = str(documents[-1]["_id"])
+
+    return [_serialize(d) for d in documents], next_cursor
+
+
+async def get_review(project_id: int, mr_iid: int, versions: int) -> Optional[Dict[str, Any]]:
+    projection: Dict[str, Any] = {"diff": 0, "pending_diff": 0}
+    if versions > 0:
+        projection["versions"] = {"$slice": -versions}
+
+    document = await Review.get_motor_collection().find_one(
+        {"project_id": project_id, "mr_iid": mr_iid},
+        projection=projection,
+    )
+    if document is None:
+        return None
+
+    await resolve_file_refs(document["_id"], document.get("versions", []))
+    return _serialize(document)
+
+
+async def export_reviews(query: Dict[str, Any], versions: bool) -> AsyncIterator[str]:
+    projection: Dict[str, Any] = (
+        {"diff": 0, "pending_diff": 0} if versions else {field: 1 for field in SUMMARY_FIELDS}
+    )
+
+    cursor = (
+        Review.get_motor_collection()
+        .find(query, projection=projection)
+        .sort("_id", -1)
+        .batch_size(EXPORT_BATCH_SIZE)
+    )
+
+    async for document in cursor:
+        if versions:
+            history = document.get("versions", [])
+            _resolve_refs(history, {i: v.get("files", []) for i, v in enumerate(history)})
+        yield json.dumps(_serialize(document), default=str) + "\n"
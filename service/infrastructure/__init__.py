@@ -1,6 +1,7 @@
 from .gitlab_client import gitlab_client
-from .ollama import ollama_client
-from .weaviate import weaviate_client
+from .vector_store import create_vector_store
 from .llm import LLMWorker
 
-__all__ = ["gitlab_client", "ollama_client", "weaviate_client", "LLMWorker"]
\ No newline at end of file
+vector_store = create_vector_store()
+
+__all__ = ["gitlab_client", "vector_store", "LLMWorker"]
\ No newline at end of file
@@ -0,0 +1,103 @@
+from typing import List, Tuple
+from config import settings
+
+CHARS_PER_TOKEN = 4
+PROMPT_OVERHEAD_TOKENS = 1200
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    return text[:max(0, max_tokens) * CHARS_PER_TOKEN]
+
+
+def review_chunk_tokens(context_window: int) -> int:
+    available = (
+        context_window
+        - settings.LLM_MAX_OUTPUT_TOKENS
+        - settings.LLM_CONTEXT_TOKENS
+        - PROMPT_OVERHEAD_TOKENS
+    )
+    return max(256, min(settings.LLM_CHUNK_MAX_TOKENS, available))
+
+
+def split_hunks(file_diff: str) -> Tuple[str, List[str]]:
+    header: List[str] = []
+    hunks: List[List[str]] = []
+
+    for line in file_diff.splitlines(keepends=True):
+        if line.startswith("@@"):
+            hunks.append([line])
+        elif hunks:
+            hunks[-1].append(line)
+        else:
+            header.append(line)
+
+    return "".join(header), ["".join(h) for h in hunks]
+
+
+def _split_hunk(hunk: str, max_tokens: int) -> List[str]:
+    lines = hunk.splitlines(keepends=True)
+    hunk_header, body = lines[0], lines[1:]
+
+    pieces: List[str] = []
+    current: List[str] = []
+    used = estimate_tokens(hunk_header)
+
+    line_budget = max(1, max_tokens - estimate_tokens(hunk_header))
+
+    for line in body:
+        if estimate_tokens(line) > line_budget:
+            line = truncate_to_tokens(line, line_budget) + "\n"
+        tokens = estimate_tokens(line)
+
+        if current and used + tokens > max_tokens:
+            pieces.append(hunk_header + "".join(current))
+            current, used = [], estimate_tokens(hunk_header)
+        current.append(line)
+        used += tokens
+
+    if current or not pieces:
+        pieces.append(hunk_header + "".join(current))
+
+    return pieces
+
+
+def chunk_file_diff(file_diff: str, max_tokens: int) -> List[str]:
+    if estimate_tokens(file_diff) <= max_tokens:
+        return [file_diff]
+
+    header, hunks = split_hunks(file_diff)
+    if not hunks:
+        return [
+            file_diff[i:i + max_tokens * CHARS_PER_TOKEN]
+            for i in range(0, len(file_diff), max_tokens * CHARS_PER_TOKEN)
+        ]
+
+    budget = max(64, max_tokens - estimate_tokens(header))
+
+    pieces: List[str] = []
+    for hunk in hunks:
+        if estimate_tokens(hunk) > budget:
+            pieces.extend(_split_hunk(hunk, budget))
+        else:
+            pieces.append(hunk)
+
+    chunks: List[str] = []
+    current: List[str] = []
+    used = 0
+
+    for piece in pieces:
+        tokens = estimate_tokens(piece)
+        if current and used + tokens > budget:
+            chunks.append(header + "".join(current))
+            current, used = [], 0
+        current.append(piece)
+        used += tokens
+
+    if current:
+        chunks.append(header + "".join(current))
+
+    return chunks
@@ -0,0 +1,57 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+from config import settings
+from db.models import DiffBlob
+from pymongo.errors import DuplicateKeyError
+import hashlib
+import zstandard
+
+CODEC = "zstd"
+
+
+def diff_digest(diff: str) -> str:
+    return hashlib.sha256(diff.encode("utf-8")).hexdigest()
+
+
+class DiffStore:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=settings.DIFF_ZSTD_LEVEL)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def blob(self, diff: str) -> Dict[str, Any]:
+        raw = diff.encode("utf-8")
+        return {
+            "_id": hashlib.sha256(raw).hexdigest(),
+            "codec": CODEC,
+            "size": len(raw),
+            "data": self._compressor.compress(raw),
+            "created_at": datetime.now(),
+        }
+
+    async def put_blob(self, blob: Dict[str, Any]) -> str:
+        try:
+            await DiffBlob.get_motor_collection().update_one(
+                {"_id": blob["_id"]},
+                {"$setOnInsert": {key: value for key, value in blob.items() if key != "_id"}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            pass
+
+        return blob["_id"]
+
+    async def put(self, diff: str) -> str:
+        return await self.put_blob(self.blob(diff))
+
+    async def get(self, digest: str) -> Optional[str]:
+        blob = await DiffBlob.get_motor_collection().find_one({"_id": digest})
+        if blob is None:
+            return None
+
+        data = bytes(blob["data"])
+        if blob.get("codec") == CODEC:
+            data = self._decompressor.decompress(data)
+        return data.decode("utf-8")
+
+
+diff_store = DiffStore()
@@ -0,0 +1,153 @@
+import httpx
+from array import array
+from collections import OrderedDict
+from config import settings
+from infrastructure.metrics import observe_call
+from infrastructure.redis_client import get_redis
+from loguru import logger
+from typing import Dict, List
+import asyncio
+import hashlib
+import weakref
+
+KEY_PREFIX = "botgo:embedding"
+
+
+def _encode(vector: List[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _decode(raw: bytes) -> List[float]:
+    vector = array("f")
+    vector.frombytes(raw)
+    return vector.tolist()
+
+
+class EmbeddingService:
+    def __init__(self):
+        self.model = settings.OLLAMA_EMBEDDING_MODEL
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._stats = {
+            "memory_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "requests": 0,
+        }
+
+    def http(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                base_url=settings.OLLAMA_BASE_URL,
+                timeout=httpx.Timeout(settings.EMBEDDING_TIMEOUT, connect=5.0),
+                limits=httpx.Limits(
+                    max_connections=settings.EMBEDDING_CONCURRENCY,
+                    max_keepalive_connections=settings.EMBEDDING_CONCURRENCY,
+                ),
+            )
+            self._clients[loop] = client
+        return client
+
+    async def aclose(self) -> None:
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "entries": len(self._cache)}
+
+    def _key(self, text: str) -> str:
+        digest = hashlib.sha256(f"{self.model}\0{text}".encode("utf-8")).hexdigest()
+        return f"{KEY_PREFIX}:{digest}"
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        self._cache[key] = vector
+        self._cache.move_to_end(key)
+        while len(self._cache) > settings.EMBEDDING_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    async def embed(self, text: str) -> List[float]:
+        return (await self.embed_many([text]))[0]
+
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        vectors: Dict[str, List[float]] = {}
+        pending: Dict[str, str] = {}
+
+        for key, text in zip(keys, texts):
+            if key in vectors or key in pending:
+                continue
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                vectors[key] = self._cache[key]
+                self._stats["memory_hits"] += 1
+            else:
+                pending[key] = text
+
+        if pending and settings.EMBEDDING_REDIS_CACHE:
+            await self._load_from_redis(pending, vectors)
+
+        if pending:
+            self._stats["misses"] += len(pending)
+            computed = await self._compute(pending)
+            vectors.update(computed)
+            for key, vector in computed.items():
+                self._remember(key, vector)
+            if settings.EMBEDDING_REDIS_CACHE:
+                await self._store_in_redis(computed)
+
+        return [vectors[key] for key in keys]
+
+    async def _load_from_redis(self, pending: Dict[str, str], vectors: Dict[str, List[float]]) -> None:
+        try:
+            cached = await get_redis().mget(list(pending))
+        except Exception:
+            logger.warning("Embedding cache lookup failed", keys=len(pending))
+            return
+
+        for key, raw in zip(list(pending), cached):
+            if raw:
+                vector = _decode(raw)
+                vectors[key] = vector
+                self._remember(key, vector)
+                del pending[key]
+                self._stats["redis_hits"] += 1
+
+    async def _store_in_redis(self, computed: Dict[str, List[float]]) -> None:
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                for key, vector in computed.items():
+                    pipe.set(key, _encode(vector), ex=settings.EMBEDDING_CACHE_TTL)
+                await pipe.execute()
+        except Exception:
+            logger.warning("Embedding cache store failed", keys=len(computed))
+
+    async def _compute(self, pending: Dict[str, str]) -> Dict[str, List[float]]:
+        items = list(pending.items())
+        size = max(1, settings.EMBEDDING_BATCH_SIZE)
+        batches = [items[i:i + size] for i in range(0, len(items), size)]
+        semaphore = asyncio.Semaphore(max(1, settings.EMBEDDING_CONCURRENCY))
+
+        async def embed_batch(batch):
+            async with semaphore:
+                self._stats["requests"] += 1
+                with observe_call("ollama", "embed"):
+                    response = await self.http().post(
+                        "/api/embed",
+                        json={"model": self.model, "input": [text for _, text in batch]},
+                    )
+                    response.raise_for_status()
+                embeddings = response.json()["embeddings"]
+                return {key: vector for (key, _), vector in zip(batch, embeddings)}
+
+        computed: Dict[str, List[float]] = {}
+        for result in await asyncio.gather(*(embed_batch(batch) for batch in batches)):
+            computed.update(result)
+        return computed
+
+
+embedding_service = EmbeddingService()
@@ -1,8 +1,18 @@
-import gitlab
+import httpx
 from config import settings
+from infrastructure.metrics import observe_call
 from loguru import logger
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Iterator, AsyncIterator, Tuple
+from urllib.parse import quote, urlencode
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+import asyncio
+import random
 import sys
+import time
+import weakref
 
 logger.remove()
 logger.add(
@@ -11,26 +21,259 @@ logger.add(
     format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}",
 )
 
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE"}
+IMMUTABLE_TTL = 24 * 3600.0
+
+_review_scope: ContextVar[Optional[Dict[str, Any]]] = ContextVar("gitlab_review_scope", default=None)
+
+
+def _project_path(project_id) -> str:
+    return f"/projects/{quote(str(project_id), safe='')}"
+
+
+def _mr_path(project_id, mr_iid) -> str:
+    return f"{_project_path(project_id)}/merge_requests/{mr_iid}"
+
+
+def _params(**params) -> Dict[str, Any]:
+    return {k: v for k, v in params.items() if v is not None}
+
+
+@dataclass
+class _CachedObject:
+    etag: Optional[str]
+    payload: Any
+    fetched_at: float
+    size: int
+
 
 class GitLabClient:
     def __init__(self):
+        self.base_url = f"{settings.GITLAB_URL.rstrip('/')}/api/v4"
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._objects: "OrderedDict[str, _CachedObject]" = OrderedDict()
+        self._cached_bytes = 0
+        self._cache_stats = {
+            "scope_hits": 0,
+            "fresh_hits": 0,
+            "not_modified": 0,
+            "misses": 0,
+        }
+
+    def http(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"PRIVATE-TOKEN": settings.GITLAB_TOKEN},
+                timeout=httpx.Timeout(
+                    settings.GITLAB_TIMEOUT,
+                    connect=settings.GITLAB_CONNECT_TIMEOUT,
+                ),
+                limits=httpx.Limits(
+                    max_connections=settings.GITLAB_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.GITLAB_MAX_CONNECTIONS,
+                    keepalive_expiry=30.0,
+                ),
+            )
+            self._clients[loop] = client
+        return client
+
+    async def aclose(self) -> None:
         try:
-            self.gl = gitlab.Gitlab(
-                settings.GITLAB_URL,
-                private_token=settings.GITLAB_TOKEN,
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        client = self._clients.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+
+    @staticmethod
+    async def _backoff(attempt: int, retry_after: Optional[str] = None) -> None:
+        delay = settings.GITLAB_RETRY_BACKOFF * (2 ** attempt)
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        await asyncio.sleep(delay + random.uniform(0, delay / 2))
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        retries = settings.GITLAB_MAX_RETRIES
+        idempotent = method in IDEMPOTENT_METHODS
+
+        for attempt in range(retries + 1):
+            try:
+                with observe_call("gitlab", method):
+                    response = await self.http().request(method, path, **kwargs)
+            except httpx.TransportError as e:
+                retryable = idempotent or isinstance(e, httpx.ConnectError)
+                if not retryable or attempt == retries:
+                    raise
+                logger.warning(
+                    "GitLab request failed, retrying",
+                    method=method,
+                    path=path,
+                    attempt=attempt + 1,
+                )
+                await self._backoff(attempt)
+                continue
+
+            retryable = response.status_code == 429 or (
+                idempotent and response.status_code in RETRY_STATUSES
             )
-        except Exception:
-            logger.exception("Failed to initialize GitLab client")
-            raise
+            if retryable and attempt < retries:
+                logger.warning(
+                    "GitLab request returned {status}, retrying",
+                    status=response.status_code,
+                    method=method,
+                    path=path,
+                    attempt=attempt + 1,
+                )
+                await self._backoff(attempt, response.headers.get("Retry-After"))
+                continue
 
-    def get_projects(self, membership=True, owned=False, search=None):
+            if response.status_code != 304:
+                response.raise_for_status()
+            return response
+
+        raise RuntimeError("unreachable")
+
+    @contextmanager
+    def review_scope(self) -> Iterator[None]:
+        token = _review_scope.set({})
         try:
-            return self.gl.projects.list(
-                membership=membership,
-                owned=owned,
-                search=search,
-                all=True,
-                simple=True,
+            yield
+        finally:
+            _review_scope.reset(token)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        requests = self._cache_stats["not_modified"] + self._cache_stats["misses"]
+        lookups = requests + self._cache_stats["scope_hits"] + self._cache_stats["fresh_hits"]
+        return {
+            **self._cache_stats,
+            "entries": len(self._objects),
+            "bytes": self._cached_bytes,
+            "saved_ratio": round(1 - requests / lookups, 4) if lookups else 0.0,
+        }
+
+    async def _get_cached(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        ttl: float = 0.0,
+    ) -> Any:
+        key = f"{path}?{urlencode(sorted((params or {}).items()))}"
+
+        scope = _review_scope.get()
+        if scope is not None and key in scope:
+            self._cache_stats["scope_hits"] += 1
+            return scope[key]
+
+        entry = self._objects.get(key)
+        headers = {}
+
+        if entry is not None:
+            if ttl and time.monotonic() - entry.fetched_at < ttl:
+                self._cache_stats["fresh_hits"] += 1
+                self._objects.move_to_end(key)
+                if scope is not None:
+                    scope[key] = entry.payload
+                return entry.payload
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+
+        response = await self._request("GET", path, params=params, headers=headers)
+
+        if response.status_code == 304 and entry is not None:
+            self._cache_stats["not_modified"] += 1
+            entry.fetched_at = time.monotonic()
+        else:
+            self._cache_stats["misses"] += 1
+            entry = _CachedObject(
+                etag=response.headers.get("ETag"),
+                payload=response.json(),
+                fetched_at=time.monotonic(),
+                size=len(response.content),
+            )
+
+        self._store(key, entry)
+
+        if scope is not None:
+            scope[key] = entry.payload
+        return entry.payload
+
+    def _store(self, key: str, entry: _CachedObject) -> None:
+        previous = self._objects.pop(key, None)
+        if previous is not None:
+            self._cached_bytes -= previous.size
+
+        if entry.size > settings.GITLAB_CACHE_MAX_BYTES:
+            return
+
+        self._objects[key] = entry
+        self._cached_bytes += entry.size
+        while (
+            len(self._objects) > settings.GITLAB_CACHE_MAX_ENTRIES
+            or self._cached_bytes > settings.GITLAB_CACHE_MAX_BYTES
+        ):
+            _, evicted = self._objects.popitem(last=False)
+            self._cached_bytes -= evicted.size
+
+    async def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        response = await self._request("GET", path, params=params)
+        return response.json()
+
+    async def _iter_pages(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        per_page: int = 100,
+    ) -> AsyncIterator[List[Any]]:
+        params = {**(params or {}), "per_page": per_page, "page": 1}
+
+        while True:
+            response = await self._request("GET", path, params=params)
+            yield response.json()
+
+            next_page = response.headers.get("X-Next-Page")
+            if not next_page:
+                return
+            params["page"] = int(next_page)
+
+    async def _get_page(
+        self,
+        path: str,
+        params: Dict[str, Any],
+        page: int,
+        per_page: int,
+    ) -> Tuple[List[Any], Optional[int]]:
+        response = await self._request(
+            "GET",
+            path,
+            params={**params, "page": page, "per_page": per_page},
+        )
+        next_page = response.headers.get("X-Next-Page")
+        return response.json(), int(next_page) if next_page else None
+
+    async def _get_all(self, path: str, params: Optional[Dict[str, Any]] = None) -> List[Any]:
+        items: List[Any] = []
+        async for page in self._iter_pages(path, params):
+            items.extend(page)
+        return items
+
+    async def get_projects(self, membership=True, owned=False, search=None) -> List[Dict[str, Any]]:
+        try:
+            return await self._get_all(
+                "/projects",
+                _params(
+                    membership=membership,
+                    owned=owned,
+                    search=search,
+                    simple=True,
+                ),
             )
         except Exception:
             logger.exception(
@@ -41,9 +284,20 @@ class GitLabClient:
             )
             raise
 
-    def get_project(self, project_id: int):
+    async def get_projects_page(
+        self,
+        filters: Dict[str, Any],
+        page: int = 1,
+        per_page: int = 100,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        return await self._get_page("/projects", filters, page, per_page)
+
+    async def get_project(self, project_id: int) -> Dict[str, Any]:
         try:
-            return self.gl.projects.get(project_id)
+            return await self._get_cached(
+                _project_path(project_id),
+                ttl=settings.GITLAB_CACHE_TTL,
+            )
         except Exception:
             logger.exception(
                 "Failed to get project",
@@ -51,20 +305,21 @@ class GitLabClient:
             )
             raise
 
-    def get_mrs_by_project(
+    async def get_mrs_by_project(
         self,
         project_id: int,
         state: str = "merged",
         source_branch: str | None = None,
         target_branch: str | None = None,
-    ):
+    ) -> List[Dict[str, Any]]:
         try:
-            project = self.gl.projects.get(project_id)
-            return project.mergerequests.list(
-                state=state,
-                source_branch=source_branch,
-                target_branch=target_branch,
-                all=True,
+            return await self._get_all(
+                f"{_project_path(project_id)}/merge_requests",
+                _params(
+                    state=state,
+                    source_branch=source_branch,
+                    target_branch=target_branch,
+                ),
             )
         except Exception:
             logger.exception(
@@ -76,7 +331,51 @@ class GitLabClient:
             )
             raise
 
-    def get_mr_data(
+    async def get_mrs_page(
+        self,
+        project_id: int,
+        filters: Dict[str, Any],
+        page: int = 1,
+        per_page: int = 100,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        return await self._get_page(
+            f"{_project_path(project_id)}/merge_requests",
+            filters,
+            page,
+            per_page,
+        )
+
+    def iter_mrs_by_project(
+        self,
+        project_id: int,
+        state: str = "merged",
+        per_page: int = 100,
+        **filters,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        return self._iter_pages(
+            f"{_project_path(project_id)}/merge_requests",
+            _params(state=state, **filters),
+            per_page=per_page,
+        )
+
+    async def get_mr_diffs(self, project_id: int, mr_iid: int) -> List[Dict[str, Any]]:
+        return await self._get_all(f"{_mr_path(project_id, mr_iid)}/diffs")
+
+    async def get_mr(self, project_id: int, mr_iid: int) -> Dict[str, Any]:
+        return await self._get_cached(_mr_path(project_id, mr_iid))
+
+    async def get_latest_diff_version(self, project_id: int, mr_iid: int) -> Optional[Dict[str, Any]]:
+        diff_versions = await self._get_cached(f"{_mr_path(project_id, mr_iid)}/versions")
+        if not diff_versions:
+            return None
+
+        latest = diff_versions[0]
+        return await self._get_cached(
+            f"{_mr_path(project_id, mr_iid)}/versions/{latest['id']}",
+            ttl=IMMUTABLE_TTL,
+        )
+
+    async def get_mr_data(
             self,
             project_id: int,
             mr_iid: int,
@@ -84,31 +383,38 @@ class GitLabClient:
             max_chars: int = 2000,
     ) -> Dict[str, Any]:
         try:
-            project = self.gl.projects.get(project_id)
-            mr = project.mergerequests.get(mr_iid)
-            diff_versions = mr.diffs.list()
-            if not diff_versions:
+            project, mr, diff_version = await asyncio.gather(
+                self.get_project(project_id),
+                self.get_mr(project_id, mr_iid),
+                self.get_latest_diff_version(project_id, mr_iid),
+            )
+
+            if not diff_version:
                 logger.warning(
                     "No diff versions found",
                     project_id=project_id,
                     mr_iid=mr_iid,
                 )
                 return {
-                    "project_name": project.name,
-                    "author": mr.author["username"],
-                    "source_branch": mr.source_branch,
-                    "target_branch": mr.target_branch,
+                    "project_name": project["name"],
+                    "author": mr["author"]["username"],
+                    "source_branch": mr["source_branch"],
+                    "target_branch": mr["target_branch"],
                     "summary_diff": "",
                     "full_diff": "",
+                    "mr_title": mr["title"],
+                    "diff_version_id": None,
+                    "head_sha": None,
+                    "base_sha": None,
+                    "start_sha": None,
+                    "files": [],
                 }
 
-            latest = diff_versions[0]
-            diff_version = mr.diffs.get(latest.id)
-
             summary_diff = ""
             full_diff = ""
+            files = []
 
-            for idx, d in enumerate(diff_version.diffs):
+            for idx, d in enumerate(diff_version.get("diffs", [])):
                 old_path = d["old_path"]
                 new_path = d["new_path"]
                 diff_body = d.get("diff", "")
@@ -117,18 +423,33 @@ class GitLabClient:
                 full_diff += diff_body
                 full_diff += "\n"
 
+                files.append({
+                    "old_path": old_path,
+                    "new_path": new_path,
+                    "diff": diff_body,
+                    "new_file": d.get("new_file", False),
+                    "renamed_file": d.get("renamed_file", False),
+                    "deleted_file": d.get("deleted_file", False),
+                    "generated_file": d.get("generated_file", False),
+                })
+
                 if idx < max_files:
                     summary_diff += f"\n--- {old_path} -> {new_path}\n"
                     summary_diff += diff_body[:max_chars]
 
             return {
-                "project_name": project.name,
-                "author": mr.author["name"],
-                "source_branch": mr.source_branch,
-                "target_branch": mr.target_branch,
+                "project_name": project["name"],
+                "author": mr["author"]["name"],
+                "source_branch": mr["source_branch"],
+                "target_branch": mr["target_branch"],
                 "summary_diff": summary_diff.strip(),
                 "full_diff": full_diff.strip(),
-                "mr_title": mr.title
+                "mr_title": mr["title"],
+                "diff_version_id": diff_version["id"],
+                "head_sha": diff_version["head_commit_sha"],
+                "base_sha": diff_version["base_commit_sha"],
+                "start_sha": diff_version["start_commit_sha"],
+                "files": files,
             }
 
         except Exception:
@@ -139,7 +460,7 @@ class GitLabClient:
             )
             raise
 
-    def get_mr_diff_summary(
+    async def get_mr_diff_summary(
         self,
         project_id: int,
         mr_iid: int,
@@ -147,11 +468,8 @@ class GitLabClient:
         max_chars: int = 2000,
     ) -> str:
         try:
-            project = self.gl.projects.get(project_id)
-            mr = project.mergerequests.get(mr_iid)
-
-            diff_versions = mr.diffs.list()
-            if not diff_versions:
+            diff_version = await self.get_latest_diff_version(project_id, mr_iid)
+            if not diff_version:
                 logger.warning(
                     "No diff versions found",
                     project_id=project_id,
@@ -159,11 +477,8 @@ class GitLabClient:
                 )
                 return "No diff versions found"
 
-            latest = diff_versions[0]
-            diff_version = mr.diffs.get(latest.id)
-
             diff_text = ""
-            for d in diff_version.diffs[:max_files]:
+            for d in diff_version.get("diffs", [])[:max_files]:
                 diff_text += f"\n--- {d['old_path']} -> {d['new_path']}\n"
                 diff_text += d.get("diff", "")[:max_chars]
 
@@ -177,17 +492,14 @@ class GitLabClient:
             )
             raise
 
-    def get_mr_diff_full(
+    async def get_mr_diff_full(
         self,
         project_id: int,
         mr_iid: int,
     ) -> str:
         try:
-            project = self.gl.projects.get(project_id)
-            mr = project.mergerequests.get(mr_iid)
-
-            diff_versions = mr.diffs.list()
-            if not diff_versions:
+            diff_version = await self.get_latest_diff_version(project_id, mr_iid)
+            if not diff_version:
                 logger.warning(
                     "No diff versions found",
                     project_id=project_id,
@@ -195,11 +507,8 @@ class GitLabClient:
                 )
                 return ""
 
-            latest = diff_versions[0]
-            diff_version = mr.diffs.get(latest.id)
-
             diff_text = ""
-            for d in diff_version.diffs:
+            for d in diff_version.get("diffs", []):
                 diff_text += f"diff --git a/{d['old_path']} b/{d['new_path']}\n"
                 diff_text += d.get("diff", "")
                 diff_text += "\n"
@@ -214,16 +523,18 @@ class GitLabClient:
             )
             raise
 
-    def post_mr_note(
+    async def post_mr_note(
         self,
         project_id: int,
         mr_iid: int,
         note_body: str,
     ) -> None:
         try:
-            project = self.gl.projects.get(project_id)
-            mr = project.mergerequests.get(mr_iid)
-            mr.notes.create({"body": note_body})
+            await self._request(
+                "POST",
+                f"{_mr_path(project_id, mr_iid)}/notes",
+                json={"body": note_body},
+            )
         except Exception:
             logger.exception(
                 "Failed to post MR note",
@@ -233,7 +544,7 @@ class GitLabClient:
             )
             raise
 
-    def post_inline_comment(
+    async def post_inline_comment(
         self,
         project_id: int,
         mr_iid: int,
@@ -243,10 +554,9 @@ class GitLabClient:
         body: str,
     ) -> None:
         try:
-            project = self.gl.projects.get(project_id)
-            mr = project.mergerequests.get(mr_iid)
+            mr = await self.get_mr(project_id, mr_iid)
 
-            diff_refs = mr.diff_refs
+            diff_refs = mr.get("diff_refs")
             if not diff_refs:
                 logger.error(
                     "Missing diff_refs for MR",
@@ -267,11 +577,13 @@ class GitLabClient:
                 },
             }
 
-            mr.discussions.create(
-                {
+            await self._request(
+                "POST",
+                f"{_mr_path(project_id, mr_iid)}/discussions",
+                json={
                     "body": body,
                     "position": position,
-                }
+                },
             )
 
         except Exception:
@@ -285,17 +597,16 @@ class GitLabClient:
             )
             raise
 
-    def get_mr_info(self, project_id: int, mr_iid: int) -> dict:
+    async def get_mr_info(self, project_id: int, mr_iid: int) -> dict:
         try:
-            project = self.gl.projects.get(project_id)
-            mr = project.mergerequests.get(mr_iid)
+            mr = await self.get_mr(project_id, mr_iid)
             return {
-                "title": mr.title,
-                "author": mr.author["username"],
-                "state": mr.state,
-                "iid": mr.iid,
-                "source_branch": mr.source_branch,
-                "target_branch": mr.target_branch,
+                "title": mr["title"],
+                "author": mr["author"]["username"],
+                "state": mr["state"],
+                "iid": mr["iid"],
+                "source_branch": mr["source_branch"],
+                "target_branch": mr["target_branch"],
             }
         except Exception:
             logger.exception(
@@ -0,0 +1,79 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from config import settings
+from infrastructure.redis_client import get_redis
+from loguru import logger
+import hashlib
+import json
+import time
+
+KEY_PREFIX = "botgo:listing"
+
+Page = Tuple[List[Dict[str, Any]], Optional[int]]
+PageFetcher = Callable[[Dict[str, Any], int, int], Awaitable[Page]]
+
+
+def _scope_key(scope: str) -> str:
+    return f"{KEY_PREFIX}:{scope}"
+
+
+def _page_field(filters: Dict[str, Any], page: int, per_page: int) -> str:
+    raw = json.dumps([sorted(filters.items()), page, per_page], default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class ListingCache:
+    def __init__(self):
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    async def page(
+        self,
+        scope: str,
+        fetch: PageFetcher,
+        filters: Dict[str, Any],
+        page: int,
+        per_page: int,
+    ) -> Page:
+        key = _scope_key(scope)
+        field = _page_field(filters, page, per_page)
+
+        try:
+            raw = await get_redis().hget(key, field)
+        except Exception:
+            logger.warning("Listing cache lookup failed", scope=scope)
+            raw = None
+
+        if raw:
+            entry = json.loads(raw)
+            if time.time() - entry["fetched_at"] < settings.LISTING_CACHE_TTL:
+                self._stats["hits"] += 1
+                return entry["items"], entry["next_page"]
+
+        self._stats["misses"] += 1
+        items, next_page = await fetch(filters, page, per_page)
+
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                pipe.hset(key, field, json.dumps({
+                    "items": items,
+                    "next_page": next_page,
+                    "fetched_at": time.time(),
+                }))
+                pipe.expire(key, int(settings.LISTING_CACHE_TTL))
+                await pipe.execute()
+        except Exception:
+            logger.warning("Listing cache store failed", scope=scope)
+
+        return items, next_page
+
+    async def invalidate(self, scope: str) -> None:
+        try:
+            await get_redis().delete(_scope_key(scope))
+            self._stats["invalidations"] += 1
+        except Exception:
+            logger.warning("Listing cache invalidation failed", scope=scope)
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._stats)
+
+
+listing_cache = ListingCache()
@@ -1,7 +1,20 @@
 from openai import AsyncOpenAI
-from typing import Tuple, List, Dict
+from typing import Tuple, List, Dict, Optional
 from config import settings
+from infrastructure.stacks import classify_by_rules
+from infrastructure.review_cache import review_cache, review_cache_key
+from infrastructure.chunking import chunk_file_diff, estimate_tokens, review_chunk_tokens, truncate_to_tokens
+from infrastructure.llm_router import Backend, remote_backend, route_classification, route_review
+from infrastructure.llm_scheduler import Grant
+from infrastructure.metrics import LLM_LATENCY, LLM_TOKENS, LLM_TTFT
+from infrastructure.review_progress import review_progress
+from contextvars import ContextVar
+from loguru import logger
+import asyncio
 import re
+import time
+
+REVIEW_PROMPT_VERSION = "3"
 
 BASE_REVIEW_CONTRACT = """
 You are a senior software engineer performing a strict merge request review.
@@ -105,6 +118,17 @@ Review focus:
 - Locking and performance impact
 - Migration safety and reversibility
 - Index usage and query efficiency
+""".strip(),
+
+    "docs": """
+Stack: Documentation
+
+Review focus:
+- Technical accuracy against the code and configuration it describes
+- Commands, paths and examples that would not work as written
+- Outdated or contradictory instructions
+- Secrets, credentials or internal hosts in examples
+- Broken links and references
 """.strip(),
 }
 
@@ -138,6 +162,52 @@ Examples:
 Return only the comma-separated values.
 """.strip()
 
+STACK_BATCH_CLASSIFIER_PROMPT = """
+You are classifying the applicable technology stacks for several file diffs.
+
+Rules:
+- Base decisions ONLY on each file's path and diff content
+- Return ALL applicable stacks for every file
+- Nuxt implies Vue + frontend-ts, but still list them explicitly
+- Documentation files are "docs"
+- SQL / migrations are "data-sql"
+
+Allowed values:
+python
+golang
+frontend-ts
+vue
+nuxt
+devops
+data-sql
+docs
+
+Each file starts with a header "### FILE <number>: <path>".
+Return exactly one line per file in the form:
+<number>: <comma-separated values>
+
+Example:
+1: nuxt,vue,frontend-ts
+2: devops
+
+Return only these lines.
+""".strip()
+
+STACK_BATCH_MAX_FILES = 20
+STACK_CLASSIFY_TOKENS = 750
+STACK_BATCH_FILE_TOKENS = 375
+STACK_OUTPUT_TOKENS = 16
+DEFAULT_STACKS = ["frontend-ts"]
+
+def _classify_batch_size(backend: Backend) -> int:
+    available = backend.context_window - estimate_tokens(STACK_BATCH_CLASSIFIER_PROMPT)
+    return max(1, min(STACK_BATCH_MAX_FILES, available // (STACK_BATCH_FILE_TOKENS + STACK_OUTPUT_TOKENS)))
+
+
+def _parse_stacks(raw: str) -> List[str]:
+    return [s.strip() for s in raw.split(",") if s.strip() in STACK_RULES]
+
+
 def build_review_prompt(diff: str, contexts: list, stacks: List[str]) -> str:
     context_str = "\n---\n".join(contexts[:3]) if contexts else "None"
 
@@ -151,10 +221,10 @@ def build_review_prompt(diff: str, contexts: list, stacks: List[str]) -> str:
 {NO_ISSUE_RULE}
 
 Prior context (reference only, do not assume):
-{context_str[:800]}
+{truncate_to_tokens(context_str, settings.LLM_CONTEXT_TOKENS)}
 
 File diff:
-{diff[:3000]}
+{diff}
 
 IMPORTANT FORMAT RULES:
 - Each field MUST start on its own line
@@ -175,6 +245,102 @@ REASON: <one short sentence>
 """.strip()
 
 
+def build_reduce_prompt(path: str, stacks: List[str], partials: List[Tuple[str, str]]) -> str:
+    rules = "\n\n".join(STACK_RULES[s] for s in stacks if s in STACK_RULES)
+    reviews = "\n\n".join(
+        f"Part {i}:\nSUMMARY: {summary}\nSUGGESTION: {suggestion}"
+        for i, (summary, suggestion) in enumerate(partials, start=1)
+    )
+
+    return f"""
+{BASE_REVIEW_CONTRACT}
+
+{rules}
+
+{NO_ISSUE_RULE}
+
+The diff of {path} was too large for one review and was reviewed in
+consecutive parts. Merge the partial reviews below into ONE review of the
+whole file. Keep the single most important concrete suggestion; if every
+part is LGTM, the file is LGTM.
+
+Partial reviews:
+{reviews}
+
+IMPORTANT FORMAT RULES:
+- Each field MUST start on its own line
+- Field labels MUST be exactly:
+  SUMMARY:
+  SUGGESTION:
+  CONFIDENCE:
+  REASON:
+- Do NOT inline field labels inside sentences
+- Do NOT add extra text before or after fields
+
+Required output format (EXACT):
+
+SUMMARY: <2–3 concise sentences>
+SUGGESTION: <one concrete improvement OR exactly "LGTM">
+CONFIDENCE: <high | medium | low>
+REASON: <one short sentence>
+""".strip()
+
+
+REVIEW_FIELDS = ("SUMMARY:", "SUGGESTION:", "CONFIDENCE:", "REASON:")
+
+
+class ReviewStreamParser:
+    def __init__(self):
+        self.fields = {key: "" for key in REVIEW_FIELDS}
+        self.current: Optional[str] = None
+        self.done = False
+        self._pending = ""
+
+    def _line(self, line: str) -> None:
+        line = line.strip()
+        for key in self.fields:
+            if line.startswith(key):
+                self.current = key
+                self.fields[key] = line[len(key):].strip()
+                return
+
+        if self.current and line:
+            self.fields[self.current] += " " + line
+
+    def feed(self, text: str) -> bool:
+        self._pending += text
+        while not self.done and "\n" in self._pending:
+            line, self._pending = self._pending.split("\n", 1)
+            self._line(line)
+            self.done = self._complete()
+        return self.done
+
+    def _complete(self) -> bool:
+        return (
+            self.current == "REASON:"
+            and all(self.fields[key] for key in ("SUMMARY:", "SUGGESTION:", "REASON:"))
+        )
+
+    def result(self) -> Tuple[str, str]:
+        if not self.done and self._pending:
+            self._line(self._pending)
+        self._pending = ""
+
+        summary = self.fields["SUMMARY:"].strip()
+        suggestion = self.fields["SUGGESTION:"].strip()
+
+        if not suggestion or suggestion.upper() == "LGTM":
+            return (
+                summary or "No issues were found during review.",
+                "LGTM",
+            )
+
+        return (
+            summary or "No summary generated.",
+            suggestion,
+        )
+
+
 FILE_DIFF_REGEX = re.compile(r"diff --git a/(.*?) b/.*?\n", re.DOTALL)
 
 def split_diff_by_file(diff: str) -> Dict[str, str]:
@@ -187,34 +353,151 @@ def split_diff_by_file(diff: str) -> Dict[str, str]:
     return result or {"unknown": diff}
 
 
+_llm_stack: ContextVar[str] = ContextVar("llm_stack", default="none")
+
+
+class FileDeadline:
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.started: Optional[float] = None
+
+    def remaining(self) -> float:
+        now = time.monotonic()
+        if self.started is None:
+            self.started = now
+
+        remaining = self.started + self.seconds - now
+        if remaining <= 0:
+            raise asyncio.TimeoutError()
+        return remaining
+
+
+_file_deadline: ContextVar[Optional[FileDeadline]] = ContextVar("llm_file_deadline", default=None)
+
+
 class LLMWorker:
-    _client: AsyncOpenAI | None = None
+    _call_stats: Dict[str, Dict[str, float]] = {}
 
     @classmethod
     def client(cls) -> AsyncOpenAI:
-        if cls._client is None:
-            cls._client = AsyncOpenAI(
-                api_key=settings.LLM_API_KEY,
-                base_url=settings.LLM_BASE_URL,
+        return remote_backend.client()
+
+    @classmethod
+    async def _chat(cls, messages: List[Dict[str, str]], max_tokens: int) -> str:
+        backend = route_classification()
+        token = _llm_stack.set("classify")
+        try:
+            return await cls._chat_on(backend, messages, max_tokens)
+        except Exception:
+            if backend is remote_backend:
+                raise
+            logger.warning("Local classification failed, falling back to the remote model")
+            return await cls._chat_on(remote_backend, messages, max_tokens)
+        finally:
+            _llm_stack.reset(token)
+
+    @classmethod
+    async def _chat_on(cls, backend: Backend, messages: List[Dict[str, str]], max_tokens: int) -> str:
+        prompt = "\n".join(m["content"] for m in messages)
+
+        async def call(grant: Grant) -> str:
+            started = time.perf_counter()
+            response = await backend.client().chat.completions.create(
+                model=backend.model,
+                messages=messages,
+                temperature=0.0,
+                max_tokens=max_tokens,
+            )
+            content = response.choices[0].message.content or ""
+            elapsed = time.perf_counter() - started
+
+            grant.used_tokens = cls._record_call(
+                backend,
+                prompt=prompt,
+                content=content,
+                usage=response.usage,
+                ttft=elapsed,
+                latency=elapsed,
+                closed_early=False,
             )
-        return cls._client
+            return content
 
+        return await backend.run(call, estimate_tokens(prompt) + max_tokens)
 
     @classmethod
-    async def classify_stacks(cls, file_diff: str) -> List[str]:
-        response = await cls.client().chat.completions.create(
-            model=settings.LLM_MODEL,
-            messages=[
+    async def classify_stacks(cls, file_diff: str, path: str = "") -> List[str]:
+        stacks = classify_by_rules(path, file_diff) if path else None
+        if stacks:
+            return stacks
+
+        raw = (await cls._chat(
+            [
                 {"role": "system", "content": STACK_CLASSIFIER_PROMPT},
-                {"role": "user", "content": file_diff[:3000]},
+                {"role": "user", "content": chunk_file_diff(file_diff, STACK_CLASSIFY_TOKENS)[0]},
             ],
-            temperature=0.0,
+            max_tokens=STACK_OUTPUT_TOKENS,
+        )).strip()
+        return _parse_stacks(raw) or list(DEFAULT_STACKS)
+
+    @classmethod
+    async def classify_stacks_batch(
+        cls,
+        file_diffs: Dict[str, str],
+    ) -> Dict[str, List[str]]:
+        result: Dict[str, List[str]] = {}
+        ambiguous: List[str] = []
+
+        for path, file_diff in file_diffs.items():
+            stacks = classify_by_rules(path, file_diff)
+            if stacks:
+                result[path] = stacks
+            else:
+                ambiguous.append(path)
+
+        size = _classify_batch_size(route_classification())
+        batches = [ambiguous[i:i + size] for i in range(0, len(ambiguous), size)]
+        classified = await asyncio.gather(*(
+            cls._classify_batch({path: file_diffs[path] for path in batch})
+            for batch in batches
+        ))
+
+        for batch_result in classified:
+            result.update(batch_result)
+
+        return {path: result.get(path, list(DEFAULT_STACKS)) for path in file_diffs}
+
+    @classmethod
+    async def _classify_batch(cls, file_diffs: Dict[str, str]) -> Dict[str, List[str]]:
+        paths = list(file_diffs)
+        content = "\n\n".join(
+            f"### FILE {i}: {path}\n{chunk_file_diff(file_diffs[path], STACK_BATCH_FILE_TOKENS)[0]}"
+            for i, path in enumerate(paths, start=1)
         )
 
-        raw = (response.choices[0].message.content or "").strip()
-        stacks = [s.strip() for s in raw.split(",") if s.strip() in STACK_RULES]
+        try:
+            raw = await cls._chat(
+                [
+                    {"role": "system", "content": STACK_BATCH_CLASSIFIER_PROMPT},
+                    {"role": "user", "content": content},
+                ],
+                max_tokens=STACK_OUTPUT_TOKENS * (len(paths) + 1),
+            )
+        except Exception:
+            logger.exception("Batched stack classification failed", files=len(paths))
+            return {}
+
+        result: Dict[str, List[str]] = {}
+        for line in raw.splitlines():
+            index, sep, values = line.partition(":")
+            index = index.strip().lstrip("#").strip()
+            if not sep or not index.isdigit():
+                continue
 
-        return stacks or ["frontend-ts"]
+            position = int(index) - 1
+            if 0 <= position < len(paths):
+                result[paths[position]] = _parse_stacks(values) or list(DEFAULT_STACKS)
+
+        return result
 
     @classmethod
     async def _review(
@@ -222,85 +505,331 @@ class LLMWorker:
         diff: str,
         contexts: list,
         stacks: List[str],
+        backend: Backend,
     ) -> Tuple[str, str]:
-        prompt = build_review_prompt(diff, contexts, stacks)
+        return await cls._complete_review(build_review_prompt(diff, contexts, stacks), backend)
+
+    @classmethod
+    async def _reduce(
+        cls,
+        path: str,
+        stacks: List[str],
+        partials: List[Tuple[str, str]],
+        backend: Backend,
+    ) -> Tuple[str, str]:
+        if all(suggestion.upper() == "LGTM" for _, suggestion in partials):
+            return " ".join(summary for summary, _ in partials), "LGTM"
+
+        return await cls._complete_review(build_reduce_prompt(path, stacks, partials), backend)
+
+    @classmethod
+    async def _complete_review(cls, prompt: str, backend: Backend) -> Tuple[str, str]:
+        async def call(grant: Grant) -> Tuple[str, str]:
+            deadline = _file_deadline.get()
+            timeout = deadline.remaining() if deadline else settings.LLM_FILE_TIMEOUT
+            return await asyncio.wait_for(cls._request_review(prompt, grant, backend), timeout=timeout)
+
+        return await backend.run(call, estimate_tokens(prompt) + settings.LLM_MAX_OUTPUT_TOKENS)
 
-        response = await cls.client().chat.completions.create(
-            model=settings.LLM_MODEL,
+    @classmethod
+    async def _request_review(cls, prompt: str, grant: Grant, backend: Backend) -> Tuple[str, str]:
+        request = dict(
+            model=backend.model,
             messages=[{"role": "system", "content": prompt}],
             temperature=0.0,
             top_p=1.0,
+            max_tokens=settings.LLM_MAX_OUTPUT_TOKENS,
+        )
+
+        parser = ReviewStreamParser()
+        started = time.perf_counter()
+        first_token_at = None
+        closed_early = False
+        usage = None
+        content = ""
+
+        if not settings.LLM_STREAMING:
+            response = await backend.client().chat.completions.create(**request)
+            first_token_at = time.perf_counter()
+            content = response.choices[0].message.content or ""
+            parser.feed(content)
+            usage = response.usage
+        else:
+            stream = await backend.client().chat.completions.create(
+                **request,
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+            try:
+                async for chunk in stream:
+                    if chunk.usage:
+                        usage = chunk.usage
+                    if not chunk.choices or not chunk.choices[0].delta.content:
+                        continue
+
+                    delta = chunk.choices[0].delta.content
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    content += delta
+
+                    if parser.feed(delta):
+                        closed_early = True
+                        break
+            finally:
+                await stream.close()
+
+        grant.used_tokens = cls._record_call(
+            backend,
+            prompt=prompt,
+            content=content,
+            usage=usage,
+            ttft=(first_token_at or time.perf_counter()) - started,
+            latency=time.perf_counter() - started,
+            closed_early=closed_early,
         )
 
-        return cls._parse_response(response.choices[0].message.content or "")
+        return parser.result()
 
     @classmethod
-    async def generate_review(
+    def _record_call(
         cls,
-        diff: str,
-        contexts: list,
-    ) -> Tuple[str, str]:
-        file_diffs = split_diff_by_file(diff)
+        backend: Backend,
+        prompt: str,
+        content: str,
+        usage,
+        ttft: float,
+        latency: float,
+        closed_early: bool,
+    ) -> int:
+        prompt_tokens = usage.prompt_tokens if usage else estimate_tokens(prompt)
+        completion_tokens = usage.completion_tokens if usage else estimate_tokens(content)
+        cost = backend.cost(prompt_tokens, completion_tokens)
+
+        stats = cls._call_stats.setdefault(backend.name, {
+            "calls": 0,
+            "closed_early": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "ttft_ms": 0.0,
+            "latency_ms": 0.0,
+            "cost": 0.0,
+        })
+        stats["calls"] += 1
+        stats["closed_early"] += int(closed_early)
+        stats["prompt_tokens"] += prompt_tokens
+        stats["completion_tokens"] += completion_tokens
+        stats["ttft_ms"] += ttft * 1000
+        stats["latency_ms"] += latency * 1000
+        stats["cost"] += cost
+
+        stack = _llm_stack.get()
+        LLM_LATENCY.labels(backend.name, backend.model, stack).observe(latency)
+        LLM_TTFT.labels(backend.name, backend.model).observe(ttft)
+        LLM_TOKENS.labels(backend.name, backend.model, stack, "prompt").inc(prompt_tokens)
+        LLM_TOKENS.labels(backend.name, backend.model, stack, "completion").inc(completion_tokens)
+
+        logger.info(
+            "LLM call on {backend}: ttft {ttft_ms}ms, {completion_tokens} completion tokens in {latency_ms}ms",
+            backend=backend.name,
+            model=backend.model,
+            ttft_ms=round(ttft * 1000, 1),
+            latency_ms=round(latency * 1000, 1),
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cost=round(cost, 6),
+            closed_early=closed_early,
+        )
 
-        summaries = []
-        suggestions = []
+        return prompt_tokens + completion_tokens
 
-        for file_diff in file_diffs.values():
-            stacks = await cls.classify_stacks(file_diff)
-            summary, suggestion = await cls._review(
-                file_diff,
-                contexts,
-                stacks,
-            )
+    @classmethod
+    def call_stats(cls) -> Dict[str, Dict[str, float]]:
+        result = {}
+        for name, stats in cls._call_stats.items():
+            calls = stats["calls"] or 1
+            result[name] = {
+                **stats,
+                "cost": round(stats["cost"], 6),
+                "avg_ttft_ms": round(stats["ttft_ms"] / calls, 1),
+                "avg_latency_ms": round(stats["latency_ms"] / calls, 1),
+                "avg_completion_tokens": round(stats["completion_tokens"] / calls, 1),
+                "avg_cost": round(stats["cost"] / calls, 6),
+            }
+        return result
 
-            summaries.append(f"[{','.join(stacks)}] {summary}")
-            suggestions.append(suggestion)
+    @classmethod
+    async def _limited(cls, semaphore: asyncio.Semaphore, coro):
+        async with semaphore:
+            return await coro
 
-        if suggestions and all(s.upper() == "LGTM" for s in suggestions):
-            return (
-                " ".join(summaries) if summaries else "No significant changes detected.",
-                "LGTM",
+    @classmethod
+    async def _review_chunked(
+        cls,
+        path: str,
+        file_diff: str,
+        stacks: List[str],
+        contexts: list,
+        semaphore: asyncio.Semaphore,
+        backend: Backend,
+    ) -> Tuple[str, str, bool]:
+        chunks = chunk_file_diff(file_diff, review_chunk_tokens(backend.context_window))
+        if len(chunks) == 1:
+            summary, suggestion = await cls._limited(semaphore, cls._review(file_diff, contexts, stacks, backend))
+            return summary, suggestion, True
+
+        results = await asyncio.gather(
+            *(cls._limited(semaphore, cls._review(chunk, contexts, stacks, backend)) for chunk in chunks),
+            return_exceptions=True,
+        )
+
+        partials = [r for r in results if not isinstance(r, BaseException)]
+        if not partials:
+            raise results[0]
+        if any(isinstance(r, asyncio.TimeoutError) for r in results):
+            raise asyncio.TimeoutError()
+
+        complete = len(partials) == len(chunks)
+        if not complete:
+            logger.warning(
+                "{failed} of {total} chunks failed, not caching the partial review",
+                failed=len(chunks) - len(partials),
+                total=len(chunks),
+                path=path,
             )
 
-        return (
-            " ".join(summaries) if summaries else "No significant changes detected.",
-            " | ".join(s for s in suggestions if s.upper() != "LGTM") or "LGTM",
+        summary, suggestion = await cls._limited(semaphore, cls._reduce(path, stacks, partials, backend))
+        return summary, suggestion, complete
+
+    @classmethod
+    async def _review_file(
+        cls,
+        path: str,
+        file_diff: str,
+        stacks: List[str],
+        contexts: list,
+        semaphore: asyncio.Semaphore,
+    ) -> Optional[Tuple[List[str], str, str]]:
+        backend, score = route_review(file_diff, stacks)
+        logger.info(
+            "Routed {path} to {backend}",
+            path=path,
+            backend=backend.name,
+            score=round(score, 1),
         )
 
+        token = _file_deadline.set(FileDeadline(settings.LLM_FILE_TIMEOUT))
+        try:
+            result = await cls._review_file_on(backend, path, file_diff, stacks, contexts, semaphore)
+            if result is None and backend is not remote_backend:
+                logger.warning("Local review failed, falling back to the remote model", path=path)
+                result = await cls._review_file_on(remote_backend, path, file_diff, stacks, contexts, semaphore)
+        finally:
+            _file_deadline.reset(token)
+
+        if result is None:
+            await review_progress.publish("file_failed", path=path)
+        else:
+            await review_progress.publish(
+                "file_reviewed",
+                path=path,
+                stacks=result[0],
+                summary=result[1],
+                suggestion=result[2],
+            )
 
-    @staticmethod
-    def _parse_response(content: str) -> Tuple[str, str]:
-        text = content.strip()
-
-        fields = {
-            "SUMMARY:": "",
-            "SUGGESTION:": "",
-            "CONFIDENCE:": "",
-            "REASON:": "",
+        return result
+
+    @classmethod
+    async def _review_file_on(
+        cls,
+        backend: Backend,
+        path: str,
+        file_diff: str,
+        stacks: List[str],
+        contexts: list,
+        semaphore: asyncio.Semaphore,
+    ) -> Optional[Tuple[List[str], str, str]]:
+        cache_key = review_cache_key(file_diff, stacks, contexts, REVIEW_PROMPT_VERSION, backend.model)
+        cached = await review_cache.get(cache_key)
+        if cached:
+            return stacks, *cached
+
+        token = _llm_stack.set(stacks[0] if stacks else "none")
+        try:
+            summary, suggestion, complete = await cls._review_chunked(
+                path, file_diff, stacks, contexts, semaphore, backend,
+            )
+            if complete:
+                await review_cache.set(cache_key, summary, suggestion)
+            return stacks, summary, suggestion
+        except asyncio.TimeoutError:
+            logger.warning(
+                "File review timed out",
+                path=path,
+                backend=backend.name,
+                timeout=settings.LLM_FILE_TIMEOUT,
+            )
+        except Exception:
+            logger.exception("File review failed", path=path, backend=backend.name)
+        finally:
+            _llm_stack.reset(token)
+
+        return None
+
+    @classmethod
+    async def review_files(
+        cls,
+        file_diffs: Dict[str, str],
+        contexts: Dict[str, list],
+    ) -> Tuple[Dict[str, Tuple[List[str], str, str]], List[str]]:
+        if not file_diffs:
+            return {}, []
+
+        file_stacks = await cls.classify_stacks_batch(file_diffs)
+        semaphore = asyncio.Semaphore(max(1, settings.LLM_REVIEW_CONCURRENCY))
+
+        results = await asyncio.gather(*(
+            cls._review_file(path, file_diff, file_stacks[path], contexts.get(path, []), semaphore)
+            for path, file_diff in file_diffs.items()
+        ))
+
+        reviewed = {
+            path: result
+            for path, result in zip(file_diffs, results)
+            if result is not None
         }
+        if not reviewed:
+            raise RuntimeError(f"All {len(file_diffs)} file reviews failed")
 
-        current = None
-        for line in text.splitlines():
-            line = line.strip()
-            for key in fields:
-                if line.startswith(key):
-                    current = key
-                    fields[key] = line[len(key):].strip()
-                    break
-            else:
-                if current and line:
-                    fields[current] += " " + line
+        failed = [path for path in file_diffs if path not in reviewed]
+        return reviewed, failed
+
+    @staticmethod
+    def merge_reviews(reviewed: List[Tuple[List[str], str, str]]) -> Tuple[str, str]:
+        summaries = []
+        suggestions = []
 
-        summary = fields["SUMMARY:"].strip()
-        suggestion = fields["SUGGESTION:"].strip()
+        for stacks, summary, suggestion in reviewed:
+            summaries.append(f"[{','.join(stacks)}] {summary}" if stacks else summary)
+            suggestions.append(suggestion)
 
-        if not suggestion or suggestion.upper() == "LGTM":
+        if suggestions and all(s.upper() == "LGTM" for s in suggestions):
             return (
-                summary or "No issues were found during review.",
+                " ".join(summaries) if summaries else "No significant changes detected.",
                 "LGTM",
             )
 
         return (
-            summary or "No summary generated.",
-            suggestion,
+            " ".join(summaries) if summaries else "No significant changes detected.",
+            " | ".join(s for s in suggestions if s.upper() != "LGTM") or "LGTM",
         )
+
+    @classmethod
+    async def generate_review(
+        cls,
+        diff: str,
+        contexts: list,
+    ) -> Tuple[str, str]:
+        files = split_diff_by_file(diff)
+        reviewed, _ = await cls.review_files(files, {path: contexts for path in files})
+        return cls.merge_reviews(list(reviewed.values()))
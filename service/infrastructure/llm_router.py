@@ -0,0 +1,113 @@
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+from openai import AsyncOpenAI
+from config import settings
+from infrastructure.llm_scheduler import Grant, llm_scheduler
+import asyncio
+
+T = TypeVar("T")
+
+LOCAL = "local"
+REMOTE = "remote"
+
+
+class Backend:
+    def __init__(
+        self,
+        name: str,
+        model: str,
+        base_url: str,
+        api_key: str,
+        input_cost: float,
+        output_cost: float,
+        context_window: int,
+        concurrency: Optional[int] = None,
+    ):
+        self.name = name
+        self.model = model
+        self.base_url = base_url
+        self.api_key = api_key
+        self.input_cost = input_cost
+        self.output_cost = output_cost
+        self.context_window = context_window
+        self.concurrency = concurrency
+        self._client: AsyncOpenAI | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+
+    def client(self) -> AsyncOpenAI:
+        if self._client is None:
+            self._client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                max_retries=0,
+            )
+        return self._client
+
+    def cost(self, prompt_tokens: int, completion_tokens: int) -> float:
+        return (prompt_tokens * self.input_cost + completion_tokens * self.output_cost) / 1000
+
+    async def run(self, call: Callable[[Grant], Awaitable[T]], tokens: int) -> T:
+        if self.concurrency is None:
+            return await llm_scheduler.run(call, tokens)
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(max(1, self.concurrency))
+        async with self._semaphore:
+            return await call(Grant(tokens))
+
+
+remote_backend = Backend(
+    REMOTE,
+    model=settings.LLM_MODEL,
+    base_url=settings.LLM_BASE_URL,
+    api_key=settings.LLM_API_KEY,
+    input_cost=settings.LLM_REMOTE_INPUT_COST_PER_1K,
+    output_cost=settings.LLM_REMOTE_OUTPUT_COST_PER_1K,
+    context_window=settings.LLM_CONTEXT_WINDOW,
+)
+
+local_backend = Backend(
+    LOCAL,
+    model=settings.OLLAMA_LLM_MODEL,
+    base_url=f"{settings.OLLAMA_BASE_URL.rstrip('/')}/v1",
+    api_key="ollama",
+    input_cost=settings.LLM_LOCAL_INPUT_COST_PER_1K,
+    output_cost=settings.LLM_LOCAL_OUTPUT_COST_PER_1K,
+    context_window=settings.OLLAMA_CONTEXT_WINDOW,
+    concurrency=settings.LLM_LOCAL_CONCURRENCY,
+)
+
+BACKENDS: Dict[str, Backend] = {b.name: b for b in (remote_backend, local_backend)}
+
+
+def diff_line_counts(file_diff: str) -> Tuple[int, int]:
+    added = removed = 0
+    for line in file_diff.splitlines():
+        if line.startswith("+") and not line.startswith("+++"):
+            added += 1
+        elif line.startswith("-") and not line.startswith("---"):
+            removed += 1
+    return added, removed
+
+
+def complexity_score(file_diff: str, stacks: List[str]) -> float:
+    added, removed = diff_line_counts(file_diff)
+    weights = settings.LLM_ROUTE_STACK_WEIGHTS
+    weight = max((weights.get(s, 1.0) for s in stacks), default=1.0)
+    return (added + removed * settings.LLM_ROUTE_DELETION_WEIGHT) * weight
+
+
+def route_review(file_diff: str, stacks: List[str]) -> Tuple[Backend, float]:
+    score = complexity_score(file_diff, stacks)
+
+    if settings.LLM_ROUTING in BACKENDS:
+        return BACKENDS[settings.LLM_ROUTING], score
+
+    if score <= settings.LLM_ROUTE_LOCAL_MAX_SCORE:
+        return local_backend, score
+    return remote_backend, score
+
+
+def route_classification() -> Backend:
+    if settings.LLM_ROUTING in BACKENDS:
+        return BACKENDS[settings.LLM_ROUTING]
+    return BACKENDS.get(settings.LLM_CLASSIFY_BACKEND, remote_backend)
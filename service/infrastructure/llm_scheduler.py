@@ -0,0 +1,313 @@
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+from config import settings
+from infrastructure.redis_client import get_redis
+from loguru import logger
+from openai import APIConnectionError, InternalServerError, RateLimitError
+import asyncio
+import random
+import time
+
+KEY_PREFIX = "{botgo:llm}"
+RPS_KEY = f"{KEY_PREFIX}:rps"
+TPM_KEY = f"{KEY_PREFIX}:tpm"
+COOLDOWN_KEY = f"{KEY_PREFIX}:cooldown"
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITIES = (INTERACTIVE, BATCH)
+
+MAX_WAIT_SECONDS = 1.0
+
+ACQUIRE_TOKENS = """
+local cooldown = redis.call("PTTL", KEYS[3])
+if cooldown > 0 then
+    return cooldown
+end
+
+local time = redis.call("TIME")
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local cost = tonumber(ARGV[5])
+local reserve = tonumber(ARGV[6])
+
+local buckets = {
+    {key = KEYS[1], rate = tonumber(ARGV[1]), capacity = tonumber(ARGV[2]), cost = 1},
+    {key = KEYS[2], rate = tonumber(ARGV[3]), capacity = tonumber(ARGV[4]), cost = cost},
+}
+
+local wait = 0
+for _, bucket in ipairs(buckets) do
+    if bucket.rate > 0 then
+        local state = redis.call("HMGET", bucket.key, "tokens", "ts")
+        local tokens = tonumber(state[1]) or bucket.capacity
+        local ts = tonumber(state[2]) or now
+        bucket.level = math.min(bucket.capacity, tokens + (now - ts) * bucket.rate / 1000)
+        bucket.cost = math.min(bucket.cost, bucket.capacity)
+
+        local need = math.min(bucket.capacity, bucket.cost + bucket.capacity * reserve)
+        if bucket.level < need then
+            wait = math.max(wait, math.ceil((need - bucket.level) * 1000 / bucket.rate))
+        end
+    end
+end
+
+if wait > 0 then
+    return wait
+end
+
+for _, bucket in ipairs(buckets) do
+    if bucket.rate > 0 then
+        redis.call("HSET", bucket.key, "tokens", bucket.level - bucket.cost, "ts", now)
+        redis.call("PEXPIRE", bucket.key, math.ceil(bucket.capacity * 1000 / bucket.rate) + 1000)
+    end
+end
+return 0
+"""
+
+REFUND_TOKENS = """
+local state = redis.call("HMGET", KEYS[1], "tokens", "ts")
+if not state[1] then
+    return 0
+end
+
+local time = redis.call("TIME")
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local tokens = tonumber(state[1]) + (now - tonumber(state[2])) * rate / 1000
+
+redis.call("HSET", KEYS[1], "tokens", math.min(capacity, tokens + tonumber(ARGV[3])), "ts", now)
+return 1
+"""
+
+T = TypeVar("T")
+
+llm_priority: ContextVar[str] = ContextVar("llm_priority", default=BATCH)
+
+
+@contextmanager
+def priority(value: str):
+    token = llm_priority.set(value)
+    try:
+        yield
+    finally:
+        llm_priority.reset(token)
+
+
+class Grant:
+    def __init__(self, tokens: int):
+        self.tokens = tokens
+        self.used_tokens: Optional[int] = None
+
+
+class AdaptiveLimiter:
+    def __init__(self, initial: int, minimum: int, maximum: int):
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.active = 0
+        self.throttled = 0
+        self._last_decrease = 0.0
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {p: deque() for p in PRIORITIES}
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        for p in PRIORITIES:
+            waiters = self._waiters[p]
+            while waiters:
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    return waiter
+        return None
+
+    def _wake(self) -> None:
+        while self.active < int(self.limit):
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            self.active += 1
+            waiter.set_result(None)
+
+    async def acquire(self, p: str) -> None:
+        if self.active < int(self.limit) and not any(self._waiters.values()):
+            self.active += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[p].append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self.active -= 1
+        self._wake()
+
+    def _decrease(self, factor: float) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < settings.LLM_BACKOFF_INTERVAL:
+            return
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit * factor)
+
+    def on_success(self, latency: float) -> None:
+        if latency > settings.LLM_LATENCY_TARGET:
+            self._decrease(0.9)
+            return
+
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        self._wake()
+
+    def on_overload(self) -> None:
+        self._decrease(0.9)
+
+    def on_throttle(self) -> None:
+        self.throttled += 1
+        self._decrease(0.5)
+
+
+def _retry_after(error: Exception, attempt: int) -> float:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+
+    return settings.LLM_RETRY_BACKOFF * (2 ** attempt) * (1 + random.random())
+
+
+class LLMScheduler:
+    def __init__(self):
+        self.limiter = AdaptiveLimiter(
+            settings.LLM_MAX_CONCURRENCY,
+            settings.LLM_MIN_CONCURRENCY,
+            settings.LLM_MAX_CONCURRENCY,
+        )
+        self.waited_seconds = 0.0
+
+    async def _acquire_tokens(self, tokens: int, p: str) -> None:
+        reserve = 0.0 if p == INTERACTIVE else settings.LLM_INTERACTIVE_RESERVE
+        started = time.perf_counter()
+
+        while True:
+            try:
+                wait_ms = await get_redis().eval(
+                    ACQUIRE_TOKENS,
+                    3,
+                    RPS_KEY,
+                    TPM_KEY,
+                    COOLDOWN_KEY,
+                    settings.LLM_RPS,
+                    max(1.0, settings.LLM_RPS),
+                    settings.LLM_TPM / 60,
+                    settings.LLM_TPM,
+                    tokens,
+                    reserve,
+                )
+            except Exception:
+                logger.warning("LLM rate limiter unavailable, continuing without it")
+                return
+
+            if not wait_ms:
+                break
+
+            await asyncio.sleep(min(MAX_WAIT_SECONDS, int(wait_ms) / 1000) * (1 + random.random() * 0.1))
+
+        self.waited_seconds += time.perf_counter() - started
+
+    async def _refund(self, grant: Grant) -> None:
+        if not settings.LLM_TPM or grant.used_tokens is None:
+            return
+
+        unused = grant.tokens - grant.used_tokens
+        if unused <= 0:
+            return
+
+        try:
+            await get_redis().eval(
+                REFUND_TOKENS,
+                1,
+                TPM_KEY,
+                settings.LLM_TPM / 60,
+                settings.LLM_TPM,
+                unused,
+            )
+        except Exception:
+            logger.warning("LLM token refund failed", tokens=unused)
+
+    async def _cooldown(self, seconds: float) -> None:
+        try:
+            await get_redis().set(COOLDOWN_KEY, 1, px=max(1, int(seconds * 1000)))
+        except Exception:
+            logger.warning("Could not publish LLM cooldown", seconds=seconds)
+
+    async def run(self, call: Callable[[Grant], Awaitable[T]], tokens: int) -> T:
+        p = llm_priority.get()
+        attempt = 0
+
+        while True:
+            await self._acquire_tokens(tokens, p)
+            await self.limiter.acquire(p)
+
+            grant = Grant(tokens)
+            started = time.perf_counter()
+            try:
+                result = await call(grant)
+            except RateLimitError as e:
+                self.limiter.on_throttle()
+                retry_after = _retry_after(e, attempt)
+                logger.warning(
+                    "LLM rate limited, cooling down for {seconds}s",
+                    seconds=round(retry_after, 2),
+                    attempt=attempt,
+                    concurrency=int(self.limiter.limit),
+                    priority=p,
+                )
+                await self._cooldown(retry_after)
+
+                attempt += 1
+                if attempt > settings.LLM_MAX_RETRIES:
+                    raise
+                continue
+            except (APIConnectionError, InternalServerError) as e:
+                self.limiter.on_overload()
+                attempt += 1
+                if attempt > settings.LLM_MAX_RETRIES:
+                    raise
+
+                retry_after = _retry_after(e, attempt - 1)
+                logger.warning(
+                    "LLM request failed ({error}), retrying in {seconds}s",
+                    error=type(e).__name__,
+                    seconds=round(retry_after, 2),
+                    attempt=attempt,
+                )
+                await asyncio.sleep(retry_after)
+                continue
+            finally:
+                self.limiter.release()
+
+            self.limiter.on_success(time.perf_counter() - started)
+            await self._refund(grant)
+            return result
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "concurrency_limit": round(self.limiter.limit, 2),
+            "active": self.limiter.active,
+            "queued": sum(len(w) for w in self.limiter._waiters.values()),
+            "throttled": self.limiter.throttled,
+            "waited_seconds": round(self.waited_seconds, 2),
+        }
+
+
+llm_scheduler = LLMScheduler()
@@ -0,0 +1,314 @@
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from infrastructure.vector_store import HunkDocument, SimilarContext, VectorStore
+import asyncio
+import fcntl
+import json
+import numpy as np
+import os
+import threading
+
+INITIAL_CAPACITY = 1024
+SEARCH_BLOCK_ROWS = 8192
+
+
+class LocalVectorStore(VectorStore):
+    def __init__(self, path: str, quantize: bool = False):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        self.quantize = quantize
+        self.dtype = np.int8 if quantize else np.float32
+
+        self._index_path = self.path / "index.json"
+        self._vectors_path = self.path / "vectors.npy"
+        self._scales_path = self.path / "scales.npy"
+        self._meta_path = self.path / "meta.jsonl"
+
+        self._lock = threading.RLock()
+        self._lock_file = None
+        self._lock_pid: Optional[int] = None
+        self._dim: Optional[int] = None
+        self._count = 0
+        self._vectors: Optional[np.memmap] = None
+        self._scales: Optional[np.memmap] = None
+        self._vectors_inode: Optional[int] = None
+        self._meta_offset = 0
+        self._project_ids = np.zeros(0, dtype=np.int64)
+        self._mr_iids = np.zeros(0, dtype=np.int64)
+        self._meta: List[Dict] = []
+        self._rows: Dict[str, int] = {}
+
+        with self._locked(exclusive=False):
+            pass
+
+    def _lock_handle(self):
+        if self._lock_pid != os.getpid():
+            if self._lock_file is not None:
+                self._lock_file.close()
+            self._lock_file = (self.path / "index.lock").open("a")
+            self._lock_pid = os.getpid()
+        return self._lock_file
+
+    @contextmanager
+    def _locked(self, exclusive: bool) -> Iterator[None]:
+        with self._lock:
+            handle = self._lock_handle()
+            fcntl.flock(handle, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                self._refresh()
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _refresh(self) -> None:
+        if not self._index_path.exists():
+            return
+
+        if self._dim is None:
+            index = json.loads(self._index_path.read_text())
+            if index.get("quantize", False) != self.quantize:
+                raise ValueError(
+                    f"Vector index at {self.path} was built with quantize={index.get('quantize')}"
+                )
+            self._dim = index["dim"]
+
+        if os.stat(self._vectors_path).st_ino != self._vectors_inode:
+            self._open_vectors()
+
+        self._read_meta()
+
+    def _open_vectors(self) -> None:
+        self._vectors = np.load(self._vectors_path, mmap_mode="r+")
+        if self.quantize:
+            self._scales = np.load(self._scales_path, mmap_mode="r+")
+        self._vectors_inode = os.stat(self._vectors_path).st_ino
+
+    def _read_meta(self) -> None:
+        if not self._meta_path.exists():
+            return
+
+        with self._meta_path.open("rb") as f:
+            f.seek(self._meta_offset)
+            data = f.read()
+
+        end = data.rfind(b"\n") + 1
+        if not end:
+            return
+        self._meta_offset += end
+
+        records = [json.loads(line) for line in data[:end].splitlines() if line.strip()]
+        if not records:
+            return
+
+        self._reserve(max(record["row"] for record in records) + 1)
+        for record in records:
+            self._set_meta(record)
+
+    def _reserve(self, count: int) -> None:
+        self._count = max(self._count, count)
+        if len(self._meta) < self._count:
+            grow_by = self._count - len(self._meta)
+            self._meta.extend({} for _ in range(grow_by))
+            self._project_ids = np.concatenate([self._project_ids, np.full(grow_by, -1, dtype=np.int64)])
+            self._mr_iids = np.concatenate([self._mr_iids, np.full(grow_by, -1, dtype=np.int64)])
+
+    def _set_meta(self, record: Dict) -> None:
+        row = record["row"]
+        self._meta[row] = record
+        self._rows[record["uuid"]] = row
+        self._project_ids[row] = record["project_id"]
+        self._mr_iids[row] = record["mr_iid"]
+
+    def _create(self, dim: int) -> None:
+        self._dim = dim
+        self._vectors = np.lib.format.open_memmap(
+            self._vectors_path, mode="w+", dtype=self.dtype, shape=(INITIAL_CAPACITY, dim),
+        )
+        if self.quantize:
+            self._scales = np.lib.format.open_memmap(
+                self._scales_path, mode="w+", dtype=np.float32, shape=(INITIAL_CAPACITY,),
+            )
+        self._vectors_inode = os.stat(self._vectors_path).st_ino
+        self._index_path.write_text(json.dumps({"dim": dim, "quantize": self.quantize}))
+
+    def _grow(self, path: Path, current: np.memmap, capacity: int) -> np.memmap:
+        tmp = path.with_suffix(".tmp.npy")
+        grown = np.lib.format.open_memmap(
+            tmp, mode="w+", dtype=current.dtype, shape=(capacity, *current.shape[1:]),
+        )
+        grown[:len(current)] = current
+        grown.flush()
+        del grown
+        del current
+        os.replace(tmp, path)
+        return np.load(path, mmap_mode="r+")
+
+    def _ensure_capacity(self, rows: int) -> None:
+        capacity = len(self._vectors)
+        if rows <= capacity:
+            return
+
+        while capacity < rows:
+            capacity *= 2
+
+        self._vectors = self._grow(self._vectors_path, self._vectors, capacity)
+        if self.quantize:
+            self._scales = self._grow(self._scales_path, self._scales, capacity)
+        self._vectors_inode = os.stat(self._vectors_path).st_ino
+
+    def _encode(self, vectors: np.ndarray):
+        if not self.quantize:
+            return vectors, None
+
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _insert_sync(self, documents: List[HunkDocument], vectors: List[List[float]]) -> int:
+        if not documents:
+            return 0
+
+        matrix = self._normalize(np.asarray(vectors, dtype=np.float32))
+
+        with self._locked(exclusive=True):
+            if self._vectors is None:
+                self._create(matrix.shape[1])
+            if matrix.shape[1] != self._dim:
+                raise ValueError(f"Expected {self._dim}-dim vectors, got {matrix.shape[1]}")
+
+            rows = []
+            assigned: Dict[str, int] = {}
+            for document in documents:
+                row = self._rows.get(document.uuid, assigned.get(document.uuid))
+                if row is None:
+                    row = self._count + len(assigned)
+                    assigned[document.uuid] = row
+                rows.append(row)
+
+            self._ensure_capacity(self._count + len(assigned))
+            self._reserve(self._count + len(assigned))
+
+            codes, scales = self._encode(matrix)
+            index = np.asarray(rows)
+            self._vectors[index] = codes
+            self._vectors.flush()
+            if scales is not None:
+                self._scales[index] = scales
+                self._scales.flush()
+
+            with self._meta_path.open("a") as f:
+                for row, document in zip(rows, documents):
+                    record = {
+                        "row": row,
+                        "uuid": document.uuid,
+                        "content": document.content,
+                        "project_id": document.project_id,
+                        "mr_iid": document.mr_iid,
+                        "file_path": document.file_path,
+                    }
+                    self._set_meta(record)
+                    f.write(json.dumps(record) + "\n")
+                f.flush()
+                self._meta_offset = f.tell()
+
+        return len(documents)
+
+    def _scores(self, queries: np.ndarray) -> np.ndarray:
+        stored = self._vectors[:self._count]
+
+        if not self.quantize:
+            return np.asarray(stored) @ queries.T
+
+        scales = self._scales[:self._count]
+        blocks = []
+        for start in range(0, self._count, SEARCH_BLOCK_ROWS):
+            block = np.asarray(stored[start:start + SEARCH_BLOCK_ROWS], dtype=np.float32)
+            blocks.append((block @ queries.T) * scales[start:start + SEARCH_BLOCK_ROWS, None])
+        return np.concatenate(blocks)
+
+    def search_sync(
+        self,
+        vectors: List[List[float]],
+        limit: int,
+        project_id: Optional[int] = None,
+        exclude_mr_iid: Optional[int] = None,
+    ) -> List[List[SimilarContext]]:
+        if not vectors:
+            return []
+
+        queries = self._normalize(np.asarray(vectors, dtype=np.float32))
+
+        with self._locked(exclusive=False):
+            if self._vectors is None or self._count == 0:
+                return [[] for _ in vectors]
+
+            mask = None
+            if project_id is not None:
+                mask = self._project_ids[:self._count] == project_id
+            if exclude_mr_iid is not None:
+                excluded = self._mr_iids[:self._count] != exclude_mr_iid
+                mask = excluded if mask is None else mask & excluded
+
+            if mask is not None and not mask.any():
+                return [[] for _ in vectors]
+
+            scores = self._scores(queries)
+            if mask is not None:
+                scores[~mask] = -np.inf
+
+            candidates = int(mask.sum()) if mask is not None else self._count
+            k = min(limit, candidates)
+
+            results = []
+            for column in range(scores.shape[1]):
+                column_scores = scores[:, column]
+                top = np.argpartition(-column_scores, k - 1)[:k] if k < len(column_scores) else np.arange(len(column_scores))
+                top = top[np.argsort(-column_scores[top])][:k]
+
+                matches = []
+                for row in top:
+                    meta = self._meta[row]
+                    if not meta:
+                        continue
+                    matches.append(SimilarContext(
+                        content=meta["content"],
+                        distance=float(1.0 - column_scores[row]),
+                        project_id=meta["project_id"],
+                        mr_iid=meta["mr_iid"],
+                        file_path=meta.get("file_path"),
+                    ))
+                results.append(matches)
+
+            return results
+
+    async def insert_vectors(self, documents: List[HunkDocument], vectors: List[List[float]]) -> int:
+        return await asyncio.to_thread(self._insert_sync, documents, vectors)
+
+    async def search(
+        self,
+        vectors: List[List[float]],
+        limit: int,
+        project_id: Optional[int] = None,
+        exclude_mr_iid: Optional[int] = None,
+    ) -> List[List[SimilarContext]]:
+        return await asyncio.to_thread(self.search_sync, vectors, limit, project_id, exclude_mr_iid)
+
+    def close(self):
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+            if self._scales is not None:
+                self._scales.flush()
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+                self._lock_pid = None
@@ -0,0 +1,177 @@
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Iterator, List, Tuple
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from pymongo import monitoring
+import asyncio
+import os
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+INGRESS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+FILE_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+NODE_LATENCY = Histogram(
+    "botgo_workflow_node_seconds",
+    "Time spent in each review workflow node",
+    ["node"],
+    buckets=LATENCY_BUCKETS,
+)
+NODE_ERRORS = Counter(
+    "botgo_workflow_node_errors_total",
+    "Workflow nodes that set an error on the review state",
+    ["node"],
+)
+
+LLM_LATENCY = Histogram(
+    "botgo_llm_call_seconds",
+    "LLM completion latency",
+    ["backend", "model", "stack"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_TTFT = Histogram(
+    "botgo_llm_time_to_first_token_seconds",
+    "Time until the first streamed LLM token",
+    ["backend", "model"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "botgo_llm_tokens_total",
+    "LLM tokens consumed",
+    ["backend", "model", "stack", "kind"],
+)
+
+EXTERNAL_LATENCY = Histogram(
+    "botgo_external_call_seconds",
+    "Latency of calls to GitLab, Mongo, the vector store and embeddings",
+    ["service", "operation"],
+    buckets=LATENCY_BUCKETS,
+)
+EXTERNAL_ERRORS = Counter(
+    "botgo_external_call_errors_total",
+    "Failed calls to external services",
+    ["service", "operation"],
+)
+
+MR_FILES = Histogram(
+    "botgo_mr_files",
+    "Files per reviewed merge request",
+    ["kind"],
+    buckets=FILE_BUCKETS,
+)
+
+WEBHOOK_LATENCY = Histogram(
+    "botgo_webhook_ingress_seconds",
+    "Time to accept a GitLab webhook",
+    ["outcome"],
+    buckets=INGRESS_BUCKETS,
+)
+
+QUEUE_DEPTH = Gauge(
+    "botgo_celery_queue_depth",
+    "Messages waiting in a Celery queue",
+    ["queue"],
+    multiprocess_mode="livemax",
+)
+QUEUE_WAIT = Histogram(
+    "botgo_celery_queue_wait_seconds",
+    "Time a task waited in the queue after it became due",
+    ["task"],
+    buckets=LATENCY_BUCKETS,
+)
+TASK_DURATION = Histogram(
+    "botgo_celery_task_seconds",
+    "Celery task run time",
+    ["task", "state"],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+@contextmanager
+def observe_call(service: str, operation: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        EXTERNAL_ERRORS.labels(service, operation).inc()
+        raise
+    finally:
+        EXTERNAL_LATENCY.labels(service, operation).observe(time.perf_counter() - started)
+
+
+_node_observers: List[Callable[[str, float], None]] = []
+
+
+def add_node_observer(observer: Callable[[str, float], None]) -> None:
+    _node_observers.append(observer)
+
+
+def timed_node(name: str, node: Callable) -> Callable:
+    def record(failed_before: bool, result, started: float):
+        elapsed = time.perf_counter() - started
+        NODE_LATENCY.labels(name).observe(elapsed)
+        for observer in _node_observers:
+            observer(name, elapsed)
+        if not failed_before and isinstance(result, dict) and result.get("error"):
+            NODE_ERRORS.labels(name).inc()
+
+    if asyncio.iscoroutinefunction(node):
+        @wraps(node)
+        async def run_async(state):
+            failed_before = bool(state.get("error"))
+            started = time.perf_counter()
+            result = await node(state)
+            record(failed_before, result, started)
+            return result
+
+        return run_async
+
+    @wraps(node)
+    def run(state):
+        failed_before = bool(state.get("error"))
+        started = time.perf_counter()
+        result = node(state)
+        record(failed_before, result, started)
+        return result
+
+    return run
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    def __init__(self):
+        self._started = {}
+
+    def started(self, event):
+        self._started[event.request_id] = time.perf_counter()
+
+    def _finish(self, event, failed: bool):
+        started = self._started.pop(event.request_id, None)
+        if started is None:
+            return
+        EXTERNAL_LATENCY.labels("mongo", event.command_name).observe(time.perf_counter() - started)
+        if failed:
+            EXTERNAL_ERRORS.labels("mongo", event.command_name).inc()
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
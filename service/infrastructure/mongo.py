@@ -1,12 +1,21 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
 from config import settings
-from db.models import Review
+from db.models import Review, BackfillCheckpoint, DiffBlob
+from db.migrations import merge_duplicate_reviews
+from infrastructure.metrics import MongoCommandListener
+from loguru import logger
 
-client = AsyncIOMotorClient(settings.MONGO_URI)
+client = AsyncIOMotorClient(settings.MONGO_URI, event_listeners=[MongoCommandListener()])
 db = client[settings.MONGO_DB_NAME]
 
+def reset_client():
+    global client, db
+    client = AsyncIOMotorClient(settings.MONGO_URI, event_listeners=[MongoCommandListener()])
+    db = client[settings.MONGO_DB_NAME]
+
 async def connect_to_mongo():
     await db.command("ping")
-    await init_beanie(database=db, document_models=[Review])
-    print("MongoDB connected and Beanie initialized!")
\ No newline at end of file
+    await merge_duplicate_reviews(db)
+    await init_beanie(database=db, document_models=[Review, BackfillCheckpoint, DiffBlob])
+    logger.info("MongoDB connected and Beanie initialized")
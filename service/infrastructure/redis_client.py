@@ -0,0 +1,15 @@
+from redis.asyncio import Redis
+from config import settings
+import asyncio
+import weakref
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Redis]" = weakref.WeakKeyDictionary()
+
+
+def get_redis() -> Redis:
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = Redis.from_url(settings.REDIS_URL)
+        _clients[loop] = client
+    return client
@@ -0,0 +1,92 @@
+from typing import Dict, List, Optional, Tuple
+from config import settings
+from infrastructure.redis_client import get_redis
+from loguru import logger
+import hashlib
+import json
+import time
+
+KEY_PREFIX = "botgo:review-cache"
+INDEX_KEY = f"{KEY_PREFIX}:index"
+STATS_KEY = f"{KEY_PREFIX}:stats"
+
+
+def review_cache_key(
+    file_diff: str,
+    stacks: List[str],
+    contexts: List[str],
+    prompt_version: str,
+    model: str,
+) -> str:
+    context_digest = hashlib.sha256("\n---\n".join(contexts or []).encode("utf-8")).hexdigest()
+
+    digest = hashlib.sha256()
+    for part in (model, prompt_version, ",".join(sorted(stacks)), context_digest, file_diff):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return f"{KEY_PREFIX}:{digest.hexdigest()}"
+
+
+class ReviewCache:
+    async def get(self, key: str) -> Optional[Tuple[str, str]]:
+        if not settings.REVIEW_CACHE_ENABLED:
+            return None
+
+        try:
+            redis = get_redis()
+            raw = await redis.get(key)
+            await redis.hincrby(STATS_KEY, "hits" if raw else "misses", 1)
+        except Exception:
+            logger.warning("Review cache lookup failed", key=key)
+            return None
+
+        if not raw:
+            return None
+
+        entry = json.loads(raw)
+        return entry["summary"], entry["suggestion"]
+
+    async def set(self, key: str, summary: str, suggestion: str) -> None:
+        if not settings.REVIEW_CACHE_ENABLED:
+            return
+
+        now = time.time()
+        payload = json.dumps({"summary": summary, "suggestion": suggestion})
+
+        try:
+            redis = get_redis()
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.set(key, payload, ex=settings.REVIEW_CACHE_TTL)
+                pipe.zadd(INDEX_KEY, {key: now})
+                pipe.zremrangebyscore(INDEX_KEY, 0, now - settings.REVIEW_CACHE_TTL)
+                pipe.zcard(INDEX_KEY)
+                *_, size = await pipe.execute()
+
+            overflow = size - settings.REVIEW_CACHE_MAX_ENTRIES
+            if overflow > 0:
+                evicted = [k for k, _ in await redis.zpopmin(INDEX_KEY, overflow)]
+                if evicted:
+                    await redis.delete(*evicted)
+                    await redis.hincrby(STATS_KEY, "evictions", len(evicted))
+        except Exception:
+            logger.warning("Review cache store failed", key=key)
+
+    async def stats(self) -> Dict[str, float]:
+        redis = get_redis()
+        raw = await redis.hgetall(STATS_KEY)
+        counters = {k.decode(): int(v) for k, v in raw.items()}
+
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        lookups = hits + misses
+
+        return {
+            "hits": hits,
+            "misses": misses,
+            "evictions": counters.get("evictions", 0),
+            "entries": await redis.zcard(INDEX_KEY),
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+review_cache = ReviewCache()
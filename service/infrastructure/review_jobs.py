@@ -0,0 +1,53 @@
+from config import settings
+from infrastructure.redis_client import get_redis
+
+KEY_PREFIX = "botgo:mr"
+
+RELEASE_LOCK = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+def _key(project_id: int, mr_iid: int, suffix: str) -> str:
+    return f"{KEY_PREFIX}:{project_id}:{mr_iid}:{suffix}"
+
+
+class ReviewJobs:
+    async def next_generation(self, project_id: int, mr_iid: int) -> int:
+        key = _key(project_id, mr_iid, "generation")
+        async with get_redis().pipeline(transaction=True) as pipe:
+            pipe.incr(key)
+            pipe.expire(key, settings.REVIEW_GENERATION_TTL)
+            generation, _ = await pipe.execute()
+        return int(generation)
+
+    async def latest_generation(self, project_id: int, mr_iid: int) -> int:
+        raw = await get_redis().get(_key(project_id, mr_iid, "generation"))
+        return int(raw or 0)
+
+    async def is_superseded(self, project_id: int, mr_iid: int, generation: int | None) -> bool:
+        if generation is None:
+            return False
+        return await self.latest_generation(project_id, mr_iid) > generation
+
+    async def acquire(self, project_id: int, mr_iid: int, generation: int) -> bool:
+        return bool(await get_redis().set(
+            _key(project_id, mr_iid, "lock"),
+            str(generation),
+            nx=True,
+            ex=settings.REVIEW_LOCK_TTL,
+        ))
+
+    async def release(self, project_id: int, mr_iid: int, generation: int) -> None:
+        await get_redis().eval(
+            RELEASE_LOCK,
+            1,
+            _key(project_id, mr_iid, "lock"),
+            str(generation),
+        )
+
+
+review_jobs = ReviewJobs()
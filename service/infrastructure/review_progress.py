@@ -0,0 +1,98 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from config import settings
+from infrastructure.redis_client import get_redis
+from loguru import logger
+import asyncio
+import json
+import time
+
+KEY_PREFIX = "botgo:progress"
+DONE = "done"
+
+Event = Tuple[str, str, Dict[str, Any]]
+
+_task_id: ContextVar[Optional[str]] = ContextVar("review_progress_task", default=None)
+
+
+def _key(task_id: str) -> str:
+    return f"{KEY_PREFIX}:{task_id}"
+
+
+def _text(value) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+class ReviewProgress:
+    @contextmanager
+    def scope(self, task_id: Optional[str]) -> Iterator[None]:
+        token = _task_id.set(task_id)
+        try:
+            yield
+        finally:
+            _task_id.reset(token)
+
+    async def publish(self, event: str, **data) -> None:
+        task_id = _task_id.get()
+        if task_id is None:
+            return
+
+        key = _key(task_id)
+        fields = {"event": event, "data": json.dumps({**data, "ts": time.time()}, default=str)}
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                pipe.xadd(key, fields, maxlen=settings.REVIEW_PROGRESS_MAX_EVENTS, approximate=True)
+                pipe.expire(key, settings.REVIEW_PROGRESS_TTL)
+                await pipe.execute()
+        except Exception:
+            logger.warning("Could not publish review progress", task_id=task_id, progress_event=event)
+
+    async def read(self, task_id: str, after: str = "0-0", block_ms: Optional[int] = None) -> List[Event]:
+        response = await get_redis().xread({_key(task_id): after}, block=block_ms)
+
+        events = []
+        for _, entries in response or []:
+            for event_id, fields in entries:
+                fields = {_text(k): _text(v) for k, v in fields.items()}
+                events.append((_text(event_id), fields["event"], json.loads(fields["data"])))
+        return events
+
+    async def latest(self, task_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            entries = await get_redis().xrevrange(_key(task_id), count=1)
+        except Exception:
+            logger.warning("Could not read review progress", task_id=task_id)
+            return None
+
+        if not entries:
+            return None
+        _, fields = entries[0]
+        fields = {_text(k): _text(v) for k, v in fields.items()}
+        return {"event": fields["event"], **json.loads(fields["data"])}
+
+    def tracked(self, name: str, node: Callable) -> Callable:
+        @wraps(node)
+        async def run(state):
+            failed_before = bool(state.get("error"))
+            await self.publish("node_started", node=name)
+            started = time.perf_counter()
+
+            result = node(state)
+            if asyncio.iscoroutine(result):
+                result = await result
+
+            error = result.get("error") if isinstance(result, dict) else None
+            await self.publish(
+                "node_finished",
+                node=name,
+                elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+                error=None if failed_before else error,
+            )
+            return result
+
+        return run
+
+
+review_progress = ReviewProgress()
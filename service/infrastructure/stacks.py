@@ -0,0 +1,121 @@
+from typing import List, Optional
+import posixpath
+import re
+
+NUXT_VUE_TS = ["nuxt", "vue", "frontend-ts"]
+VUE_TS = ["vue", "frontend-ts"]
+
+EXTENSION_STACKS = {
+    ".go": ["golang"],
+    ".py": ["python"],
+    ".pyi": ["python"],
+    ".sql": ["data-sql"],
+    ".ts": ["frontend-ts"],
+    ".tsx": ["frontend-ts"],
+    ".js": ["frontend-ts"],
+    ".jsx": ["frontend-ts"],
+    ".mjs": ["frontend-ts"],
+    ".cjs": ["frontend-ts"],
+    ".vue": VUE_TS,
+    ".tf": ["devops"],
+    ".tfvars": ["devops"],
+    ".hcl": ["devops"],
+    ".sh": ["devops"],
+    ".bash": ["devops"],
+    ".md": ["docs"],
+    ".mdx": ["docs"],
+    ".rst": ["docs"],
+    ".adoc": ["docs"],
+}
+
+FILENAME_STACKS = {
+    "go.mod": ["golang"],
+    "go.sum": ["golang"],
+    "requirements.txt": ["python"],
+    "pyproject.toml": ["python"],
+    "setup.py": ["python"],
+    "setup.cfg": ["python"],
+    "pipfile": ["python"],
+    "nuxt.config.ts": NUXT_VUE_TS,
+    "nuxt.config.js": NUXT_VUE_TS,
+    "app.vue": NUXT_VUE_TS,
+    "makefile": ["devops"],
+    ".gitlab-ci.yml": ["devops"],
+    "jenkinsfile": ["devops"],
+    "license": ["docs"],
+    "changelog": ["docs"],
+}
+
+FILENAME_PATTERNS = [
+    (re.compile(r"^dockerfile(\..+)?$|\.dockerfile$"), ["devops"]),
+    (re.compile(r"^docker-compose.*\.ya?ml$|^compose\.ya?ml$"), ["devops"]),
+    (re.compile(r"^requirements[-_.].*\.txt$"), ["python"]),
+]
+
+MIGRATION_DIRECTORY = re.compile(r"(^|/)(alembic|migrations?|db/migrate)/")
+DEVOPS_DIRECTORY = re.compile(
+    r"(^|/)(\.github/workflows|helm|charts|k8s|kubernetes|terraform|ansible|deploy)/"
+    r".*\.(ya?ml|json|tpl)$"
+)
+DOCS_DIRECTORY = re.compile(r"(^|/)docs?/")
+
+NUXT_SIGNATURE = re.compile(
+    r"\b(defineNuxtConfig|defineNuxtPlugin|defineNuxtRouteMiddleware|definePageMeta|"
+    r"useAsyncData|useFetch|useRuntimeConfig|useNuxtApp|navigateTo)\b"
+)
+VUE_SIGNATURE = re.compile(
+    r"\b(defineComponent|defineProps|defineEmits|from ['\"]vue['\"]|"
+    r"ref\(|reactive\(|computed\(|watchEffect\()"
+)
+
+
+def _added_lines(file_diff: str) -> str:
+    return "\n".join(
+        line[1:] for line in file_diff.splitlines()
+        if line.startswith(("+", " ")) and not line.startswith("+++")
+    )
+
+
+def _content_stacks(stacks: List[str], file_diff: str) -> List[str]:
+    if not set(stacks) & {"frontend-ts", "vue"}:
+        return stacks
+
+    content = _added_lines(file_diff)
+
+    if NUXT_SIGNATURE.search(content):
+        return NUXT_VUE_TS
+
+    if stacks == ["frontend-ts"] and VUE_SIGNATURE.search(content):
+        return VUE_TS
+
+    return stacks
+
+
+def classify_by_rules(path: str, file_diff: str = "") -> Optional[List[str]]:
+    normalized = path.strip().lower()
+    filename = posixpath.basename(normalized)
+    _, extension = posixpath.splitext(filename)
+
+    if filename in FILENAME_STACKS:
+        return list(FILENAME_STACKS[filename])
+
+    for pattern, stacks in FILENAME_PATTERNS:
+        if pattern.search(filename):
+            return list(stacks)
+
+    extension_stacks = EXTENSION_STACKS.get(extension)
+
+    if MIGRATION_DIRECTORY.search(normalized):
+        stacks = [st for st in extension_stacks or [] if st != "docs"]
+        return stacks + ["data-sql"] if "data-sql" not in stacks else stacks
+
+    if DEVOPS_DIRECTORY.search(normalized):
+        return ["devops"]
+
+    if extension_stacks:
+        return list(_content_stacks(extension_stacks, file_diff))
+
+    if DOCS_DIRECTORY.search(normalized):
+        return ["docs"]
+
+    return None
@@ -0,0 +1,153 @@
+from typing import Any, Dict, List, Optional, Tuple
+from config import settings
+from infrastructure.llm_router import diff_line_counts
+import fnmatch
+import posixpath
+import re
+
+REVIEW = "review"
+METADATA = "metadata"
+SKIP = "skip"
+
+LOCKFILES = {
+    "package-lock.json",
+    "npm-shrinkwrap.json",
+    "yarn.lock",
+    "pnpm-lock.yaml",
+    "bun.lockb",
+    "go.sum",
+    "poetry.lock",
+    "pipfile.lock",
+    "uv.lock",
+    "pdm.lock",
+    "cargo.lock",
+    "composer.lock",
+    "gemfile.lock",
+    "podfile.lock",
+    "packages.lock.json",
+}
+
+VENDORED_DIRECTORIES = {"vendor", "node_modules", "third_party", "bower_components"}
+BUILD_DIRECTORIES = {"dist", "build", ".output", ".nuxt", ".next"}
+
+GENERATED_PATTERNS = [
+    "*.pb.go",
+    "*_pb2.py",
+    "*_pb2_grpc.py",
+    "*_pb2.pyi",
+    "*.pb.ts",
+    "*_pb.js",
+    "*_pb.d.ts",
+    "*.generated.*",
+    "*.g.dart",
+    "*_generated.go",
+    "zz_generated*.go",
+]
+
+MINIFIED_PATTERNS = ["*.min.js", "*.min.css", "*.map", "*.bundle.js", "*-bundle.js"]
+SNAPSHOT_PATTERNS = ["*.snap", "*/__snapshots__/*"]
+
+GENERATED_MARKER = re.compile(r"^\+.*(Code generated .* DO NOT EDIT|@generated\b)", re.MULTILINE)
+BINARY_MARKER = re.compile(r"^(Binary files .* differ|GIT binary patch)", re.MULTILINE)
+
+MINIFIED_LINE_CHARS = 1000
+
+
+def _matches(path: str, patterns: List[str]) -> bool:
+    name = posixpath.basename(path)
+    return any(
+        fnmatch.fnmatchcase(path, pattern) or fnmatch.fnmatchcase(name, pattern)
+        for pattern in patterns
+    )
+
+
+def _project_rules(project_id: int) -> Dict[str, List[str]]:
+    rules: Dict[str, List[str]] = {}
+    for key in ("*", str(project_id)):
+        for action, patterns in settings.TRIAGE_PROJECT_RULES.get(key, {}).items():
+            rules.setdefault(action, []).extend(patterns)
+    return rules
+
+
+def _is_minified(diff: str) -> bool:
+    added = [line for line in diff.splitlines() if line.startswith("+") and not line.startswith("+++")]
+    return bool(added) and len(added) <= 5 and max(len(line) for line in added) > MINIFIED_LINE_CHARS
+
+
+def classify_file(file: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+    path = file["new_path"] or file["old_path"]
+    diff = file.get("diff", "")
+    parts = path.lower().split("/")
+    name = parts[-1]
+
+    if VENDORED_DIRECTORIES.intersection(parts[:-1]):
+        return SKIP, "vendored"
+    if name in LOCKFILES:
+        return METADATA, "lockfile"
+    if file.get("generated_file") or _matches(path, GENERATED_PATTERNS) or GENERATED_MARKER.search(diff):
+        return SKIP, "generated"
+    if _matches(path, SNAPSHOT_PATTERNS):
+        return SKIP, "snapshot"
+    if _matches(path, MINIFIED_PATTERNS) or _is_minified(diff):
+        return SKIP, "minified"
+    if BUILD_DIRECTORIES.intersection(parts[:-1]):
+        return SKIP, "build-output"
+    if BINARY_MARKER.search(diff):
+        return METADATA, "binary"
+    if file.get("renamed_file") and not diff.strip():
+        return METADATA, "rename"
+    if file.get("deleted_file"):
+        return METADATA, "deleted"
+    if not diff.strip():
+        return METADATA, "empty"
+
+    return REVIEW, None
+
+
+def metadata_summary(file: Dict[str, Any], reason: str) -> str:
+    path = file["new_path"] or file["old_path"]
+    added, removed = diff_line_counts(file.get("diff", ""))
+
+    if reason == "rename":
+        return f"{file['old_path']} renamed to {path} without content changes."
+    if reason == "deleted":
+        return f"{path} deleted ({removed} lines)."
+    if reason == "binary":
+        return f"Binary file {path} changed."
+    if reason == "lockfile":
+        return f"Lockfile {path} updated (+{added}/-{removed}); not reviewed line by line."
+    return f"{path} changed (+{added}/-{removed}); not reviewed ({reason})."
+
+
+def triage_files(
+    project_id: int,
+    files: List[Dict[str, Any]],
+) -> Tuple[Dict[str, str], List[Dict[str, str]]]:
+    if not settings.TRIAGE_ENABLED:
+        return {f["new_path"] or f["old_path"]: f.get("diff", "") for f in files}, []
+
+    overrides = _project_rules(project_id)
+
+    review: Dict[str, str] = {}
+    triaged: List[Dict[str, str]] = []
+
+    for file in files:
+        path = file["new_path"] or file["old_path"]
+
+        for action in (REVIEW, METADATA, SKIP):
+            if _matches(path, overrides.get(action, [])):
+                reason = None if action == REVIEW else "project-rule"
+                break
+        else:
+            action, reason = classify_file(file)
+
+        if action == REVIEW:
+            review[path] = file.get("diff", "")
+            continue
+
+        entry = {"path": path, "action": action, "reason": reason}
+        if action == METADATA:
+            entry["summary"] = metadata_summary(file, reason)
+        triaged.append(entry)
+
+    return review, triaged
@@ -0,0 +1,197 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+from config import settings
+from infrastructure.chunking import split_hunks, truncate_to_tokens
+from infrastructure.embeddings import embedding_service
+from infrastructure.llm import split_diff_by_file
+from infrastructure.metrics import observe_call
+from loguru import logger
+import hashlib
+import uuid
+
+
+@dataclass
+class HunkDocument:
+    uuid: str
+    content: str
+    project_id: int
+    mr_iid: int
+    file_path: str
+
+
+@dataclass
+class SimilarContext:
+    content: str
+    distance: float
+    project_id: int
+    mr_iid: int
+    file_path: Optional[str] = None
+
+
+class VectorInsertError(Exception):
+    def __init__(self, failed_uuids: Set[str], inserted: int, reason: str = ""):
+        super().__init__(f"{len(failed_uuids)} vectors were rejected: {reason}")
+        self.failed_uuids = failed_uuids
+        self.inserted = inserted
+
+
+def hunk_documents(project_id: int, mr_iid: int, files: Dict[str, str]) -> List[HunkDocument]:
+    documents: List[HunkDocument] = []
+
+    for path, file_diff in files.items():
+        header, hunks = split_hunks(file_diff)
+        for hunk in hunks or [header]:
+            content = truncate_to_tokens(f"{path}\n{hunk}", settings.RETRIEVAL_HUNK_TOKENS).strip()
+            if not content:
+                continue
+
+            digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+            documents.append(HunkDocument(
+                uuid=str(uuid.uuid5(uuid.NAMESPACE_DNS, f"hunk_{project_id}_{mr_iid}_{digest}")),
+                content=content,
+                project_id=project_id,
+                mr_iid=mr_iid,
+                file_path=path,
+            ))
+
+            if len(documents) >= settings.RETRIEVAL_MAX_HUNKS:
+                return documents
+
+    return documents
+
+
+def diff_documents(diffs: List[Tuple[int, int, str]]) -> List[HunkDocument]:
+    documents: List[HunkDocument] = []
+    for project_id, mr_iid, diff in diffs:
+        if diff:
+            documents.extend(hunk_documents(project_id, mr_iid, split_diff_by_file(diff)))
+    return documents
+
+
+def merge_matches(matches: List[List[SimilarContext]], limit: int) -> List[SimilarContext]:
+    best: Dict[str, SimilarContext] = {}
+    for hunk_matches in matches:
+        for match in hunk_matches:
+            current = best.get(match.content)
+            if current is None or match.distance < current.distance:
+                best[match.content] = match
+
+    return sorted(best.values(), key=lambda m: m.distance)[:limit]
+
+
+class VectorStore(ABC):
+    @abstractmethod
+    async def insert_vectors(self, documents: List[HunkDocument], vectors: List[List[float]]) -> int:
+        ...
+
+    @abstractmethod
+    async def search(
+        self,
+        vectors: List[List[float]],
+        limit: int,
+        project_id: Optional[int] = None,
+        exclude_mr_iid: Optional[int] = None,
+    ) -> List[List[SimilarContext]]:
+        ...
+
+    def close(self):
+        pass
+
+    async def _insert(self, documents: List[HunkDocument], vectors: List[List[float]]) -> int:
+        with observe_call(settings.VECTOR_BACKEND, "insert"):
+            return await self.insert_vectors(documents, vectors)
+
+    async def _search(
+        self,
+        vectors: List[List[float]],
+        limit: int,
+        project_id: Optional[int] = None,
+        exclude_mr_iid: Optional[int] = None,
+    ) -> List[List[SimilarContext]]:
+        with observe_call(settings.VECTOR_BACKEND, "search"):
+            return await self.search(vectors, limit, project_id=project_id, exclude_mr_iid=exclude_mr_iid)
+
+    async def insert_documents(self, documents: List[HunkDocument]) -> int:
+        if not documents:
+            return 0
+
+        vectors = await embedding_service.embed_many([d.content for d in documents])
+        return await self._insert(documents, vectors)
+
+    async def store_hunks(self, project_id: int, mr_iid: int, files: Dict[str, str]) -> int:
+        try:
+            return await self.insert_documents(hunk_documents(project_id, mr_iid, files))
+        except Exception:
+            logger.exception("Failed to store hunks", project_id=project_id, mr_iid=mr_iid)
+            return 0
+
+    async def store_diff(self, project_id: int, mr_iid: int, diff: str) -> None:
+        await self.store_diffs([(project_id, mr_iid, diff)])
+
+    async def store_diffs(self, diffs: List[Tuple[int, int, str]]) -> None:
+        try:
+            await self.insert_documents(diff_documents(diffs))
+        except Exception:
+            logger.exception("Failed to store diffs", diffs=len(diffs))
+
+    async def query_hunks(
+        self,
+        project_id: int,
+        mr_iid: int,
+        files: Dict[str, str],
+        n_results: int = 3,
+    ) -> Dict[str, List[SimilarContext]]:
+        documents = hunk_documents(project_id, mr_iid, files)
+        if not documents:
+            return {}
+
+        vectors = await embedding_service.embed_many([d.content for d in documents])
+        matches = await self._search(
+            vectors,
+            settings.RETRIEVAL_PER_HUNK_LIMIT,
+            project_id=project_id,
+            exclude_mr_iid=mr_iid,
+        )
+
+        by_file: Dict[str, List[List[SimilarContext]]] = {}
+        for document, hunk_matches in zip(documents, matches):
+            by_file.setdefault(document.file_path, []).append(hunk_matches)
+        return {path: merge_matches(file_matches, n_results) for path, file_matches in by_file.items()}
+
+    async def query_similar(
+        self,
+        diff: str,
+        n_results: int = 3,
+        project_id: Optional[int] = None,
+    ) -> List[str]:
+        try:
+            documents = diff_documents([(project_id or 0, 0, diff)])
+            if not documents:
+                return []
+
+            vectors = await embedding_service.embed_many([d.content for d in documents])
+            matches = await self._search(
+                vectors,
+                settings.RETRIEVAL_PER_HUNK_LIMIT,
+                project_id=project_id,
+            )
+            return [m.content for m in merge_matches(matches, n_results)]
+        except Exception:
+            logger.exception("Failed to query similar contexts", project_id=project_id)
+            return []
+
+
+def create_vector_store() -> VectorStore:
+    if settings.VECTOR_BACKEND == "local":
+        from infrastructure.local_vectors import LocalVectorStore
+        return LocalVectorStore(
+            settings.LOCAL_VECTOR_PATH,
+            quantize=settings.LOCAL_VECTOR_QUANTIZE,
+        )
+
+    if settings.VECTOR_BACKEND == "weaviate":
+        from infrastructure.weaviate import weaviate_client
+        return weaviate_client
+
+    raise ValueError(f"Unknown VECTOR_BACKEND: {settings.VECTOR_BACKEND}")
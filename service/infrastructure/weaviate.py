@@ -1,40 +1,45 @@
 import weaviate
 from weaviate.classes.config import Property, DataType
-from weaviate.classes.query import MetadataQuery
-from typing import List
+from weaviate.classes.init import Auth
+from weaviate.classes.query import MetadataQuery, Filter
+from weaviate.classes.data import DataObject
+from typing import List, Optional
+from urllib.parse import urlparse
 from config import settings
+from infrastructure.vector_store import HunkDocument, SimilarContext, VectorInsertError, VectorStore
+from loguru import logger
+import asyncio
+import threading
 
 
-def _get_embedding(text: str) -> List[float]:
-    from langchain_ollama import OllamaEmbeddings
-    embeddings = OllamaEmbeddings(
-        model=settings.OLLAMA_EMBEDDING_MODEL,
-        base_url=settings.OLLAMA_BASE_URL
-    )
-    return embeddings.embed_query(text)
-
-
-def _generate_id(project_id: int, mr_iid: int) -> str:
-    import uuid
-    content = f"mr_{project_id}_{mr_iid}"
-    return str(uuid.uuid5(uuid.NAMESPACE_DNS, content))
-
-
-class WeaviateClient:
+class WeaviateClient(VectorStore):
     def __init__(self):
-        self.client = weaviate.connect_to_local(
-        host="localhost",
-        port="8888",
-        grpc_port=50051,
-    )
-        self._ensure_collection()
-
-    def _ensure_collection(self):
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                url = urlparse(settings.WEAVIATE_URL)
+                self._client = weaviate.connect_to_local(
+                    host=url.hostname or "localhost",
+                    port=url.port or 8080,
+                    grpc_port=settings.WEAVIATE_GRPC_PORT,
+                    auth_credentials=(
+                        Auth.api_key(settings.WEAVIATE_API_KEY)
+                        if settings.WEAVIATE_API_KEY else None
+                    ),
+                )
+                self._ensure_collection(self._client)
+        return self._client
+
+    def _ensure_collection(self, client):
         try:
-            if self.client.collections.exists(settings.WEAVIATE_COLLECTION):
+            if client.collections.exists(settings.WEAVIATE_COLLECTION):
                 return
 
-            self.client.collections.create(
+            client.collections.create(
                 name=settings.WEAVIATE_COLLECTION,
                 properties=[
                     Property(
@@ -52,64 +57,98 @@ class WeaviateClient:
                         data_type=DataType.INT,
                         description="Merge request IID"
                     ),
+                    Property(
+                        name="file_path",
+                        data_type=DataType.TEXT,
+                        description="Path of the file the hunk belongs to"
+                    ),
                     Property(
                         name="context_type",
                         data_type=DataType.TEXT,
-                        description="Type of context (e.g., 'mr_diff')"
+                        description="Type of context (e.g., 'mr_hunk')"
                     )
                 ]
             )
-        except Exception as e:
-            print(f"Error ensuring collection: {e}")
-
-    def store_diff(self, project_id: int, mr_iid: int, diff: str) -> None:
-        if not diff:
-            return
+        except Exception:
+            logger.exception("Failed to ensure the Weaviate collection", collection=settings.WEAVIATE_COLLECTION)
 
-        try:
-            collection = self.client.collections.get(settings.WEAVIATE_COLLECTION)
-
-            diff_preview = diff[:500]
-            embedding = _get_embedding(diff_preview)
-
-            uuid = _generate_id(project_id, mr_iid)
+    async def insert_vectors(self, documents: List[HunkDocument], vectors: List[List[float]]) -> int:
+        collection = self.client.collections.get(settings.WEAVIATE_COLLECTION)
 
-            collection.data.insert(
+        objects = [
+            DataObject(
                 properties={
-                    "content": diff_preview,
-                    "project_id": project_id,
-                    "mr_iid": mr_iid,
-                    "context_type": "mr_diff"
+                    "content": document.content,
+                    "project_id": document.project_id,
+                    "mr_iid": document.mr_iid,
+                    "file_path": document.file_path,
+                    "context_type": "mr_hunk"
                 },
-                vector=embedding,
-                uuid=uuid
+                vector=vector,
+                uuid=document.uuid
             )
-        except Exception as e:
-            print(f"Error storing diff: {e}")
-
-    def query_similar(self, diff: str, n_results: int = 3) -> List[str]:
-        try:
-            collection = self.client.collections.get(settings.WEAVIATE_COLLECTION)
-
-            query_embedding = _get_embedding(diff[:500])
-
-            response = collection.query.near_vector(
-                near_vector=query_embedding,
-                limit=n_results,
-                return_metadata=MetadataQuery(distance=True)
+            for document, vector in zip(documents, vectors)
+        ]
+
+        result = await asyncio.to_thread(collection.data.insert_many, objects)
+        if result.has_errors:
+            failed = {documents[index].uuid for index in result.errors}
+            raise VectorInsertError(
+                failed,
+                inserted=len(objects) - len(failed),
+                reason=next(iter(result.errors.values())).message,
             )
-
-            contexts = []
-            for obj in response.objects:
-                contexts.append(obj.properties["content"])
-
-            return contexts
-        except Exception as e:
-            print(f"Error querying similar contexts: {e}")
-            return []
+        return len(objects)
+
+    def _near_vector(
+        self,
+        vector: List[float],
+        limit: int,
+        project_id: Optional[int],
+        exclude_mr_iid: Optional[int],
+    ) -> List[SimilarContext]:
+        collection = self.client.collections.get(settings.WEAVIATE_COLLECTION)
+
+        filters = []
+        if project_id is not None:
+            filters.append(Filter.by_property("project_id").equal(project_id))
+        if exclude_mr_iid is not None:
+            filters.append(Filter.by_property("mr_iid").not_equal(exclude_mr_iid))
+
+        response = collection.query.near_vector(
+            near_vector=vector,
+            limit=limit,
+            filters=Filter.all_of(filters) if len(filters) > 1 else (filters[0] if filters else None),
+            return_metadata=MetadataQuery(distance=True)
+        )
+
+        return [
+            SimilarContext(
+                content=obj.properties["content"],
+                distance=obj.metadata.distance,
+                project_id=obj.properties.get("project_id"),
+                mr_iid=obj.properties.get("mr_iid"),
+                file_path=obj.properties.get("file_path"),
+            )
+            for obj in response.objects
+        ]
+
+    async def search(
+        self,
+        vectors: List[List[float]],
+        limit: int,
+        project_id: Optional[int] = None,
+        exclude_mr_iid: Optional[int] = None,
+    ) -> List[List[SimilarContext]]:
+        return list(await asyncio.gather(*(
+            asyncio.to_thread(self._near_vector, vector, limit, project_id, exclude_mr_iid)
+            for vector in vectors
+        )))
 
     def close(self):
-        self.client.close()
+        if self._client is not None:
+            self._client.close()
+            self._client = None
 
 
-weaviate_client = WeaviateClient()
\ No newline at end of file
+weaviate_client = WeaviateClient()
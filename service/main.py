@@ -8,6 +8,7 @@ from config import settings
 from loguru import logger
 from contextlib import asynccontextmanager
 from infrastructure.mongo import connect_to_mongo, client
+from infrastructure.gitlab_client import gitlab_client
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
@@ -29,6 +30,7 @@ async def lifespan(_: FastAPI):
 
     finally:
         logger.info("Shutting down application...")
+        await gitlab_client.aclose()
         client.close()
 
 
@@ -1,3 +1,3 @@
-from .celery_tasks import celery_app, review_merge_request
+from .celery_tasks import celery_app, review_merge_request, backfill_history
 
-__all__ = ["celery_app", "review_merge_request"]
\ No newline at end of file
+__all__ = ["celery_app", "review_merge_request", "backfill_history"]
\ No newline at end of file
@@ -1,8 +1,15 @@
 from celery import Celery
+from celery.signals import before_task_publish
+from kombu import Queue
 from config import settings
-from workflows import create_review_workflow, ReviewState
-from infrastructure.mongo import connect_to_mongo
-import asyncio
+from infrastructure.gitlab_client import gitlab_client
+from infrastructure.llm_scheduler import BATCH, INTERACTIVE, priority
+from infrastructure.review_jobs import review_jobs
+from infrastructure.review_progress import DONE, review_progress
+from tasks.runtime import runtime
+from workflows.backfill import run_backfill
+from loguru import logger
+import time
 
 celery_app = Celery(
     "mr_reviewer",
@@ -16,27 +23,116 @@ celery_app.conf.update(
     result_serializer="json",
     timezone="UTC",
     enable_utc=True,
+    task_track_started=True,
+    task_default_queue=settings.REVIEW_QUEUE,
+    task_queues=(Queue(settings.REVIEW_QUEUE), Queue(settings.REVIEW_INTERACTIVE_QUEUE)),
+    worker_prefetch_multiplier=1,
+    imports=["tasks.monitoring"],
 )
 
 
-@celery_app.task(name="review_merge_request")
-def review_merge_request(project_id: int, mr_iid: int):
+@before_task_publish.connect
+def _stamp_enqueue_time(headers=None, **_):
+    if headers is not None:
+        headers.setdefault("enqueued_at", time.time())
+
+
+@celery_app.task(bind=True, name="review_merge_request", max_retries=settings.REVIEW_LOCK_MAX_RETRIES)
+def review_merge_request(
+    self,
+    project_id: int,
+    mr_iid: int,
+    generation: int | None = None,
+    interactive: bool = False,
+):
+    started = time.perf_counter()
+    task_id = self.request.id
+    last_attempt = self.request.retries >= self.max_retries
+
+    async def review():
+        if generation is not None:
+            if await review_jobs.is_superseded(project_id, mr_iid, generation):
+                return {"superseded": True}
+            if not await review_jobs.acquire(project_id, mr_iid, generation):
+                return None
+
+        try:
+            logger.info(
+                "Review task setup took {setup_ms:.1f}ms",
+                setup_ms=(time.perf_counter() - started) * 1000,
+                project_id=project_id,
+                mr_iid=mr_iid,
+            )
+            with gitlab_client.review_scope(), priority(INTERACTIVE if interactive else BATCH):
+                return await runtime.workflow.ainvoke({
+                    "project_id": project_id,
+                    "mr_iid": mr_iid,
+                    "generation": generation,
+                    "diff": "",
+                    "similar_contexts": {},
+                    "review_summary": "",
+                    "suggestion": "",
+                    "error": None,
+                })
+        finally:
+            if generation is not None:
+                await review_jobs.release(project_id, mr_iid, generation)
+
     async def run():
-        await connect_to_mongo()
-        workflow = create_review_workflow()
-        return await workflow.ainvoke({
-            "project_id": project_id,
-            "mr_iid": mr_iid,
-            "diff": "",
-            "similar_contexts": [],
-            "review_summary": "",
-            "suggestion": "",
-            "error": None,
-        })
-
-    result = asyncio.run(run())
+        with review_progress.scope(task_id):
+            result = await review()
+
+            if result is None and last_attempt:
+                await review_progress.publish(
+                    DONE,
+                    status="error",
+                    error=f"another review of this MR held the lock through {self.max_retries} retries",
+                )
+            elif result is None:
+                await review_progress.publish("waiting", reason="another review of this MR is running")
+            elif result.get("superseded"):
+                await review_progress.publish(DONE, status="superseded")
+            elif result.get("error"):
+                await review_progress.publish(DONE, status="error", error=result["error"])
+            else:
+                await review_progress.publish(
+                    DONE,
+                    status="ok",
+                    summary=result.get("review_summary"),
+                    suggestion=result.get("suggestion"),
+                    reviewed_files=result.get("reviewed_files", 0),
+                    reused_files=result.get("reused_files", 0),
+                )
+            return result
+
+    result = runtime.run(run())
+
+    if result is None:
+        if last_attempt:
+            logger.error(
+                "Gave up waiting for the review lock after {retries} retries",
+                retries=self.request.retries,
+                project_id=project_id,
+                mr_iid=mr_iid,
+                generation=generation,
+            )
+        raise self.retry(countdown=settings.REVIEW_LOCK_RETRY_SECONDS)
+
+    if result.get("superseded"):
+        return {"status": "superseded", "generation": generation}
 
     if result.get("error"):
         raise RuntimeError(result["error"])
 
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "summary": result.get("review_summary"),
+        "suggestion": result.get("suggestion"),
+        "reviewed_files": result.get("reviewed_files", 0),
+        "reused_files": result.get("reused_files", 0),
+    }
+
+
+@celery_app.task(name="backfill_history")
+def backfill_history(project_ids: list[int], concurrency: int | None = None):
+    return runtime.run(run_backfill(project_ids, concurrency))
@@ -0,0 +1,88 @@
+from celery.concurrency import get_implementation
+from celery.concurrency.prefork import TaskPool as PreforkPool
+from celery.signals import (
+    task_postrun,
+    task_prerun,
+    worker_init,
+    worker_process_shutdown,
+)
+from datetime import datetime
+from prometheus_client import CollectorRegistry, multiprocess, start_http_server
+from config import settings
+from infrastructure.metrics import QUEUE_WAIT, TASK_DURATION
+from loguru import logger
+from pathlib import Path
+import os
+import re
+import time
+
+_started: dict = {}
+
+
+def _multiprocess() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def _forks(worker) -> bool:
+    return issubclass(get_implementation(getattr(worker, "pool_cls", None) or "prefork"), PreforkPool)
+
+
+def _clean_multiproc_dir() -> None:
+    own_pid = str(os.getpid())
+    for path in Path(os.environ["PROMETHEUS_MULTIPROC_DIR"]).glob("*.db"):
+        match = re.search(r"_(\d+)\.db$", path.name)
+        if match and match.group(1) != own_pid:
+            path.unlink(missing_ok=True)
+
+
+def _due_at(request) -> float | None:
+    enqueued_at = getattr(request, "enqueued_at", None) or (request.headers or {}).get("enqueued_at")
+    if enqueued_at is None:
+        return None
+
+    due = float(enqueued_at)
+    if request.eta:
+        eta = request.eta if isinstance(request.eta, datetime) else datetime.fromisoformat(request.eta)
+        due = max(due, eta.timestamp())
+    return due
+
+
+@task_prerun.connect
+def _task_started(task_id=None, task=None, **_):
+    _started[task_id] = time.perf_counter()
+
+    due = _due_at(task.request)
+    if due is not None:
+        QUEUE_WAIT.labels(task.name).observe(max(0.0, time.time() - due))
+
+
+@task_postrun.connect
+def _task_finished(task_id=None, task=None, state=None, **_):
+    started = _started.pop(task_id, None)
+    if started is not None:
+        TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - started)
+
+
+@worker_init.connect
+def _start_exporter(sender=None, **_):
+    registry = None
+    if _multiprocess():
+        _clean_multiproc_dir()
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    elif _forks(sender):
+        logger.critical(
+            "PROMETHEUS_MULTIPROC_DIR must point to an empty, worker-only directory for prefork workers, "
+            "task metrics are recorded in the pool children"
+        )
+        raise SystemExit(1)
+
+    kwargs = {"registry": registry} if registry is not None else {}
+    start_http_server(settings.METRICS_WORKER_PORT, **kwargs)
+    logger.info("Worker metrics exporter listening on :{port}", port=settings.METRICS_WORKER_PORT)
+
+
+@worker_process_shutdown.connect
+def _mark_process_dead(pid=None, **_):
+    if _multiprocess():
+        multiprocess.mark_process_dead(pid or os.getpid())
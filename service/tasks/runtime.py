@@ -0,0 +1,90 @@
+from celery.signals import worker_process_init, worker_process_shutdown
+from loguru import logger
+from typing import Any, Awaitable, Optional
+from infrastructure import mongo
+from infrastructure.gitlab_client import gitlab_client
+from infrastructure.llm import LLMWorker
+from workflows import create_review_workflow
+import asyncio
+import threading
+import time
+
+SHUTDOWN_GRACE_SECONDS = 10.0
+
+
+class WorkerRuntime:
+    def __init__(self):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.workflow = None
+        self.setup_ms = 0.0
+        self.tasks_run = 0
+
+    def start(self) -> None:
+        with self._lock:
+            if self.loop is not None:
+                return
+
+            started = time.perf_counter()
+
+            loop = asyncio.new_event_loop()
+            self.thread = threading.Thread(
+                target=loop.run_forever,
+                name="worker-runtime-loop",
+                daemon=True,
+            )
+            self.thread.start()
+            asyncio.run_coroutine_threadsafe(self._setup(), loop).result()
+            self.loop = loop
+
+            self.setup_ms = (time.perf_counter() - started) * 1000
+        logger.info("Worker runtime ready in {setup_ms:.1f}ms", setup_ms=self.setup_ms)
+
+    async def _setup(self) -> None:
+        mongo.reset_client()
+        await mongo.connect_to_mongo()
+        LLMWorker.client()
+        self.workflow = create_review_workflow()
+
+    def _submit(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def run(self, coro: Awaitable[Any]) -> Any:
+        self.start()
+        self.tasks_run += 1
+        return self._submit(coro)
+
+    async def _shutdown(self) -> None:
+        pending = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        if pending:
+            await asyncio.wait(pending, timeout=SHUTDOWN_GRACE_SECONDS)
+        await gitlab_client.aclose()
+        mongo.client.close()
+
+    def stop(self) -> None:
+        if self.loop is None:
+            return
+
+        try:
+            self._submit(self._shutdown(), timeout=SHUTDOWN_GRACE_SECONDS * 2)
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=SHUTDOWN_GRACE_SECONDS)
+            self.loop.close()
+            self.loop = None
+            self.thread = None
+            self.workflow = None
+
+
+runtime = WorkerRuntime()
+
+
+@worker_process_init.connect
+def _init_worker_process(**_):
+    runtime.start()
+
+
+@worker_process_shutdown.connect
+def _shutdown_worker_process(**_):
+    runtime.stop()
@@ -0,0 +1,20 @@
+import os
+import tempfile
+
+os.environ.setdefault("VECTOR_BACKEND", "local")
+os.environ.setdefault("LOCAL_VECTOR_PATH", tempfile.mkdtemp(prefix="botgo-test-vectors-"))
+
+import asyncio
+import pytest
+
+
+@pytest.fixture
+def run():
+    from fakeredis import FakeAsyncRedis
+    from infrastructure import redis_client
+
+    async def with_fake_redis(coro_fn):
+        redis_client._clients[asyncio.get_running_loop()] = FakeAsyncRedis()
+        return await coro_fn()
+
+    return lambda coro_fn: asyncio.run(with_fake_redis(coro_fn))
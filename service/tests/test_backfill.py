@@ -0,0 +1,81 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from beanie import init_beanie
+from mongomock_motor import AsyncMongoMockClient
+
+from db.models import BackfillCheckpoint
+from infrastructure.vector_store import VectorInsertError
+from infrastructure.weaviate import WeaviateClient
+from workflows import backfill
+
+MRS = [{"iid": iid, "created_at": f"2024-01-0{iid}T00:00:00Z"} for iid in range(1, 5)]
+
+
+class RejectingStore:
+    def __init__(self, reject_iids):
+        self.reject_iids = set(reject_iids)
+        self.inserted = []
+
+    async def insert_documents(self, documents):
+        rejected = {d.uuid for d in documents if d.mr_iid in self.reject_iids}
+        self.inserted.extend(d.mr_iid for d in documents if d.uuid not in rejected)
+        if rejected:
+            raise VectorInsertError(rejected, inserted=len(documents) - len(rejected), reason="invalid vector")
+        return len(documents)
+
+
+@pytest.fixture
+def gitlab(monkeypatch):
+    async def iter_mrs_by_project(project_id, created_after=None, **_):
+        yield [mr for mr in MRS if created_after is None or mr["created_at"] >= created_after]
+
+    async def get_mr_diffs(project_id, mr_iid):
+        return [{"new_path": f"file_{mr_iid}.py", "old_path": None, "diff": f"@@ -1 +1 @@\n+change {mr_iid}\n"}]
+
+    monkeypatch.setattr(backfill.gitlab_client, "iter_mrs_by_project", iter_mrs_by_project)
+    monkeypatch.setattr(backfill.gitlab_client, "get_mr_diffs", get_mr_diffs)
+
+
+def _backfill(store, monkeypatch):
+    monkeypatch.setattr(backfill, "vector_store", store)
+
+    async def run():
+        await init_beanie(database=AsyncMongoMockClient()["botgo"], document_models=[BackfillCheckpoint])
+        first = await backfill.backfill_project(1)
+        store.reject_iids.clear()
+        second = await backfill.backfill_project(1)
+        return first, second, await BackfillCheckpoint.find_one(BackfillCheckpoint.project_id == 1)
+
+    return asyncio.run(run())
+
+
+def test_rejected_vectors_are_recorded_and_retried(gitlab, monkeypatch):
+    store = RejectingStore(reject_iids={2})
+
+    first, second, checkpoint = _backfill(store, monkeypatch)
+
+    assert (first["processed"], first["failed"]) == (3, 1)
+    assert (second["processed"], second["failed"]) == (4, 0)
+    assert checkpoint.failed_iids == []
+    assert checkpoint.cursor_created_at == MRS[-1]["created_at"]
+    assert sorted(store.inserted) == [1, 2, 3, 4]
+
+
+def test_weaviate_insert_raises_with_the_rejected_uuids():
+    documents = [
+        SimpleNamespace(uuid=f"uuid-{i}", content="c", project_id=1, mr_iid=i, file_path="a.py")
+        for i in range(3)
+    ]
+    result = SimpleNamespace(has_errors=True, errors={1: SimpleNamespace(message="vector length mismatch")})
+    collection = SimpleNamespace(data=SimpleNamespace(insert_many=lambda objects: result))
+
+    client = WeaviateClient()
+    client._client = SimpleNamespace(collections=SimpleNamespace(get=lambda name: collection))
+
+    with pytest.raises(VectorInsertError, match="vector length mismatch") as error:
+        asyncio.run(client.insert_vectors(documents, [[0.1]] * 3))
+
+    assert error.value.failed_uuids == {"uuid-1"}
+    assert error.value.inserted == 2
@@ -0,0 +1,92 @@
+from infrastructure.chunking import chunk_file_diff, estimate_tokens, split_hunks
+
+HEADER = "--- a/app.py\n+++ b/app.py\n"
+
+
+def _hunk(start: int, lines: int) -> str:
+    body = "".join(f"+line {start + i} of the change\n" for i in range(lines))
+    return f"@@ -{start},0 +{start},{lines} @@\n{body}"
+
+
+def test_split_hunks_separates_header_and_hunks():
+    diff = HEADER + _hunk(1, 2) + _hunk(10, 3)
+
+    header, hunks = split_hunks(diff)
+
+    assert header == HEADER
+    assert hunks == [_hunk(1, 2), _hunk(10, 3)]
+
+
+def test_split_hunks_without_hunks_is_all_header():
+    header, hunks = split_hunks("Binary files differ\n")
+
+    assert header == "Binary files differ\n"
+    assert hunks == []
+
+
+def test_small_diff_is_a_single_chunk():
+    diff = HEADER + _hunk(1, 3)
+
+    assert chunk_file_diff(diff, 1000) == [diff]
+
+
+def test_chunks_break_on_hunk_boundaries_and_repeat_the_header():
+    hunks = [_hunk(start, 20) for start in (1, 100, 200, 300)]
+    diff = HEADER + "".join(hunks)
+    budget = estimate_tokens(HEADER + hunks[0]) + 10
+
+    chunks = chunk_file_diff(diff, budget)
+
+    assert len(chunks) == 4
+    assert all(chunk.startswith(HEADER) for chunk in chunks)
+    assert "".join(chunk[len(HEADER):] for chunk in chunks) == "".join(hunks)
+
+
+def test_oversized_hunk_is_split_with_its_hunk_header():
+    hunk = _hunk(1, 400)
+    diff = HEADER + hunk
+
+    chunks = chunk_file_diff(diff, 300)
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk.startswith(HEADER + "@@ -1,0 +1,400 @@\n")
+        assert estimate_tokens(chunk) <= 300 + estimate_tokens(HEADER)
+
+    body = "".join(chunk.split("@@\n", 1)[1] for chunk in chunks)
+    assert body == hunk.split("@@\n", 1)[1]
+
+
+def test_diff_without_hunks_is_split_by_size():
+    diff = "x" * 10_000
+
+    chunks = chunk_file_diff(diff, 500)
+
+    assert "".join(chunks) == diff
+    assert all(estimate_tokens(chunk) <= 500 for chunk in chunks)
+
+
+def test_review_chunks_fit_the_routed_backends_context_window(monkeypatch):
+    import asyncio
+    from infrastructure.chunking import review_chunk_tokens
+    from infrastructure.llm import LLMWorker
+    from infrastructure.llm_router import local_backend, remote_backend
+
+    reviewed = []
+
+    async def review(diff, contexts, stacks, backend):
+        reviewed.append((backend.name, estimate_tokens(diff)))
+        return "Fine.", "LGTM"
+
+    monkeypatch.setattr(LLMWorker, "_review", review)
+
+    diff = HEADER + "".join(_hunk(i * 100, 30) for i in range(20))
+    for backend in (local_backend, remote_backend):
+        asyncio.run(LLMWorker._review_chunked("app.py", diff, ["python"], [], asyncio.Semaphore(4), backend))
+
+    local = [tokens for name, tokens in reviewed if name == local_backend.name]
+    remote = [tokens for name, tokens in reviewed if name == remote_backend.name]
+
+    assert local_backend.context_window < remote_backend.context_window
+    assert len(local) > 1 and len(remote) == 1
+    assert max(local) <= review_chunk_tokens(local_backend.context_window)
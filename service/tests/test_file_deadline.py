@@ -0,0 +1,38 @@
+import asyncio
+import time
+
+from config import settings
+from infrastructure import llm
+from infrastructure.llm import LLMWorker
+from infrastructure.llm_scheduler import Grant
+
+
+def _hunks(count: int, marker: str) -> str:
+    return "".join(f"@@ -{i} +{i} @@\n-old {i}\n+{marker} {i} " + "x " * 40 + "\n" for i in range(1, count + 1))
+
+
+def test_chunked_file_shares_one_deadline_and_is_reported_as_failed(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_FILE_TIMEOUT", 0.5)
+    monkeypatch.setattr(settings, "LLM_REVIEW_CONCURRENCY", 1)
+    monkeypatch.setattr(settings, "REVIEW_CACHE_ENABLED", False)
+    monkeypatch.setattr(llm, "review_chunk_tokens", lambda context_window: 60)
+    monkeypatch.setattr(llm.remote_backend, "run", lambda call, tokens: call(Grant(tokens)))
+
+    calls = []
+
+    async def request_review(prompt, grant, backend):
+        calls.append(time.perf_counter())
+        await asyncio.sleep(0.2)
+        return "Looks fine.", "LGTM"
+
+    monkeypatch.setattr(LLMWorker, "_request_review", request_review)
+
+    files = {"slow.py": _hunks(6, "slow"), "fast.py": _hunks(1, "fast")}
+
+    started = time.perf_counter()
+    reviewed, failed = asyncio.run(LLMWorker.review_files(files, {}))
+    elapsed = time.perf_counter() - started
+
+    assert list(reviewed) == ["fast.py"]
+    assert failed == ["slow.py"]
+    assert elapsed < 6 * 0.2
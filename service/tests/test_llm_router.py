@@ -0,0 +1,69 @@
+import pytest
+
+from config import settings
+from infrastructure.llm_router import (
+    complexity_score,
+    diff_line_counts,
+    local_backend,
+    remote_backend,
+    route_classification,
+    route_review,
+)
+
+
+def _diff(added: int, removed: int = 0) -> str:
+    return (
+        "--- a/app.py\n+++ b/app.py\n@@ -1 +1 @@\n"
+        + "".join(f"-old {i}\n" for i in range(removed))
+        + "".join(f"+new {i}\n" for i in range(added))
+        + " context\n"
+    )
+
+
+@pytest.fixture
+def auto_routing(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_ROUTING", "auto")
+    monkeypatch.setattr(settings, "LLM_ROUTE_LOCAL_MAX_SCORE", 40.0)
+    monkeypatch.setattr(settings, "LLM_ROUTE_DELETION_WEIGHT", 0.25)
+    monkeypatch.setattr(settings, "LLM_ROUTE_STACK_WEIGHTS", {"docs": 0.2, "data-sql": 2.0})
+
+
+def test_diff_line_counts_ignores_file_headers():
+    assert diff_line_counts(_diff(3, 2)) == (3, 2)
+
+
+def test_complexity_weighs_deletions_and_the_heaviest_stack(auto_routing):
+    assert complexity_score(_diff(10, 8), ["python"]) == 12.0
+    assert complexity_score(_diff(10, 8), ["docs", "data-sql"]) == 24.0
+    assert complexity_score(_diff(10), []) == 10.0
+
+
+def test_auto_routes_small_diffs_locally_and_large_ones_remotely(auto_routing):
+    assert route_review(_diff(40), ["python"]) == (local_backend, 40.0)
+    assert route_review(_diff(41), ["python"]) == (remote_backend, 41.0)
+    assert route_review(_diff(100), ["docs"])[0] is local_backend
+    assert route_review(_diff(25), ["data-sql"])[0] is remote_backend
+
+
+def test_forced_routing_ignores_the_score(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_ROUTING", "local")
+    assert route_review(_diff(1000), ["python"])[0] is local_backend
+    assert route_classification() is local_backend
+
+    monkeypatch.setattr(settings, "LLM_ROUTING", "remote")
+    assert route_review(_diff(1), ["python"])[0] is remote_backend
+    assert route_classification() is remote_backend
+
+
+def test_auto_classification_uses_the_configured_backend(auto_routing, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CLASSIFY_BACKEND", "local")
+    assert route_classification() is local_backend
+
+    monkeypatch.setattr(settings, "LLM_CLASSIFY_BACKEND", "unknown")
+    assert route_classification() is remote_backend
+
+
+def test_defaults_stay_on_the_remote_model():
+    assert route_review(_diff(1), ["python"])[0] is remote_backend
+    assert route_classification() is remote_backend
+    assert local_backend.model == settings.OLLAMA_LLM_MODEL
@@ -0,0 +1,124 @@
+import asyncio
+import numpy as np
+import pytest
+
+from infrastructure.local_vectors import INITIAL_CAPACITY, LocalVectorStore
+from infrastructure.vector_store import HunkDocument
+
+
+def _documents(count: int, project_id: int = 1, prefix: str = "doc"):
+    return [
+        HunkDocument(
+            uuid=f"{prefix}-{i}",
+            content=f"{prefix} content {i}",
+            project_id=project_id,
+            mr_iid=i,
+            file_path=f"src/{prefix}_{i}.py",
+        )
+        for i in range(count)
+    ]
+
+
+def _vectors(count: int, dim: int = 16, seed: int = 0):
+    return np.random.default_rng(seed).normal(size=(count, dim)).astype(np.float32).tolist()
+
+
+@pytest.mark.parametrize("quantize", [False, True])
+def test_search_finds_the_inserted_vector(tmp_path, quantize):
+    store = LocalVectorStore(str(tmp_path), quantize=quantize)
+    documents, vectors = _documents(50), _vectors(50)
+
+    assert store._insert_sync(documents, vectors) == 50
+
+    results = store.search_sync([vectors[7], vectors[31]], limit=3)
+
+    assert [matches[0].content for matches in results] == ["doc content 7", "doc content 31"]
+    assert results[0][0].distance == pytest.approx(0.0, abs=0.02 if quantize else 1e-5)
+    assert all(len(matches) == 3 for matches in results)
+
+
+@pytest.mark.parametrize("quantize", [False, True])
+def test_index_round_trips_through_disk(tmp_path, quantize):
+    vectors = _vectors(INITIAL_CAPACITY + 10)
+    LocalVectorStore(str(tmp_path), quantize=quantize)._insert_sync(_documents(len(vectors)), vectors)
+
+    reopened = LocalVectorStore(str(tmp_path), quantize=quantize)
+
+    assert reopened._count == len(vectors)
+    assert reopened.search_sync([vectors[-1]], limit=1)[0][0].content == f"doc content {len(vectors) - 1}"
+
+
+def test_reopening_with_another_quantize_setting_fails(tmp_path):
+    LocalVectorStore(str(tmp_path))._insert_sync(_documents(1), _vectors(1))
+
+    with pytest.raises(ValueError):
+        LocalVectorStore(str(tmp_path), quantize=True)
+
+
+def test_reinserting_a_document_overwrites_its_row(tmp_path):
+    store = LocalVectorStore(str(tmp_path))
+    documents = _documents(3)
+    store._insert_sync(documents, _vectors(3, seed=1))
+
+    replacement = _vectors(1, seed=2)
+    store._insert_sync(documents[:1], replacement)
+
+    assert store._count == 3
+    assert store.search_sync(replacement, limit=1)[0][0].content == "doc content 0"
+
+
+def test_search_filters_by_project_and_excluded_mr(tmp_path):
+    store = LocalVectorStore(str(tmp_path))
+    store._insert_sync(_documents(5, project_id=1, prefix="a"), _vectors(5, seed=1))
+    store._insert_sync(_documents(5, project_id=2, prefix="b"), _vectors(5, seed=2))
+
+    query = _vectors(1, seed=1)[:1]
+    matches = store.search_sync(query, limit=10, project_id=1, exclude_mr_iid=0)[0]
+
+    assert {m.project_id for m in matches} == {1}
+    assert 0 not in {m.mr_iid for m in matches}
+    assert len(matches) == 4
+
+
+def test_stores_sharing_a_path_see_each_others_rows(tmp_path):
+    first = LocalVectorStore(str(tmp_path))
+    second = LocalVectorStore(str(tmp_path))
+
+    a_vectors = _vectors(INITIAL_CAPACITY, seed=1)
+    b_vectors = _vectors(INITIAL_CAPACITY, seed=2)
+    first._insert_sync(_documents(INITIAL_CAPACITY, prefix="a"), a_vectors)
+    second._insert_sync(_documents(INITIAL_CAPACITY, prefix="b"), b_vectors)
+
+    assert first.search_sync([b_vectors[5]], limit=1)[0][0].content == "b content 5"
+    assert second.search_sync([a_vectors[5]], limit=1)[0][0].content == "a content 5"
+
+    reopened = LocalVectorStore(str(tmp_path))
+    assert reopened._count == 2 * INITIAL_CAPACITY
+    assert len(reopened._rows) == 2 * INITIAL_CAPACITY
+
+
+def test_query_hunks_returns_each_file_its_own_contexts(tmp_path, monkeypatch):
+    from infrastructure.vector_store import embedding_service
+
+    async def embed_many(texts):
+        return [[1.0, 0.0, 0.1] if "api" in text else [0.0, 1.0, 0.1] for text in texts]
+
+    monkeypatch.setattr(embedding_service, "embed_many", embed_many)
+
+    store = LocalVectorStore(str(tmp_path))
+    history = [
+        HunkDocument(uuid="old-api", content="api history", project_id=1, mr_iid=1, file_path="old_api.py"),
+        HunkDocument(uuid="old-ui", content="ui history", project_id=1, mr_iid=1, file_path="old_ui.ts"),
+    ]
+    store._insert_sync(history, [[1.0, 0.0, 0.1], [0.0, 1.0, 0.1]])
+
+    files = {
+        "api.py": "@@ -1 +1 @@\n-old\n+api handler\n",
+        "ui.ts": "@@ -1 +1 @@\n-old\n+ui widget\n",
+    }
+    matches = asyncio.run(store.query_hunks(1, 9, files, n_results=1))
+
+    assert {path: [m.content for m in found] for path, found in matches.items()} == {
+        "api.py": ["api history"],
+        "ui.ts": ["ui history"],
+    }
@@ -0,0 +1,33 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from tasks import monitoring
+
+
+def test_prefork_worker_refuses_to_start_without_a_multiprocess_dir(monkeypatch):
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+
+    with pytest.raises(SystemExit):
+        monitoring._start_exporter(sender=SimpleNamespace(pool_cls="prefork"))
+
+
+def test_solo_worker_does_not_need_a_multiprocess_dir(monkeypatch):
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+
+    assert not monitoring._forks(SimpleNamespace(pool_cls="solo"))
+    assert monitoring._forks(SimpleNamespace(pool_cls="prefork"))
+
+
+def test_stale_metric_files_are_removed_at_startup(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    stale = tmp_path / "histogram_999999.db"
+    own = tmp_path / f"histogram_{os.getpid()}.db"
+    stale.touch()
+    own.touch()
+
+    monitoring._clean_multiproc_dir()
+
+    assert not stale.exists()
+    assert own.exists()
@@ -0,0 +1,67 @@
+import httpx
+
+from benchmarks.webhook_load import in_process_app
+from config import settings
+
+
+def test_interactive_review_goes_to_the_interactive_queue(run, monkeypatch):
+    from tasks import review_merge_request
+
+    published = []
+    publish = review_merge_request.apply_async
+
+    def record(*args, **kwargs):
+        published.append(kwargs)
+        return publish(*args, **kwargs)
+
+    monkeypatch.setattr(review_merge_request, "apply_async", record)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=in_process_app())
+        async with httpx.AsyncClient(base_url="http://botgo.test", transport=transport) as client:
+            response = await client.post("/api/review", json={"project_id": 1, "mr_iid": 2})
+        return response.json()
+
+    body = run(scenario)
+
+    assert body["status"] == "queued"
+    assert published[0]["queue"] == settings.REVIEW_INTERACTIVE_QUEUE
+    assert published[0]["kwargs"]["interactive"] is True
+
+
+def test_event_stream_reports_progress_read_failures(run, monkeypatch):
+    from infrastructure.review_progress import review_progress
+
+    async def broken_read(*_, **__):
+        raise ConnectionError("redis went away")
+
+    monkeypatch.setattr(review_progress, "read", broken_read)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=in_process_app())
+        async with httpx.AsyncClient(base_url="http://botgo.test", transport=transport) as client:
+            response = await client.get("/api/review/some-task/events")
+        return response.status_code, response.text
+
+    status, body = run(scenario)
+
+    assert status == 200
+    assert body.startswith("event: error\n")
+    assert "review progress is unavailable" in body
+
+
+def test_event_stream_for_an_unknown_task_closes_after_the_idle_timeout(run, monkeypatch):
+    monkeypatch.setattr(settings, "REVIEW_EVENTS_KEEPALIVE_SECONDS", 0.05)
+    monkeypatch.setattr(settings, "REVIEW_EVENTS_IDLE_TIMEOUT_SECONDS", 0.2)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=in_process_app())
+        async with httpx.AsyncClient(base_url="http://botgo.test", transport=transport) as client:
+            response = await client.get("/api/review/never-queued/events", timeout=5)
+        return response.text
+
+    body = run(scenario)
+
+    assert ": keepalive" in body
+    assert body.rstrip().split("\n\n")[-1].startswith("event: error\n")
+    assert '"state": "PENDING"' in body
@@ -0,0 +1,43 @@
+from infrastructure.llm import LLMWorker
+from infrastructure.review_cache import review_cache_key
+
+
+def _diff(line: str) -> str:
+    return f"@@ -1 +1 @@\n-old\n+{line}\n"
+
+
+def test_cache_key_depends_only_on_the_files_own_contexts():
+    key = review_cache_key(_diff("a"), ["python"], ["ctx a"], "1", "model")
+
+    assert review_cache_key(_diff("a"), ["python"], ["ctx a"], "1", "model") == key
+    assert review_cache_key(_diff("a"), ["python"], ["ctx b"], "1", "model") != key
+    assert review_cache_key(_diff("b"), ["python"], ["ctx a"], "1", "model") != key
+
+
+def test_unchanged_files_hit_the_cache_when_another_file_changes(run, monkeypatch):
+    reviewed = []
+
+    async def review_chunked(path, file_diff, stacks, contexts, semaphore, backend):
+        reviewed.append(path)
+        return f"{path} reviewed", "LGTM", True
+
+    monkeypatch.setattr(LLMWorker, "_review_chunked", review_chunked)
+
+    files = {"api.py": _diff("handler"), "models.py": _diff("field"), "tasks.py": _diff("job")}
+    contexts = {"api.py": ["api ctx"], "models.py": ["models ctx"], "tasks.py": ["tasks ctx"]}
+
+    async def scenario():
+        first, _ = await LLMWorker.review_files(files, contexts)
+        reviewed.clear()
+
+        second, _ = await LLMWorker.review_files(
+            {**files, "models.py": _diff("renamed field")},
+            {**contexts, "models.py": ["models ctx", "new migration ctx"]},
+        )
+        return first, second
+
+    first, second = run(scenario)
+
+    assert reviewed == ["models.py"]
+    assert second["api.py"] == first["api.py"]
+    assert second["tasks.py"] == first["tasks.py"]
@@ -0,0 +1,80 @@
+from infrastructure.review_jobs import review_jobs
+
+
+def test_generations_increase_and_supersede(run):
+    async def scenario():
+        first = await review_jobs.next_generation(1, 7)
+        second = await review_jobs.next_generation(1, 7)
+        other = await review_jobs.next_generation(2, 7)
+
+        return (
+            first,
+            second,
+            other,
+            await review_jobs.is_superseded(1, 7, first),
+            await review_jobs.is_superseded(1, 7, second),
+            await review_jobs.is_superseded(1, 7, None),
+        )
+
+    assert run(scenario) == (1, 2, 1, True, False, False)
+
+
+def test_lock_is_exclusive_per_merge_request(run):
+    async def scenario():
+        return (
+            await review_jobs.acquire(1, 7, 1),
+            await review_jobs.acquire(1, 7, 2),
+            await review_jobs.acquire(1, 8, 2),
+        )
+
+    assert run(scenario) == (True, False, True)
+
+
+def test_release_only_drops_the_holders_lock(run):
+    async def scenario():
+        await review_jobs.acquire(1, 7, 1)
+        await review_jobs.release(1, 7, 2)
+        stolen = await review_jobs.acquire(1, 7, 2)
+
+        await review_jobs.release(1, 7, 1)
+        acquired = await review_jobs.acquire(1, 7, 2)
+        return stolen, acquired
+
+    assert run(scenario) == (False, True)
+
+
+def test_review_task_gives_up_when_the_lock_stays_held(monkeypatch):
+    import asyncio
+    from celery.exceptions import MaxRetriesExceededError
+    from fakeredis import FakeAsyncRedis, FakeServer
+    from infrastructure import redis_client
+    from infrastructure.review_progress import review_progress
+    from tasks import celery_tasks
+
+    server = FakeServer()
+
+    class Runtime:
+        def run(self, coro):
+            async def with_fake_redis():
+                redis_client._clients[asyncio.get_running_loop()] = FakeAsyncRedis(server=server)
+                return await coro
+
+            return asyncio.run(with_fake_redis())
+
+    async def hold_lock():
+        await review_jobs.next_generation(1, 7)
+        generation = await review_jobs.next_generation(1, 7)
+        await review_jobs.acquire(1, 7, generation - 1)
+        return generation
+
+    runtime = Runtime()
+    monkeypatch.setattr(celery_tasks, "runtime", runtime)
+    monkeypatch.setattr(celery_tasks.review_merge_request, "max_retries", 2)
+    generation = runtime.run(hold_lock())
+
+    result = celery_tasks.review_merge_request.apply(args=(1, 7), kwargs={"generation": generation})
+    events = runtime.run(review_progress.read(result.id))
+
+    assert isinstance(result.result, MaxRetriesExceededError)
+    assert [event for _, event, _ in events] == ["waiting", "waiting", "done"]
+    assert events[-1][2]["status"] == "error"
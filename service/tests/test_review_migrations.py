@@ -0,0 +1,75 @@
+import asyncio
+import pytest
+from bson import ObjectId
+from datetime import datetime
+from mongomock_motor import AsyncMongoMockClient
+
+from config import settings
+from db.migrations import UNIQUE_INDEX, merge_duplicate_reviews
+
+
+def _review(mr_iid: int, *summaries: str, day: int = 1):
+    return {
+        "_id": ObjectId(),
+        "project_id": 1,
+        "mr_iid": mr_iid,
+        "versions": [
+            {"summary": summary, "suggestions": "LGTM", "created_at": datetime(2024, 1, day + i)}
+            for i, summary in enumerate(summaries)
+        ],
+        "updated_at": datetime(2024, 1, day + len(summaries)),
+    }
+
+
+def _seed(db):
+    first, second, other = _review(7, "v1", day=1), _review(7, "v2", "v3", day=5), _review(8, "only")
+
+    async def insert():
+        await db.reviews.insert_many([first, second, other])
+
+    asyncio.run(insert())
+    return first, second, other
+
+
+def test_duplicates_are_merged_into_the_oldest_review_and_the_index_builds():
+    db = AsyncMongoMockClient()["botgo"]
+    first, _, other = _seed(db)
+
+    async def scenario():
+        merged = await merge_duplicate_reviews(db)
+        assert await merge_duplicate_reviews(db) == 0
+        await db.reviews.create_index([("project_id", 1), ("mr_iid", 1)], name=UNIQUE_INDEX, unique=True)
+        return merged, await db.reviews.find({}).sort("mr_iid", 1).to_list(None)
+
+    merged, reviews = asyncio.run(scenario())
+
+    assert merged == 1
+    assert [r["_id"] for r in reviews] == [first["_id"], other["_id"]]
+    assert [v["summary"] for v in reviews[0]["versions"]] == ["v1", "v2", "v3"]
+    assert reviews[0]["updated_at"] == datetime(2024, 1, 7)
+
+
+def test_a_repeated_merge_does_not_append_versions_twice():
+    db = AsyncMongoMockClient()["botgo"]
+    first, second, _ = _seed(db)
+
+    async def scenario():
+        await db.reviews.update_one(
+            {"_id": first["_id"]},
+            {"$push": {"versions": {"$each": second["versions"]}}, "$addToSet": {"merged_from": second["_id"]}},
+        )
+        await merge_duplicate_reviews(db)
+        return await db.reviews.find_one({"_id": first["_id"]})
+
+    review = asyncio.run(scenario())
+
+    assert [v["summary"] for v in review["versions"]] == ["v1", "v2", "v3"]
+
+
+def test_duplicates_fail_startup_when_dedup_is_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "REVIEW_DEDUP_ON_STARTUP", False)
+    db = AsyncMongoMockClient()["botgo"]
+    _seed(db)
+
+    with pytest.raises(RuntimeError, match="duplicate reviews"):
+        asyncio.run(merge_duplicate_reviews(db))
@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+
+from db.review_queries import review_filter
+
+
+def test_no_filters_match_everything():
+    assert review_filter() == {}
+
+
+def test_single_condition_is_not_wrapped():
+    assert review_filter(project_id=3) == {"project_id": 3}
+
+
+def test_created_bounds_are_half_open_object_id_ranges():
+    start = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    end = datetime(2024, 4, 1, tzinfo=timezone.utc)
+
+    query = review_filter(project_id=3, author="dev", created_from=start, created_to=end)
+
+    assert query == {"$and": [
+        {"project_id": 3},
+        {"author": "dev"},
+        {"_id": {"$gte": ObjectId.from_datetime(start)}},
+        {"_id": {"$lt": ObjectId.from_datetime(end)}},
+    ]}
+
+
+def test_cursor_continues_below_the_last_id():
+    last = ObjectId()
+
+    query = review_filter(mr_iid=9, cursor=str(last))
+
+    assert query == {"$and": [{"mr_iid": 9}, {"_id": {"$lt": last}}]}
+
+
+@pytest.mark.parametrize("cursor", ["not-an-id", "0" * 23])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        review_filter(cursor=cursor)
@@ -0,0 +1,76 @@
+from infrastructure.llm import ReviewStreamParser
+
+
+def _feed(parser: ReviewStreamParser, text: str, size: int = 7) -> bool:
+    for i in range(0, len(text), size):
+        if parser.feed(text[i:i + size]):
+            return True
+    return False
+
+
+def test_stops_once_reason_line_completes():
+    parser = ReviewStreamParser()
+    text = (
+        "SUMMARY: Adds retries to the client.\n"
+        "SUGGESTION: Cap the backoff delay.\n"
+        "CONFIDENCE: high\n"
+        "REASON: Unbounded waits stall workers.\n"
+        "trailing text that should never be read\n"
+    )
+
+    assert _feed(parser, text)
+    assert parser.result() == ("Adds retries to the client.", "Cap the backoff delay.")
+    assert "trailing" not in parser.fields["REASON:"]
+
+
+def test_does_not_stop_on_a_partial_reason_line():
+    parser = ReviewStreamParser()
+
+    assert not parser.feed("SUMMARY: s\nSUGGESTION: x\nREASON: still")
+    assert parser.feed(" writing\n")
+    assert parser.fields["REASON:"] == "still writing"
+
+
+def test_reason_before_suggestion_keeps_reading():
+    parser = ReviewStreamParser()
+    text = (
+        "SUMMARY: Changes the cache key.\n"
+        "REASON: Keys must include the model.\n"
+        "SUGGESTION: Hash the model name into the key.\n"
+        "CONFIDENCE: medium\n"
+    )
+
+    assert not _feed(parser, text)
+    assert parser.result() == ("Changes the cache key.", "Hash the model name into the key.")
+
+
+def test_multi_line_fields_are_joined():
+    parser = ReviewStreamParser()
+    text = (
+        "SUMMARY: First sentence.\n"
+        "Second sentence.\n"
+        "SUGGESTION: Validate the input\n"
+        "before parsing it.\n"
+        "REASON: short\n"
+    )
+
+    assert _feed(parser, text)
+    assert parser.result() == ("First sentence. Second sentence.", "Validate the input before parsing it.")
+
+
+def test_missing_or_lgtm_suggestion_is_lgtm():
+    lgtm = ReviewStreamParser()
+    lgtm.feed("SUMMARY: Looks fine.\nSUGGESTION: lgtm\nREASON: ok\n")
+
+    empty = ReviewStreamParser()
+    empty.feed("nothing useful")
+
+    assert lgtm.result() == ("Looks fine.", "LGTM")
+    assert empty.result() == ("No issues were found during review.", "LGTM")
+
+
+def test_result_flushes_a_final_line_without_newline():
+    parser = ReviewStreamParser()
+    parser.feed("SUMMARY: s\nSUGGESTION: Use a context manager")
+
+    assert parser.result() == ("s", "Use a context manager")
@@ -0,0 +1,107 @@
+import pytest
+from beanie import init_beanie
+from mongomock_motor import AsyncMongoMockClient
+
+from db.models import BackfillCheckpoint, DiffBlob, Review
+from db.review_queries import export_reviews, get_review
+from infrastructure.diff_store import diff_digest, diff_store
+from workflows.review_workflow import load_or_create_review, persist_review_version
+
+DIFFS = ["diff --git a/a.py\n+one\n", "diff --git a/a.py\n+one\n+two\n", "diff --git a/a.py\n+one\n+three\n"]
+
+
+def _state(generation: int):
+    return {
+        "project_id": 1,
+        "mr_iid": 7,
+        "project_name": "group/app",
+        "author": "dev",
+        "source_branch": "feature",
+        "target_branch": "main",
+        "mr_title": "Change",
+        "generation": None,
+        "full_diff": DIFFS[generation],
+        "review_summary": f"summary {generation}",
+        "suggestion": "LGTM",
+    }
+
+
+def _file(path: str, text: str):
+    return {"path": path, "diff_hash": diff_digest(text), "stacks": ["python"], "summary": text, "suggestion": "LGTM"}
+
+
+async def _push_version(generation: int, reviewed):
+    state = _state(generation)
+    state.update(await load_or_create_review(state))
+    previous = state.get("previous_files") or {}
+    state["file_reviews"] = [reviewed.get(path) or previous[path] for path in ("a.py", "b.py")]
+    state = await persist_review_version(state)
+    assert not state.get("error")
+    return state
+
+
+@pytest.fixture
+def mongo(run):
+    async def connect():
+        client = AsyncMongoMockClient()
+        await init_beanie(database=client["botgo"], document_models=[Review, BackfillCheckpoint, DiffBlob])
+
+    run(connect)
+
+
+def test_unchanged_files_reference_the_version_that_reviewed_them(run, mongo):
+    async def scenario():
+        await _push_version(0, {"a.py": _file("a.py", "a0"), "b.py": _file("b.py", "b0")})
+        await _push_version(1, {"b.py": _file("b.py", "b1")})
+        await _push_version(2, {"b.py": _file("b.py", "b2")})
+
+        stored = await Review.get_motor_collection().find_one({"mr_iid": 7})
+        latest = await get_review(1, 7, versions=1)
+        exported = [line async for line in export_reviews({"mr_iid": 7}, versions=True)]
+        state = _state(2)
+        state.update(await load_or_create_review(state))
+        return stored, latest, exported, state
+
+    stored, latest, exported, state = run(scenario)
+
+    files = [v["files"] for v in stored["versions"]]
+    assert [f.get("ref") for f in files[2]] == [0, None]
+    assert files[2][0]["summary"] is None
+    assert stored["version_count"] == 3
+
+    assert [f["summary"] for f in latest["versions"][0]["files"]] == ["a0", "b2"]
+    assert '"summary": "a0", "suggestion": "LGTM", "ref": 0' in exported[0]
+    assert state["version_index"] == 3
+    assert state["previous_files"]["a.py"]["summary"] == "a0"
+    assert state["previous_files"]["a.py"]["ref"] == 0
+    assert state["previous_files"]["b.py"]["ref"] == 2
+
+
+def test_a_crash_before_the_blob_write_is_flushed_on_the_next_load(run, mongo, monkeypatch):
+    put_blob = diff_store.put_blob
+
+    async def crash(blob):
+        raise RuntimeError("worker killed")
+
+    async def scenario():
+        monkeypatch.setattr(diff_store, "put_blob", crash)
+        state = _state(0)
+        state.update(await load_or_create_review(state))
+        state["file_reviews"] = [_file("a.py", "a0"), _file("b.py", "b0")]
+        state = await persist_review_version(state)
+
+        blobs_after_crash = await DiffBlob.get_motor_collection().count_documents({})
+        pending = (await Review.get_motor_collection().find_one({"mr_iid": 7})).get("pending_diff")
+
+        monkeypatch.setattr(diff_store, "put_blob", put_blob)
+        await load_or_create_review(_state(1))
+        review = await Review.get_motor_collection().find_one({"mr_iid": 7})
+        return state, blobs_after_crash, pending, review, await diff_store.get(review["diff_hash"])
+
+    state, blobs_after_crash, pending, review, diff = run(scenario)
+
+    assert "worker killed" in state["error"]
+    assert blobs_after_crash == 0
+    assert pending["_id"] == review["diff_hash"]
+    assert "pending_diff" not in review
+    assert diff == DIFFS[0]
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from infrastructure.llm import DEFAULT_STACKS, STACK_RULES, LLMWorker
+from infrastructure.stacks import NUXT_VUE_TS, VUE_TS, classify_by_rules
+
+
+@pytest.mark.parametrize("path", [
+    "Dockerfile",
+    "build/Dockerfile.prod",
+    "services/api.dockerfile",
+    "docker-compose.yml",
+    "deploy/docker-compose.override.yaml",
+    "compose.yaml",
+])
+def test_docker_files_are_devops(path):
+    assert classify_by_rules(path) == ["devops"]
+
+
+@pytest.mark.parametrize("path, stacks", [
+    ("app/migrations/0002_add_index.py", ["python", "data-sql"]),
+    ("alembic/versions/1a2b_add_users.py", ["python", "data-sql"]),
+    ("db/migrate/20240101_add_orders.rb", ["data-sql"]),
+    ("migrations/0001_init.sql", ["data-sql"]),
+    ("migrations/README.md", ["data-sql"]),
+])
+def test_migration_directories_add_data_sql(path, stacks):
+    assert classify_by_rules(path) == stacks
+
+
+@pytest.mark.parametrize("path, added, stacks", [
+    ("composables/useUser.ts", "const { data } = await useAsyncData('user', fetchUser)", NUXT_VUE_TS),
+    ("components/Card.vue", "definePageMeta({ layout: 'card' })", NUXT_VUE_TS),
+    ("composables/counter.ts", "import { ref } from 'vue'", VUE_TS),
+    ("components/Card.vue", "const open = ref(false)", VUE_TS),
+    ("utils/format.ts", "export const format = (n: number) => n.toFixed(2)", ["frontend-ts"]),
+])
+def test_vue_and_nuxt_are_sniffed_from_added_lines(path, added, stacks):
+    diff = f"--- a/{path}\n+++ b/{path}\n@@ -1 +1 @@\n-old\n+{added}\n"
+
+    assert classify_by_rules(path, diff) == stacks
+
+
+def test_removed_lines_do_not_count_as_nuxt():
+    diff = "@@ -1 +1 @@\n-const { data } = await useFetch('/api')\n+const data = []\n"
+
+    assert classify_by_rules("pages/list.ts", diff) == ["frontend-ts"]
+
+
+@pytest.mark.parametrize("path, stacks", [
+    ("README.md", ["docs"]),
+    ("CHANGELOG", ["docs"]),
+    ("docs/setup", ["docs"]),
+    ("doc/notes.txt", ["docs"]),
+    ("docs/conf.py", ["python"]),
+    ("assets/logo.png", None),
+])
+def test_docs_fallback_only_applies_without_a_known_extension(path, stacks):
+    assert classify_by_rules(path) == stacks
+
+
+def test_every_rule_based_stack_has_review_rules():
+    paths = ["README.md", "Dockerfile", "app.py", "main.go", "schema.sql", "app.vue", "index.ts"]
+
+    for path in paths:
+        assert all(stack in STACK_RULES for stack in classify_by_rules(path))
+
+
+def _classify(monkeypatch, reply):
+    async def chat(messages, max_tokens):
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    monkeypatch.setattr(LLMWorker, "_chat", chat)
+    files = {f"src/file_{i}": f"+change {i}\n" for i in range(1, 5)}
+    return asyncio.run(LLMWorker.classify_stacks_batch(files))
+
+
+def test_batch_response_is_parsed_per_file(monkeypatch):
+    result = _classify(monkeypatch, "1: python\n2: nuxt, vue,frontend-ts\n#3: docs\n4: golang")
+
+    assert result == {
+        "src/file_1": ["python"],
+        "src/file_2": NUXT_VUE_TS,
+        "src/file_3": ["docs"],
+        "src/file_4": ["golang"],
+    }
+
+
+def test_malformed_and_partial_batch_lines_fall_back_per_file(monkeypatch):
+    result = _classify(monkeypatch, "Here you go:\n1: python\n2 - vue\n3: cobol\n9: golang")
+
+    assert result == {
+        "src/file_1": ["python"],
+        "src/file_2": DEFAULT_STACKS,
+        "src/file_3": DEFAULT_STACKS,
+        "src/file_4": DEFAULT_STACKS,
+    }
+
+
+def test_failed_batch_call_falls_back_for_every_file(monkeypatch):
+    result = _classify(monkeypatch, RuntimeError("upstream error"))
+
+    assert set(result) == {f"src/file_{i}" for i in range(1, 5)}
+    assert all(stacks == DEFAULT_STACKS for stacks in result.values())
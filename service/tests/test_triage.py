@@ -0,0 +1,79 @@
+import pytest
+
+from config import settings
+from infrastructure.triage import METADATA, REVIEW, SKIP, classify_file, triage_files
+
+CODE_DIFF = "@@ -1,2 +1,3 @@\n def handler():\n+    validate()\n     return ok\n"
+
+
+def _file(path: str, diff: str = CODE_DIFF, old_path: str = None, **flags):
+    return {"old_path": old_path or path, "new_path": path, "diff": diff, **flags}
+
+
+@pytest.mark.parametrize("file, expected", [
+    (_file("app/service.py"), (REVIEW, None)),
+    (_file("frontend/node_modules/lib/index.js"), (SKIP, "vendored")),
+    (_file("go/vendor/x/y.go"), (SKIP, "vendored")),
+    (_file("package-lock.json"), (METADATA, "lockfile")),
+    (_file("backend/Poetry.lock"), (METADATA, "lockfile")),
+    (_file("api/user.pb.go"), (SKIP, "generated")),
+    (_file("proto/user_pb2.py"), (SKIP, "generated")),
+    (_file("api/client.go", diff="@@ -0,0 +1 @@\n+// Code generated by mockgen. DO NOT EDIT.\n"), (SKIP, "generated")),
+    (_file("schema.ts", generated_file=True), (SKIP, "generated")),
+    (_file("web/__snapshots__/app.test.ts.snap"), (SKIP, "snapshot")),
+    (_file("static/app.min.js"), (SKIP, "minified")),
+    (_file("static/app.js", diff="@@ -0,0 +1 @@\n+" + "x" * 2000 + "\n"), (SKIP, "minified")),
+    (_file("web/dist/main.js"), (SKIP, "build-output")),
+    (_file("logo.png", diff="Binary files a/logo.png and b/logo.png differ\n"), (METADATA, "binary")),
+    (_file("new/name.py", diff="", old_path="old/name.py", renamed_file=True), (METADATA, "rename")),
+    (_file("gone.py", diff="@@ -1 +0,0 @@\n-x\n", deleted_file=True), (METADATA, "deleted")),
+    (_file("blank.py", diff=""), (METADATA, "empty")),
+])
+def test_classify_file(file, expected):
+    assert classify_file(file) == expected
+
+
+def test_triage_splits_review_metadata_and_skipped_files():
+    files = [
+        _file("app/service.py"),
+        _file("yarn.lock", diff="@@ -1 +1,2 @@\n-a\n+b\n+c\n"),
+        _file("api/user.pb.go"),
+    ]
+
+    review, triaged = triage_files(1, files)
+
+    assert review == {"app/service.py": CODE_DIFF}
+    assert triaged == [
+        {
+            "path": "yarn.lock",
+            "action": METADATA,
+            "reason": "lockfile",
+            "summary": "Lockfile yarn.lock updated (+2/-1); not reviewed line by line.",
+        },
+        {"path": "api/user.pb.go", "action": SKIP, "reason": "generated"},
+    ]
+
+
+def test_project_rules_override_the_defaults(monkeypatch):
+    monkeypatch.setattr(settings, "TRIAGE_PROJECT_RULES", {
+        "*": {"skip": ["docs/*"]},
+        "7": {"review": ["*.pb.go"]},
+    })
+    files = [_file("docs/guide.py"), _file("api/user.pb.go")]
+
+    review, triaged = triage_files(7, files)
+    assert list(review) == ["api/user.pb.go"]
+    assert triaged == [{"path": "docs/guide.py", "action": SKIP, "reason": "project-rule"}]
+
+    review, triaged = triage_files(8, files)
+    assert review == {}
+    assert {entry["reason"] for entry in triaged} == {"project-rule", "generated"}
+
+
+def test_disabled_triage_reviews_everything(monkeypatch):
+    monkeypatch.setattr(settings, "TRIAGE_ENABLED", False)
+
+    review, triaged = triage_files(1, [_file("yarn.lock"), _file("app.py")])
+
+    assert list(review) == ["yarn.lock", "app.py"]
+    assert triaged == []
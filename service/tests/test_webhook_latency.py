@@ -0,0 +1,63 @@
+import asyncio
+import httpx
+import time
+
+from benchmarks.report import percentiles
+from benchmarks.webhook_load import DEFAULT_MIX, LoadRun, PayloadFactory, in_process_app, parse_mix
+from config import settings
+
+
+def test_webhook_ingress_p99_within_budget(run):
+    load = LoadRun(PayloadFactory(parse_mix(DEFAULT_MIX), projects=5, mrs=50, description_bytes=2000, seed=7))
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=in_process_app())
+        async with httpx.AsyncClient(base_url="http://botgo.test", transport=transport) as client:
+            await load.warm_up(client, 20)
+            load.latencies.clear()
+            load.statuses.clear()
+            await load.run(client, rate=200, duration=1.5, poisson=False)
+
+    run(scenario)
+
+    samples = [value for values in load.latencies.values() for value in values]
+    latency = percentiles(samples)
+
+    assert not load.errors
+    assert load.statuses["queued"] > 0
+    assert latency["count"] >= 250
+    assert latency["p99"] < settings.WEBHOOK_LATENCY_BUDGET_MS, latency
+
+
+def test_slow_broker_publish_does_not_block_the_event_loop(run, monkeypatch):
+    from benchmarks.webhook_load import merge_request_payload
+    from tasks import review_merge_request
+
+    publish = review_merge_request.apply_async
+
+    def slow_publish(*args, **kwargs):
+        time.sleep(0.5)
+        return publish(*args, **kwargs)
+
+    monkeypatch.setattr(review_merge_request, "apply_async", slow_publish)
+
+    async def scenario():
+        gaps = []
+
+        async def ticker():
+            while True:
+                started = time.perf_counter()
+                await asyncio.sleep(0.01)
+                gaps.append(time.perf_counter() - started)
+
+        transport = httpx.ASGITransport(app=in_process_app())
+        async with httpx.AsyncClient(base_url="http://botgo.test", transport=transport) as client:
+            ticks = asyncio.create_task(ticker())
+            response = await client.post("/api/webhook", json=merge_request_payload(1, 1, "open", 100))
+            ticks.cancel()
+        return response.json()["status"], max(gaps)
+
+    status, longest_stall = run(scenario)
+
+    assert status == "queued"
+    assert longest_stall < 0.25
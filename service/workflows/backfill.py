@@ -0,0 +1,228 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from config import settings
+from db.models import BackfillCheckpoint
+from infrastructure import gitlab_client, vector_store
+from infrastructure.vector_store import VectorInsertError, hunk_documents
+from loguru import logger
+import argparse
+import asyncio
+
+_DONE = object()
+
+
+async def _load_checkpoint(project_id: int) -> BackfillCheckpoint:
+    checkpoint = await BackfillCheckpoint.find_one(
+        BackfillCheckpoint.project_id == project_id
+    )
+    if checkpoint is None:
+        checkpoint = BackfillCheckpoint(project_id=project_id)
+        await checkpoint.insert()
+    return checkpoint
+
+
+async def _fetch_page(
+    project_id: int,
+    mrs: List[Dict[str, Any]],
+    semaphore: asyncio.Semaphore,
+) -> Tuple[List[Tuple[Dict[str, Any], Dict[str, str]]], List[int]]:
+    async def fetch(mr):
+        async with semaphore:
+            diffs = await gitlab_client.get_mr_diffs(project_id, mr["iid"])
+            return mr, {
+                d["new_path"] or d["old_path"]: d.get("diff", "")
+                for d in diffs
+            }
+
+    results = await asyncio.gather(*(fetch(mr) for mr in mrs), return_exceptions=True)
+
+    fetched = []
+    failed = []
+    for mr, result in zip(mrs, results):
+        if isinstance(result, BaseException):
+            failed.append(mr["iid"])
+            logger.warning(
+                "Backfill could not fetch MR diffs: {error}",
+                error=result,
+                project_id=project_id,
+                mr_iid=mr["iid"],
+            )
+        else:
+            fetched.append(result)
+
+    return fetched, failed
+
+
+async def _produce(
+    project_id: int,
+    checkpoint: BackfillCheckpoint,
+    queue: asyncio.Queue,
+    concurrency: int,
+    page_size: int,
+) -> None:
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    resume_cursor = checkpoint.cursor_created_at
+    done_at_cursor = set(checkpoint.cursor_iids)
+    retry_iids = list(checkpoint.failed_iids)
+
+    try:
+        if retry_iids:
+            fetched, failed = await _fetch_page(project_id, [{"iid": iid} for iid in retry_iids], semaphore)
+            await queue.put((None, fetched, failed))
+
+        async for page in gitlab_client.iter_mrs_by_project(
+            project_id,
+            state="merged",
+            per_page=page_size,
+            order_by="created_at",
+            sort="asc",
+            created_after=resume_cursor,
+        ):
+            if not page:
+                continue
+
+            mrs = [
+                mr for mr in page
+                if not (mr["created_at"] == resume_cursor and mr["iid"] in done_at_cursor)
+            ]
+            fetched, failed = await _fetch_page(project_id, mrs, semaphore)
+            await queue.put((page, fetched, failed))
+    except Exception:
+        await queue.put(_DONE)
+        raise
+
+    await queue.put(_DONE)
+
+
+async def _consume(
+    project_id: int,
+    checkpoint: BackfillCheckpoint,
+    queue: asyncio.Queue,
+) -> None:
+    while True:
+        item = await queue.get()
+        if item is _DONE:
+            return
+
+        page, fetched, failed = item
+
+        documents = []
+        for mr, files in fetched:
+            documents.extend(hunk_documents(project_id, mr["iid"], files))
+
+        try:
+            indexed = await vector_store.insert_documents(documents)
+        except VectorInsertError as e:
+            indexed = e.inserted
+            rejected = {d.mr_iid for d in documents if d.uuid in e.failed_uuids}
+            logger.warning(
+                "Vector store rejected hunks of {count} MRs, will retry them: {error}",
+                count=len(rejected),
+                error=e,
+                project_id=project_id,
+                mr_iids=sorted(rejected),
+            )
+            fetched = [(mr, files) for mr, files in fetched if mr["iid"] not in rejected]
+            failed = [*failed, *sorted(rejected)]
+
+        if page is not None:
+            cursor = page[-1]["created_at"]
+            cursor_iids = [mr["iid"] for mr in page if mr["created_at"] == cursor]
+            if cursor == checkpoint.cursor_created_at:
+                cursor_iids = sorted(set(checkpoint.cursor_iids) | set(cursor_iids))
+
+            checkpoint.cursor_created_at = cursor
+            checkpoint.cursor_iids = cursor_iids
+
+        retried = {mr["iid"] for mr, _ in fetched}
+        checkpoint.failed_iids = sorted((set(checkpoint.failed_iids) - retried) | set(failed))
+        checkpoint.failed = len(checkpoint.failed_iids)
+        checkpoint.processed += len(fetched)
+        checkpoint.indexed_hunks += indexed
+        checkpoint.updated_at = datetime.now()
+        await checkpoint.save()
+
+        logger.info(
+            "Backfilled {count} MRs ({hunks} hunks) up to {cursor}",
+            count=len(fetched),
+            hunks=indexed,
+            cursor=checkpoint.cursor_created_at,
+            project_id=project_id,
+        )
+
+
+async def backfill_project(
+    project_id: int,
+    concurrency: Optional[int] = None,
+    page_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    checkpoint = await _load_checkpoint(project_id)
+    checkpoint.status = "running"
+    await checkpoint.save()
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, settings.BACKFILL_QUEUE_PAGES))
+    producer = asyncio.create_task(_produce(
+        project_id,
+        checkpoint,
+        queue,
+        concurrency or settings.BACKFILL_CONCURRENCY,
+        page_size or settings.BACKFILL_PAGE_SIZE,
+    ))
+
+    try:
+        await _consume(project_id, checkpoint, queue)
+        await producer
+        checkpoint.status = "completed"
+    except Exception:
+        checkpoint.status = "failed"
+        logger.exception("Backfill failed", project_id=project_id)
+        raise
+    finally:
+        if not producer.done():
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+        checkpoint.updated_at = datetime.now()
+        await checkpoint.save()
+
+    return {
+        "project_id": project_id,
+        "processed": checkpoint.processed,
+        "failed": checkpoint.failed,
+        "indexed_hunks": checkpoint.indexed_hunks,
+        "status": checkpoint.status,
+    }
+
+
+async def run_backfill(
+    project_ids: List[int],
+    concurrency: Optional[int] = None,
+    page_size: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    results = []
+    for project_id in project_ids:
+        results.append(await backfill_project(project_id, concurrency, page_size))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill merged MR history into the vector store")
+    parser.add_argument("--project", type=int, action="append", required=True, dest="projects")
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--page-size", type=int, default=None)
+    args = parser.parse_args()
+
+    async def run():
+        from infrastructure.mongo import connect_to_mongo
+
+        await connect_to_mongo()
+        try:
+            return await run_backfill(args.projects, args.concurrency, args.page_size)
+        finally:
+            await gitlab_client.aclose()
+
+    for result in asyncio.run(run()):
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,22 @@
 from langgraph.graph import StateGraph, END
-from typing import TypedDict, List, Optional
-
-from db.models import Review, ReviewVersion
-from infrastructure import gitlab_client, LLMWorker
+from typing import TypedDict, List, Optional, Dict, Any
+
+from db.models import Review, ReviewVersion, FileReview, TriagedFile
+from db.review_queries import resolve_file_refs, version_count
+from infrastructure import gitlab_client, vector_store, LLMWorker
+from infrastructure.review_jobs import review_jobs
+from infrastructure.diff_store import diff_digest, diff_store
+from infrastructure.triage import triage_files
+from infrastructure.metrics import MR_FILES, timed_node
+from infrastructure.review_progress import review_progress
+from config import settings
 from beanie import PydanticObjectId
+from datetime import datetime
+from loguru import logger
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+import asyncio
+import time
 
 
 class ReviewState(TypedDict):
@@ -19,7 +32,20 @@ class ReviewState(TypedDict):
     summary_diff: str
     full_diff: str
 
-    similar_contexts: List[str]
+    head_sha: Optional[str]
+    diff_version_id: Optional[int]
+    changed_files: List[Dict[str, Any]]
+    files: Dict[str, str]
+    triaged_files: List[Dict[str, Any]]
+    previous_files: Dict[str, Dict[str, Any]]
+    version_index: int
+    file_reviews: List[Dict[str, Any]]
+    reviewed_files: int
+    reused_files: int
+    failed_files: List[str]
+
+    similar_contexts: Dict[str, List[str]]
+    retrieval_stats: Dict[str, Any]
 
     review_summary: str
     suggestion: str
@@ -28,11 +54,45 @@ class ReviewState(TypedDict):
 
     _review_id: Optional[PydanticObjectId]
 
+    generation: Optional[int]
+    superseded: bool
+
     error: Optional[str]
 
-def fetch_mr_diffs(state: ReviewState) -> ReviewState:
+
+_background_tasks: set = set()
+
+
+def _spawn(coro) -> None:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def _is_superseded(state: ReviewState) -> bool:
+    if state.get("superseded"):
+        return True
+
+    if await review_jobs.is_superseded(
+        state["project_id"],
+        state["mr_iid"],
+        state.get("generation"),
+    ):
+        logger.info(
+            "Review superseded by a newer push",
+            project_id=state["project_id"],
+            mr_iid=state["mr_iid"],
+            generation=state.get("generation"),
+        )
+        state["superseded"] = True
+        return True
+
+    return False
+
+
+async def fetch_mr_diffs(state: ReviewState) -> ReviewState:
     try:
-        mr = gitlab_client.get_mr_data(
+        mr = await gitlab_client.get_mr_data(
             state["project_id"],
             state["mr_iid"],
         )
@@ -45,6 +105,9 @@ def fetch_mr_diffs(state: ReviewState) -> ReviewState:
             "target_branch": mr["target_branch"],
             "project_name": mr["project_name"],
             "mr_title": mr["mr_title"],
+            "head_sha": mr["head_sha"],
+            "diff_version_id": mr["diff_version_id"],
+            "changed_files": mr["files"],
         })
 
         return state
@@ -54,51 +117,225 @@ def fetch_mr_diffs(state: ReviewState) -> ReviewState:
         return state
 
 
-async def load_or_create_review(state: ReviewState) -> ReviewState:
+def triage_mr_files(state: ReviewState) -> ReviewState:
     if state.get("error"):
         return state
 
-    try:
-        existing = await Review.find_one({
-            "project_id": state["project_id"],
-            "mr_iid": state["mr_iid"],
-        })
-
-        if existing:
-            state["_review_id"] = existing.id
-            return state
+    files, triaged = triage_files(state["project_id"], state.get("changed_files", []))
 
-        review = Review(
+    if triaged:
+        logger.info(
+            "Triage: {review} files to review, {skipped} skipped or metadata-only",
+            review=len(files),
+            skipped=len(triaged),
+            reasons=sorted({t["reason"] for t in triaged}),
             project_id=state["project_id"],
-            project_name=state["project_name"],
             mr_iid=state["mr_iid"],
-            author=state["author"],
-            diff=state["full_diff"],
-            source_branch=state["source_branch"],
-            target_branch=state["target_branch"],
-            mr_title=state["mr_title"],
-            versions=[]
         )
 
-        await review.insert()
-        state["_review_id"] = review.id
-        return state
+    state["files"] = files
+    state["triaged_files"] = triaged
 
-    except Exception as e:
-        state["error"] = f"Mongo init error: {e}"
-        return state
+    MR_FILES.labels("changed").observe(len(state.get("changed_files", [])))
+    MR_FILES.labels("triaged").observe(len(triaged))
+    return state
+
+
+async def _flush_pending_diff(review_id: PydanticObjectId, blob: Dict[str, Any]) -> None:
+    await diff_store.put_blob(blob)
+    await Review.get_motor_collection().update_one(
+        {"_id": review_id, "pending_diff._id": blob["_id"]},
+        {"$unset": {"pending_diff": ""}},
+    )
+
+
+async def load_or_create_review(state: ReviewState) -> Dict[str, Any]:
+    if state.get("error"):
+        return {}
+
+    now = datetime.now()
+
+    for attempt in range(2):
+        try:
+            review = await Review.get_motor_collection().find_one_and_update(
+                {"project_id": state["project_id"], "mr_iid": state["mr_iid"]},
+                {
+                    "$set": {
+                        "project_name": state["project_name"],
+                        "author": state["author"],
+                        "source_branch": state["source_branch"],
+                        "target_branch": state["target_branch"],
+                        "mr_title": state["mr_title"],
+                        "updated_at": now,
+                    },
+                    "$setOnInsert": {"versions": [], "created_at": now},
+                },
+                projection={
+                    "project_id": 1,
+                    "version_count": 1,
+                    "pending_diff": 1,
+                    "versions": {"$slice": -1},
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+
+            if review.get("pending_diff"):
+                await _flush_pending_diff(review["_id"], review["pending_diff"])
+
+            update: Dict[str, Any] = {"_review_id": review["_id"], "version_index": 0}
+            if review.get("versions"):
+                count = review.get("version_count")
+                if count is None:
+                    count = await version_count(review["_id"])
+
+                latest = review["versions"][-1]
+                await resolve_file_refs(review["_id"], [latest])
+
+                update["version_index"] = count
+                update["previous_files"] = {
+                    f["path"]: {**f, "ref": count - 1 if f.get("ref") is None else f["ref"]}
+                    for f in latest.get("files", [])
+                    if f.get("summary") is not None
+                }
+            return update
+
+        except DuplicateKeyError:
+            if attempt:
+                return {"error": "Mongo init error: concurrent review upsert"}
+
+        except Exception as e:
+            return {"error": f"Mongo init error: {e}"}
+
+
+async def retrieve_similar_contexts(state: ReviewState) -> Dict[str, Any]:
+    if state.get("error"):
+        return {}
+
+    files = state.get("files") or {}
+    started = time.perf_counter()
+
+    try:
+        matches = await vector_store.query_hunks(
+            state["project_id"],
+            state["mr_iid"],
+            files,
+            n_results=settings.RETRIEVAL_TOP_K,
+        )
+    except Exception:
+        logger.exception(
+            "Context retrieval failed",
+            project_id=state["project_id"],
+            mr_iid=state["mr_iid"],
+        )
+        matches = {}
+
+    _spawn(vector_store.store_hunks(state["project_id"], state["mr_iid"], files))
+
+    distances = [m.distance for file_matches in matches.values() for m in file_matches]
+    stats = {
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        "hits": len(distances),
+        "files": len(matches),
+        "best_distance": min(distances) if distances else None,
+        "mean_distance": round(sum(distances) / len(distances), 4) if distances else None,
+    }
+
+    logger.info(
+        "Retrieved {hits} contexts in {latency_ms}ms",
+        **stats,
+        project_id=state["project_id"],
+        mr_iid=state["mr_iid"],
+    )
+
+    return {
+        "similar_contexts": {
+            path: [m.content for m in file_matches] for path, file_matches in matches.items()
+        },
+        "retrieval_stats": stats,
+    }
 
 
 async def generate_summary_review(state: ReviewState) -> ReviewState:
     if state.get("error"):
         return state
 
+    if await _is_superseded(state):
+        return state
+
     try:
-        summary, suggestion = await LLMWorker.generate_review(
-            diff=state["full_diff"],
-            contexts=state.get("similar_contexts", []),
+        files = state.get("files") or {}
+        previous = state.get("previous_files") or {}
+        hashes = {path: diff_digest(diff) for path, diff in files.items()}
+
+        changed = {
+            path: diff for path, diff in files.items()
+            if previous.get(path, {}).get("diff_hash") != hashes[path]
+        }
+
+        await review_progress.publish(
+            "review_planned",
+            files=len(files),
+            changed=len(changed),
+            reused=len(files) - len(changed),
+            triaged=len(state.get("triaged_files", [])),
+        )
+
+        for path in files:
+            if path not in changed:
+                await review_progress.publish(
+                    "file_reviewed",
+                    path=path,
+                    stacks=previous[path].get("stacks"),
+                    summary=previous[path].get("summary"),
+                    suggestion=previous[path].get("suggestion"),
+                    reused=True,
+                )
+
+        reviewed, failed = await LLMWorker.review_files(
+            changed,
+            contexts=state.get("similar_contexts") or {},
+        )
+
+        file_reviews = []
+        for path in files:
+            if path in reviewed:
+                stacks, summary, suggestion = reviewed[path]
+                file_reviews.append({
+                    "path": path,
+                    "diff_hash": hashes[path],
+                    "stacks": stacks,
+                    "summary": summary,
+                    "suggestion": suggestion,
+                })
+            elif path not in changed:
+                file_reviews.append(previous[path])
+
+        logger.info(
+            "Incremental review: {reviewed} reviewed, {reused} reused, {failed} failed",
+            reviewed=len(reviewed),
+            reused=len(files) - len(changed),
+            failed=len(failed),
+            project_id=state["project_id"],
+            mr_iid=state["mr_iid"],
+            head_sha=state.get("head_sha"),
         )
 
+        summary, suggestion = LLMWorker.merge_reviews([
+            (f["stacks"], f["summary"], f["suggestion"]) for f in file_reviews
+        ] + [
+            ([], t["summary"], "LGTM")
+            for t in state.get("triaged_files", [])
+            if t.get("summary")
+        ])
+
+        state["file_reviews"] = file_reviews
+        state["reviewed_files"] = len(reviewed)
+        state["reused_files"] = len(files) - len(changed)
+        state["failed_files"] = failed
+
+        MR_FILES.labels("reviewed").observe(len(reviewed))
+        MR_FILES.labels("reused").observe(len(files) - len(changed))
         state["review_summary"] = summary
         state["suggestion"] = suggestion
         return state
@@ -112,19 +349,45 @@ async def persist_review_version(state: ReviewState) -> ReviewState:
     if state.get("error"):
         return state
 
-    try:
-        review = await Review.get(state["_review_id"])
-
-        review.diff = state["full_diff"]
+    if await _is_superseded(state):
+        return state
 
-        review.versions.append(
-            ReviewVersion(
-                summary=state["review_summary"],
-                suggestions=state["suggestion"],
-            )
+    try:
+        blob = diff_store.blob(state["full_diff"])
+        diff_hash = blob["_id"]
+
+        version = ReviewVersion(
+            summary=state["review_summary"],
+            suggestions=state["suggestion"],
+            head_sha=state.get("head_sha"),
+            diff_version_id=state.get("diff_version_id"),
+            diff_hash=diff_hash,
+            files=[
+                FileReview(path=f["path"], diff_hash=f["diff_hash"], ref=f["ref"])
+                if f.get("ref") is not None else FileReview(**f)
+                for f in state.get("file_reviews", [])
+            ],
+            reviewed_files=state.get("reviewed_files", 0),
+            reused_files=state.get("reused_files", 0),
+            failed_files=state.get("failed_files", []),
+            skipped_files=[TriagedFile(**t) for t in state.get("triaged_files", [])],
+            retrieval=state.get("retrieval_stats"),
         )
 
-        await review.replace()
+        await Review.get_motor_collection().update_one(
+            {"_id": state["_review_id"]},
+            {
+                "$push": {"versions": version.model_dump()},
+                "$set": {
+                    "diff_hash": diff_hash,
+                    "pending_diff": blob,
+                    "version_count": state.get("version_index", 0) + 1,
+                    "updated_at": datetime.now(),
+                },
+                "$unset": {"diff": ""},
+            },
+        )
+        await _flush_pending_diff(state["_review_id"], blob)
         return state
 
     except Exception as e:
@@ -132,10 +395,13 @@ async def persist_review_version(state: ReviewState) -> ReviewState:
         return state
 
 
-def post_summary_review(state: ReviewState) -> ReviewState:
+async def post_summary_review(state: ReviewState) -> ReviewState:
     if state.get("error"):
         return state
 
+    if await _is_superseded(state):
+        return state
+
     try:
         summary = state["review_summary"].strip()
         suggestion = state["suggestion"].strip()
@@ -153,18 +419,25 @@ def post_summary_review(state: ReviewState) -> ReviewState:
             else f"### (╯°□°）╯ Suggested Improvement\n- {suggestion}"
         )
 
+        blocks = [summary_block, suggestion_block]
+        failed = state.get("failed_files") or []
+        if failed:
+            blocks.append(
+                "### (・_・;) Not reviewed\nThese files could not be reviewed (LLM error or timeout):\n"
+                + "\n".join(f"- `{path}`" for path in failed)
+            )
+        sections = "\n\n".join(blocks)
+
         body = f"""
 ## 🐪 BotGo Review
 
-{summary_block}
-
-{suggestion_block}
+{sections}
 
 ---
 <sub>Automated review • Correctness, safety, maintainability</sub>
 """.strip()
 
-        gitlab_client.post_mr_note(
+        await gitlab_client.post_mr_note(
             state["project_id"],
             state["mr_iid"],
             body,
@@ -176,19 +449,27 @@ def post_summary_review(state: ReviewState) -> ReviewState:
         state["error"] = f"GitLab post error: {e}"
         return state
 
+def _node(name: str, fn):
+    return review_progress.tracked(name, timed_node(name, fn))
+
+
 def create_review_workflow():
     graph = StateGraph(ReviewState)
 
-    graph.add_node("fetch_diffs", fetch_mr_diffs)
-    graph.add_node("init_review", load_or_create_review)
-    graph.add_node("llm_review", generate_summary_review)
-    graph.add_node("persist_version", persist_review_version)
-    graph.add_node("post_summary", post_summary_review)
+    graph.add_node("fetch_diffs", _node("fetch_diffs", fetch_mr_diffs))
+    graph.add_node("triage", _node("triage", triage_mr_files))
+    graph.add_node("init_review", _node("init_review", load_or_create_review))
+    graph.add_node("retrieve_context", _node("retrieve_context", retrieve_similar_contexts))
+    graph.add_node("llm_review", _node("llm_review", generate_summary_review))
+    graph.add_node("persist_version", _node("persist_version", persist_review_version))
+    graph.add_node("post_summary", _node("post_summary", post_summary_review))
 
     graph.set_entry_point("fetch_diffs")
 
-    graph.add_edge("fetch_diffs", "init_review")
-    graph.add_edge("init_review", "llm_review")
+    graph.add_edge("fetch_diffs", "triage")
+    graph.add_edge("triage", "init_review")
+    graph.add_edge("triage", "retrieve_context")
+    graph.add_edge(["init_review", "retrieve_context"], "llm_review")
     graph.add_edge("llm_review", "persist_version")
     graph.add_edge("persist_version", "post_summary")
     graph.add_edge("post_summary", END)